@@ -25,6 +25,160 @@ parser = argparse.ArgumentParser(description='Arguments for pi estimation')
 parser.add_argument('-v', '--version', help='Display version.', action='version',
                     version=f'%(prog)s ver:{version}')
 
+# --timings argument is added to the parser
+parser.add_argument('--timings', help='Measure the time spent on each phase of the runs.',
+                    action='store_true')
+
+# --profile argument is added to the parser
+parser.add_argument('--profile', help='Profile the runs via cProfile (stats saved at logs folder).',
+                    action='store_true')
+
+# --kernel argument is added to the parser
+parser.add_argument('--kernel', help='Kernel counting the dots in circle (overrides the settings).',
+                    choices=['numpy', 'integer', 'numba'])
+
+# --chunk argument is added to the parser
+parser.add_argument('--chunk', help='Dots generated at once, per chunk (overrides the settings).',
+                    type=int)
+
+# --runs argument is added to the parser
+parser.add_argument('--runs', help='Runs of the job (overrides the settings).', type=int)
+
+# --dots argument is added to the parser
+parser.add_argument('--dots', help='Dots per run (overrides the settings).', type=int)
+
+# --seed argument is added to the parser
+parser.add_argument('--seed', help='Seed of the random generator, for reproducible jobs (overrides the settings).',
+                    type=int)
+
+# --sampler argument is added to the parser
+parser.add_argument('--sampler', help='Bit generator of the random dots (overrides the settings).',
+                    choices=['PCG64', 'PCG64DXSM', 'MT19937', 'Philox', 'SFC64'])
+
+# --sweep argument is added to the parser
+parser.add_argument('--sweep', help='Convergence study without GUI: estimates at every dots level, up to dots.',
+                    action='store_true')
+
+# --benchmark argument is added to the parser
+parser.add_argument('--benchmark', help='Compare speed and statistics of the kernels on the same job, without GUI.',
+                    action='store_true')
+
+# --extend argument is added to the parser
+parser.add_argument('--extend', help='Append N runs to a finished job (the latest one, or --result), without GUI.',
+                    type=int, metavar='N')
+
+# --result argument is added to the parser
+parser.add_argument('--result', help='Result to extend, as logs/<datetime> (without _result.json).')
+
+# --serve argument is added to the parser
+parser.add_argument('--serve', help='Start the local job server (HTTP/JSON API), without GUI.',
+                    action='store_true')
+
+# --port argument is added to the parser
+parser.add_argument('--port', help='TCP port of the local job server.', type=int, default=8031)
+
+# --no-cache argument is added to the parser
+parser.add_argument('--no-cache', help='Do not use the results cache (seeded jobs are always computed).',
+                    action='store_true')
+
+# --coordinator argument is added to the parser
+parser.add_argument('--coordinator', help='Distributed mode: split the job in leases, computed by workers over TCP.',
+                    action='store_true')
+
+# --worker argument is added to the parser
+parser.add_argument('--worker', help='Distributed mode: compute the leases of the coordinator at HOST:PORT.',
+                    metavar='HOST:PORT')
+
+# --local-workers argument is added to the parser
+parser.add_argument('--local-workers', help='Worker processes started on localhost by the coordinator.',
+                    type=int, default=0, metavar='N')
+
+# --host argument is added to the parser
+parser.add_argument('--host', help='Address the coordinator is bound to (0.0.0.0 for workers on other hosts).',
+                    default='127.0.0.1')
+
+# --lease-timeout argument is added to the parser
+parser.add_argument('--lease-timeout', help='Seconds before a lease not returned is assigned to another worker.',
+                    type=float, default=120)
+
+# --workers argument is added to the parser
+parser.add_argument('--workers', help='Worker processes computing the runs (default: CPU cores).',
+                    type=int)
+
+# --calibrate argument is added to the parser
+parser.add_argument('--calibrate', help='Time a few chunk sizes and worker counts, and save the best ones to pi_tuning.txt.',
+                    action='store_true')
+
+# --thermal-ceiling argument is added to the parser
+parser.add_argument('--thermal-ceiling', help='Temperature ceiling in °C for the worker processes (default: thermal_c '
+                    'setting, applied on Raspberry Pi; 0 disables it).', type=float, metavar='C')
+
+# --export argument is added to the parser
+parser.add_argument('--export', help='Render the animation offline to a video file (.mp4, .avi or .gif), without GUI.',
+                    metavar='FILE')
+
+# --fps argument is added to the parser
+parser.add_argument('--fps', help='Frames per second of the exported animation.', type=int, default=25)
+
+# --jobs argument is added to the parser
+parser.add_argument('--jobs', help='List the jobs of the catalog (filtered by --runs, --dots, --kernel, --since, --until), without GUI.',
+                    action='store_true')
+
+# --since argument is added to the parser
+parser.add_argument('--since', help='Jobs listed from this date (YYYY-MM-DD).', metavar='DATE')
+
+# --until argument is added to the parser
+parser.add_argument('--until', help='Jobs listed up to this date included (YYYY-MM-DD).', metavar='DATE')
+
+# --limit argument is added to the parser
+parser.add_argument('--limit', help='Latest jobs listed.', type=int, default=50, metavar='N')
+
+# --compare argument is added to the parser
+parser.add_argument('--compare', help='Compare the jobs of the catalog with these ids, side by side, without GUI.',
+                    type=int, nargs='+', metavar='ID')
+
+# --prune argument is added to the parser
+parser.add_argument('--prune', help='Remove the jobs older than DAYS from the catalog, with their files, without GUI.',
+                    type=float, metavar='DAYS')
+
+# --memory-mb argument is added to the parser
+parser.add_argument('--memory-mb', help='Memory budget of a job in MB (default: memory_mb setting, 0 for half the available memory).',
+                    type=float, metavar='MB')
+
+# --stream argument is added to the parser
+parser.add_argument('--stream', help='Stream the animation as MJPEG on http://127.0.0.1:PORT (GUI or --export).',
+                    type=int, metavar='PORT')
+
+# --stream-fps argument is added to the parser
+parser.add_argument('--stream-fps', help='Maximum frames per second of the animation stream.', type=float, default=10)
+
+# --integrate argument is added to the parser
+parser.add_argument('--integrate', help='Estimate the volume of a region of the unit hypercube (--dim, --indicator), without GUI.',
+                    action='store_true')
+
+# --dim argument is added to the parser
+parser.add_argument('--dim', help='Dimensions of the unit hypercube of the job (default 2).', type=int)
+
+# --indicator argument is added to the parser
+parser.add_argument('--indicator', help='Vectorized indicator of the region, as module:function or file.py:function '
+                    '(default: the unit hypersphere).', metavar='MODULE:FUNCTION')
+
+# --race argument is added to the parser
+parser.add_argument('--race', help='Run job variants concurrently (i.e. sampler=MT19937 dots=100000,kernel=integer), '
+                    'and compare their convergence, without GUI.', nargs='+', metavar='VARIANT')
+
+# --render-h argument is added to the parser
+parser.add_argument('--render-h', help='Height in pixels of the dots layer of the animation, upscaled to h when shown '
+                    '(default: render_h setting, 0 for h).', type=int, metavar='PX')
+
+# --render-interp argument is added to the parser
+parser.add_argument('--render-interp', help='Interpolation upscaling the dots layer of the animation.',
+                    choices=['nearest', 'area'], default='nearest')
+
+# --budget argument is added to the parser
+parser.add_argument('--budget', help='Time budget in seconds: as many runs as complete in time (runs is the maximum).',
+                    type=float, metavar='SECONDS')
+
 args = parser.parse_args()   # argument parsed assignement
 # #################################################################################
 
@@ -34,17 +188,20 @@ args = parser.parse_args()   # argument parsed assignement
 
 ########################### imports ###############################################
 import tkinter as tk                 # GUI library
-from tkinter import ttk              # ttk module is imported from tkinter
+from tkinter import ttk, messagebox  # ttk and messagebox modules are imported from tkinter
 import cv2                           # OpenCV library used for the Monte Carlo graphical part
 from PIL import ImageTk, Image, ImageGrab # library for images management
 
-from threading import Thread         # library from threading (openCV, and Quesu, are operated in different threads from tkinter)
+from threading import Thread, RLock, Event, get_ident # library from threading (openCV, and Quesu, are operated in different threads from tkinter)
 from queue import Queue              # library used to exchange data between openCV and tkinter
 from enum import Enum, auto          # library used to generate tickets, used to exchange data between openCV and tkinter
 
 import numpy as np                   # array management library
-from numpy.random import uniform     # numpy function for random and uniformly dstributed values
+from fractions import Fraction       # exact rational numbers, used to aggregate the dots in circle
+import math                          # math library
+from statistics import NormalDist    # normal distribution, used by the bootstrap confidence intervals
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg  # library used for plotting charts in tkinter
+from matplotlib.figure import Figure  # figure not managed by pyplot, used by the live charts
 import matplotlib.pyplot as plt      # library to make charts
 
 import os.path, pathlib, json        # libraries for files and Json file management
@@ -52,6 +209,23 @@ import datetime as dt                # date and time library used as timestamp o
 from datetime import timedelta       # module for time difference
 import time                          # time library
 import subprocess                    # used to interract with Raspberry Pi processes
+import cProfile, pstats              # libraries used to optionally profile the runs
+import asyncio                       # library used by the local job server
+from concurrent.futures import ProcessPoolExecutor  # pool of worker processes computing the runs
+import io                            # library used to serve the binary results from memory
+import sqlite3                       # library used by the jobs catalog
+import hashlib, shutil               # libraries used by the results cache (entry keys and files copy)
+import importlib, importlib.util     # libraries used to load the indicator functions of the integrator
+import socket, multiprocessing       # libraries used by the distributed mode (workers over TCP)
+from multiprocessing import shared_memory  # runs results shared between the worker processes and the GUI
+from concurrent.futures import wait as wait_futures  # waits the worker processes to complete their runs
+from collections import deque        # queue of the leases to be assigned, in the distributed mode
+
+try:                                 # tentative
+    from numba import njit, prange   # JIT compiler, optionally used for the fused kernel
+    numba_available = True           # numba_available is set True
+except ImportError:                  # case numba is not installed
+    numba_available = False          # numba_available is set False (the numpy kernel is used)
 # #################################################################################
 
 
@@ -96,80 +270,290 @@ class Ticket:
 
 
 ###################################################################################
-################# Class for the settings management ###############################
+################# Class for the hot-path timings ##################################
 ###################################################################################
-class Settings():
-    def __init__(self):
-        self.s = self.load_settings()                # the dict s is loaded
-        if len(self.s) > 0:                          # case the dict is not empty
-            self.h = int(self.s['h'])                # h is parsed as integer (windows height for the openCV animation)
-            self.wait = int(self.s['wait'])          # wait is parsed as integer (delay to initially slow down the dots plot)
-            self.step = int(self.s['step'])          # step is parsed as integer (delay reduction step of the wait parameter)
-            self.runs = int(self.s['runs'])          # runs is parsed as integer (number of Monte Carlo repetitions)
-            self.dots = int(self.s['dots'])          # dots is parsed as integer (quantity of datapoints, dots when animation)
-            self.animation = str(self.s['animation']) # animation is parsed as string (there are 3 levels of animation)
-        else:                                        # case the dict is empty
-            self.close_window = True                 # close_window is set True
-            print("Error on loading settings")       # feedback is printe to the terminal
+
+class Timings():
+    """Lightweight timers, accumulating the time spent on each phase of the runs.
+    When not enabled, the tic and toc functions do nothing."""
     
+    def __init__(self, enabled=False):
+        self.enabled = enabled                  # boolean to activate the timers
+        self.reset()                            # accumulators are initialized
     
     
     
     
-    def get_settings(self):
-        """Returns the settings s ."""
-        return self.s
     
+    def reset(self):
+        """Clears the accumulated timings (called at each new job)."""
+        self.totals = {}                        # dict with the accumulated seconds per phase
+        self.counts = {}                        # dict with the quantity of measurements per phase
     
     
     
     
-    def load_settings(self):
-        """Loades the settings s ."""
-        s = {}                                       # disct s is created
-        fname = 'pi_settings.txt'                    # file name for the settings
-        folder = pathlib.Path().resolve()            # active folder
-        fname = os.path.join(folder,fname)           # folder and file name for the settings
-        if os.path.exists(fname):                    # case the settings file exists
-            with open(fname, "r") as f:              # settings file is opened in reading mode
-                s = json.load(f)                     # json file is parsed to a local dict variable
-            s = self.parse_settings(s)               # parse the settings
-        else:                                        # case the settings does not file exist
-            print("Could not find pi_settings.txt")  # feedback is printed to the terminal    
-        return s                                     # s (settings) is returned
     
+    def tic(self):
+        """Returns a time reference, to be later passed to the toc function."""
+        if self.enabled:                        # case the timings are enabled
+            return time.perf_counter()          # high resolution time reference is returned
+        return 0                                # zero is returned when the timings are disabled
     
     
     
     
-    def save_settings(self, s):
-        """Saves the settings s ."""
-        
-        fname = 'pi_settings.txt'               # file name for the settings
-        folder = pathlib.Path().resolve()       # active folder
-        for key, value in s.items():            # iteration through the dict data
-            s[key]=str(value)                   # values of data are converted to string
-        os.umask(0) # The default umask is 0o22 which turns off write permission of group and others
-        fname = os.path.join(folder, fname)     # folder and file name for the settings
-        with open(os.open(fname, os.O_CREAT | os.O_WRONLY, 0o777), 'w') as f:  # settings_backup file is opened in writing mode
-            f.write(json.dumps(s, indent=0))    # content of the setting file is saved in file
-            f.truncate()                        # truncates file (prevents older characters at file-end, if new content is shorter)
-        s = self.parse_settings(s)              # parse the settings
-        return s
     
+    def toc(self, phase, t_ref):
+        """Adds the elapsed time, since t_ref, to the phase accumulator."""
+        if self.enabled:                        # case the timings are enabled
+            elapsed = time.perf_counter() - t_ref   # elapsed time since t_ref
+            self.totals[phase] = self.totals.get(phase, 0) + elapsed  # elapsed time is accumulated
+            self.counts[phase] = self.counts.get(phase, 0) + 1        # measurements are counted
     
     
     
     
-    def parse_settings(self, s):
-        """Parse the settings s ."""
-        s['h'] = int(s['h'])                    # h is parsed as integer (windows height for the openCV animation)
-        s['wait'] = int(s['wait'])              # wait is parsed as integer (delay to initially slow down the dots plot)
-        s['step'] = int(s['step'])              # step is parsed as integer (delay reduction step of the wait parameter)
-        s['runs'] = int(s['runs'])              # runs is parsed as integer (number of Monte Carlo repetitions)
-        s['dots'] = int(s['dots'])              # dots is parsed as integer (quantity of datapoints, dots when animation)
-        s['animation'] = str(s['animation'])    # animation is parsed as string (thre levels of animations)
-        return s
+    
+    def summary(self):
+        """Returns a text table with the time spent per phase, sorted by time."""
+        tot_time = sum(self.totals.values())    # overall measured time
+        rows = [f"{'phase':<12}{'seconds':>12}{'share':>9}{'calls':>12}{'us/call':>12}"]
+        for phase, secs in sorted(self.totals.items(), key=lambda item: item[1], reverse=True):
+            share = 100 * secs / tot_time if tot_time > 0 else 0   # percentage of the overall measured time
+            per_call = 1e6 * secs / self.counts[phase]              # average micro seconds per measurement
+            rows.append(f"{phase:<12}{secs:>12.3f}{share:>8.1f}%{self.counts[phase]:>12,d}{per_call:>12.2f}")
+        return '\n'.join(rows)                  # text table is returned
+    
+    
+    
+    
+    
+    def write_log(self, datetime):
+        """Writes the timings summary to a text file in the logs folder."""
+        folder = pathlib.Path().resolve()       # active folder
+        folder = os.path.join(folder,'logs')    # folder to store the timings
+        if not os.path.exists(folder):          # if case the folder does not exist
+            os.makedirs(folder)                 # folder is made if it doesn't exist
+        
+        fname = datetime + '_timings.txt'       # file name for the timings
+        fname = os.path.join(folder,fname)      # folder and file name for the timings
+        with open(fname, 'w') as f:             # opens the file fname in writing mode
+            f.write(self.summary() + '\n')      # writes the timings table
+        catalog.add_artifact(datetime, 'timings', fname)  # timings file is recorded in the jobs catalog
+# #################################################################################
+
+
+
+
+
+
+###################################################################################
+################# Functions counting the dots in circle ###########################
+###################################################################################
+
+# kernels counting the dots in circle
+KERNELS = ('numpy', 'integer', 'numba')
+
+# dots per block of the numba kernel, each block drawn from its own seed
+NUMBA_BLOCK = 2**16
+
+
+
+
+
+if numba_available:                                  # case numba is installed
+    
+    @njit(parallel=True, cache=True)
+    def numba_hits(dots, seeds):
+        """Fused kernel: each dot is generated and tested within the same loop, without arrays.
+        The dots are split in blocks of NUMBA_BLOCK dots, and each block seeds the numba generator (one per
+        thread) with its own seed: the blocks are split on all the CPU cores, and the dots in circle are
+        summed (reduction), with the same result for any quantity of threads."""
+        hits = 0                                     # quantity of dots within the circle
+        for b in prange(len(seeds)):                 # parallel iteration over the blocks of dots
+            np.random.seed(seeds[b])                 # generator of the thread is seeded for the block
+            for i in range(b * NUMBA_BLOCK, min(dots, (b + 1) * NUMBA_BLOCK)):  # iteration over the block dots
+                x = np.random.random()               # x coordinate of the dot
+                y = np.random.random()               # y coordinate of the dot
+                if x*x + y*y <= 1.0:                 # case the dot falls within the circle
+                    hits += 1                        # hits is incremented
+        return hits
+
+
+
+
+
+def integer_in_circle(raw, x2=None, y2=None):
+    """Returns the boolean array of the dots in circle, for the raw 64-bit draws of the bit generator.
+    Each draw is split in two 32-bit integer coordinates (x, y), and the test x^2 + y^2 <= 2^64 is exact:
+    the squares are summed in float64 (exact enough to decide outside a narrow band around 2^64),
+    and the rare dots within the band are tested with Python integers.
+    Optional x2 and y2 are float64 buffers (at least as large as raw), for the squares."""
+    n = len(raw)                                     # quantity of dots
+    xy = raw.view(np.uint32)                         # the two 32-bit halves of each draw
+    x2 = np.empty(n, dtype = np.float64) if x2 is None else x2[:n]  # buffer for the x squared
+    y2 = np.empty(n, dtype = np.float64) if y2 is None else y2[:n]  # buffer for the y squared
+    x2[:] = xy[0::2]                                 # x coordinates (exact as float64)
+    y2[:] = xy[1::2]                                 # y coordinates (exact as float64)
+    np.multiply(x2, x2, out = x2)                    # x squared, in place (rounding error < 2^11)
+    np.multiply(y2, y2, out = y2)                    # y squared, in place (rounding error < 2^11)
+    np.add(x2, y2, out = x2)                         # squared distance from origin, in place
+    
+    in_circle = x2 < 2.0**64 - 2.0**14               # dots surely within the circle
+    band = x2 <= 2.0**64 + 2.0**14                   # dots within the circle or the band around it
+    if np.count_nonzero(band) > np.count_nonzero(in_circle):  # case of dots within the band
+        for i in np.flatnonzero(band & ~in_circle):  # iteration over the dots within the band
+            x, y = int(xy[2*i]), int(xy[2*i+1])      # integer coordinates of the dot
+            in_circle[i] = x*x + y*y <= 2**64        # exact test
+    return in_circle
+
+
+
+
+
+def select_kernel(kernel):
+    """Returns the kernel to use, falling back to 'numpy' when 'numba' is not available."""
+    if kernel == 'numba' and not numba_available:    # case numba is requested but not installed
+        print("Numba is not installed, the numpy kernel is used")  # feedback is printed to the terminal
+        return 'numpy'                               # numpy kernel is returned
+    if kernel not in KERNELS:                        # case of unknown kernel
+        print(f"Unknown kernel '{kernel}', the numpy kernel is used")  # feedback is printed to the terminal
+        return 'numpy'                               # numpy kernel is returned
+    return kernel                                    # the requested kernel is returned
+
+
+
+
+
+def count_hits(dots, rng, kernel='numpy', chunk=2**20):
+    """Returns the quantity of dots (out of dots) falling within the circle.
+    Used for the runs that aren't plotted, as no coordinates are kept.
+    The numpy kernel generates the dots in chunks, reusing the same buffers, therefore
+    the memory usage depends on the chunk size and not on the dots quantity. The coordinates are drawn
+    interleaved (x and y of each dot in turn), so the dots of a run are the same for any chunk.
+    The integer kernel draws one raw 64-bit integer per dot (instead of two floats), tested in the
+    integer domain via integer_in_circle. The numba kernel draws the dots from numba's generator, seeded
+    per block of dots from the run stream, therefore it's reproducible too (but its dots differ)."""
+    if kernel == 'numba':                            # case the numba kernel is selected
+        seeds = rng.integers(0, 2**32, size = -(-dots // NUMBA_BLOCK), dtype = np.int64)  # seeds of the blocks, from the run stream
+        return int(numba_hits(dots, seeds))          # fused and multi-threaded kernel (no arrays)
+    
+    xy = np.empty(2 * min(chunk, dots), dtype = np.float64)  # buffer for the interleaved coordinates of one chunk
+    d2 = np.empty(min(chunk, dots), dtype = np.float64)  # buffer for the squared distances of one chunk
+    hits = 0                                         # running quantity of dots in circle
+    if kernel == 'integer':                          # case the integer kernel is selected
+        for first in range(0, dots, chunk):          # iteration over the chunks
+            raw = rng.bit_generator.random_raw(min(chunk, dots - first))  # one raw 64-bit draw per dot
+            hits += int(np.count_nonzero(integer_in_circle(raw, xy, d2)))  # dots in circle are added
+        return hits
+    
+    for first in range(0, dots, chunk):              # iteration over the chunks
+        n = min(chunk, dots - first)                 # dots in this chunk (the last one can be smaller)
+        xyc = xy[:2*n]                               # view of the buffer, for this chunk
+        rng.random(out = xyc)                        # uniform distributed x0, y0, x1, y1, ... written in place
+        np.multiply(xyc, xyc, out = xyc)             # squared coordinates, in place
+        np.add(xyc[0::2], xyc[1::2], out = d2[:n])   # squared distance from origin
+        hits += int(np.count_nonzero(d2[:n] <= 1))   # dots with distance from origin <= 1 are added
+    return hits
+
+
+
+
+
+def check_hits(hits, dots):
+    """Raises OverflowError if the dots in circle aren't within zero and dots.
+    This would be the symptom of a wrapped around accumulator."""
+    if dots > np.iinfo(np.int64).max:                # case dots exceeds the 64-bit accumulators
+        raise OverflowError(f"dots ({dots}) exceeds the 64-bit accumulators")
+    if not 0 <= hits <= dots:                        # case hits is out of the possible range
+        raise OverflowError(f"dots in circle ({hits}) out of range, for {dots} dots")
+    return hits
+
+
+
+
+
+def aggregate_hits(hits_results, dots, scale=4, exact=math.pi):
+    """Returns estimated pi, standard deviation and error, from the dots in circle of each run.
+    Other regions (see region_scale) pass their scale and exact value (the error is None when unknown).
+    Sums are made with Python integers (no overflow) over the distinct dots in circle values, and the
+    estimated pi is the exact fraction 4 x total hits / total dots, converted to float only at the end.
+    The standard deviation is the population one (as numpy std), of the runs estimated pi."""
+    values, counts = np.unique(np.asarray(hits_results), return_counts = True)  # distinct dots in circle, and their runs
+    values, counts = [int(v) for v in values], [int(c) for c in counts]  # Python integers (no overflow)
+    runs = sum(counts)                               # quantity of runs
+    tot_hits = sum(v*c for v, c in zip(values, counts))  # total dots in circle, over all the runs
+    tot_squares = sum(v*v*c for v, c in zip(values, counts))  # sum of the squared dots in circle, over all the runs
+    tot_dots = runs * dots                           # total dots, over all the runs
+    pi_ext = Fraction(scale * tot_hits, tot_dots)    # exact estimated pi
+    variance = Fraction(scale**2 * (runs * tot_squares - tot_hits**2), tot_dots**2)  # exact variance of the runs pi
+    pi_st_dev = math.sqrt(variance)                  # standard deviation of the runs estimated pi
+    return float(pi_ext), pi_st_dev, None if exact is None else float(pi_ext) - exact
+
+
+
+
+def bootstrap_ci(hits_results, dots, resamples=10000, level=0.95, seed=0, batch=500, scale=4):
+    """Returns the bootstrap confidence intervals (percentile and BCa) of the estimated pi mean over the runs,
+    as dict, or None with less than 2 runs. The runs take few distinct dots in circle values, therefore each
+    resample is drawn as multinomial counts of the distinct values (in batches of resamples): the cost
+    depends on the distinct values, not on the runs. The BCa acceleration is from the jackknife, also
+    computed on the distinct values. The seed makes the intervals of a seeded job reproducible."""
+    hits = np.asarray(hits_results, dtype = np.int64) # dots in circle of each run
+    runs = len(hits)                                 # quantity of runs
+    if runs < 2:                                     # case of a single run
+        return None                                  # None is returned
+    values, counts = np.unique(hits, return_counts = True)  # distinct dots in circle, and their runs
+    pis = scale * values / dots                      # estimated pi of the distinct values
+    pi_mean = float(counts @ pis / runs)             # estimated pi mean over the runs
+    
+    rng = np.random.default_rng(seed)                # random generator of the resamples
+    means = np.empty(resamples)                      # array for the estimated pi mean of each resample
+    for first in range(0, resamples, batch):         # iteration over the batches of resamples
+        size = min(batch, resamples - first)         # resamples of the batch
+        means[first:first + size] = rng.multinomial(runs, counts / runs, size = size) @ pis / runs
+    
+    alpha = (1 - level) / 2                          # probability of each tail
+    normal = NormalDist()                            # standard normal distribution
+    below = (np.count_nonzero(means < pi_mean) + 0.5 * np.count_nonzero(means == pi_mean)) / resamples
+    z0 = normal.inv_cdf(min(max(below, 1 / resamples), 1 - 1 / resamples))  # bias correction
+    deltas = counts @ ((runs * pi_mean - pis) / (runs - 1)) / runs - (runs * pi_mean - pis) / (runs - 1)
+    spread = float(counts @ deltas**2)               # sum of the squared jackknife deviations
+    accel = float(counts @ deltas**3) / (6 * spread**1.5) if spread > 0 else 0  # acceleration
+    quantiles = [normal.cdf(z0 + (z0 + z) / (1 - accel * (z0 + z)))
+                 for z in (normal.inv_cdf(alpha), normal.inv_cdf(1 - alpha))]  # BCa adjusted quantiles
+    
+    return {'level': level, 'resamples': resamples,
+            'percentile': [float(q) for q in np.quantile(means, [alpha, 1 - alpha])],
+            'bca': [float(q) for q in np.quantile(means, quantiles)]}
+
+
+
+
+
+def print_ci(ci):
+    """Prints the bootstrap confidence intervals (as returned by bootstrap_ci) to the terminal."""
+    print(f"{100 * ci['level']:.0f}% CI of the mean, percentile = [{ci['percentile'][0]:.8f}, {ci['percentile'][1]:.8f}]")
+    print(f"{100 * ci['level']:.0f}% CI of the mean, BCa        = [{ci['bca'][0]:.8f}, {ci['bca'][1]:.8f}]")
+
+
+
+
+
+def print_estimate(result):
+    """Prints the estimate of a job result to the terminal, labelled by the region of the job (pi for the
+    quarter circle, else volume), with the exact value and error when known, the st.dev and the confidence
+    intervals."""
+    spec = result['spec']                            # job spec
+    if result['runs_made'] > 0:                      # case of completed runs
+        label = 'pi' if spec_region(spec) is None else 'volume'  # estimated quantity
+        print(f"Estimated {label} = {result['pi']:.8f}")  # feedback is printed to terminal
+        if result['error'] is not None:              # case of known exact value
+            print(f"Exact {label} = {region_scale(spec)[1]:.8f}, Error = {result['error']:.8f}")
+        print(f"St.dev = {result['st_dev']:.8f}")    # feedback is printed to terminal
+    if result.get('ci') is not None:                 # case of confidence intervals
+        print_ci(result['ci'])                       # confidence intervals are printed to terminal
 # #################################################################################
 
 
@@ -179,626 +563,3867 @@ class Settings():
 
 
 ###################################################################################
-###################### Class for the Monte Carlo  t ###############################
+################# Functions for the generic integrator ############################
 ###################################################################################
 
-class MonteCarlo(Thread):
-    """Class for the monte carlo data generation and analysis.
-    It uses openCV to display the output"""
-    
-    def __init__(self):
-        super().__init__()
-  
-        self.close_window = False               # boolean to track is the openCV window gets closed (X on right side of the bar)
-        
-        s = settings.get_settings()             # settings are retrieved
-        self.wait = int(str(s['wait']))         # initial delay in ms per each dot plotting
-        self.step = int(str(s['step']))         # delay reduction step of the wait parameter
-        self.h = int(str(s['h']))               # window height parameter
-        self.w = int(1.66 * self.h)             # window width parameter is proportional to the height
-        self.gap = int(0.04 * self.h)           # gap parameter is is proportional to the height
-        self.r = int((self.h -2*self.gap)//2)   # radius parameter is proportional to the height
-        self.center = self.r                    # radius r is assigned to center variable        
-              
-        self.x_text = self.h - self.gap//2      # x coordinate for the text starting position
-        self.font = cv2.FONT_HERSHEY_SIMPLEX    # type of cv2 font used in this script
-        self.fontScale1 = 0.00175 * self.h      # font size used, when not (locally)  changed
-        self.fontScale2 = 0.0015 * self.h       # font size used, when not (locally)  changed
-        self.fontColor = (255,255,255)          # font color, when not (locally) changed
-        if self.fontScale2 < 0.6:               # case fontScale2 is smaller than 0.6 
-            self.lineType = 1                   # font thickness is set to 1
-        else:                                   # case fontScale2 is equal or larger than 0.6 
-            self.lineType = 2                   # font thickness is set to 2
-        
-        self.init_draw()                        # cals the function that initializes the graphical area
-    
-    
-    
-    
-    
-    def init_draw(self):
-        """Funtion generating the pixels arrays to base the animation upon."""
-        self.sketch = np.zeros([self.h, self.w , 3],dtype=np.uint8)  # empty array
-        self.sketch.fill(230)                   # array is filled with light gray
-    
-    
-    
-    
-    
-    
-    def draw_square(self, thk):
-        """Draws a square of side 2xradius, with thickness in argument."""
-        
-        # black square edge (outer square)
-        cv2.rectangle(self.sketch, (self.gap, self.gap),
-                      (self.gap+2*self.r, self.gap+2*self.r), (0, 0, 0), thk)
-        
-        # black square edge (1st sector)
-        cv2.rectangle(self.sketch, (self.gap, self.gap),
-                      (self.gap+self.r, self.gap+self.r), (0, 0, 0), thk)
-        
-        # black square edge (3rd sector)
-        cv2.rectangle(self.sketch, (self.gap+self.r, self.gap+self.r),
-                      (self.gap+2*self.r, self.gap+2*self.r), (0, 0, 0), thk)
-        
-        cv2.imshow('monte carlo', self.sketch)  # monte carlo window is shown
-        key = cv2.waitKey(100)                  # showtime in ms
-        
-        if self.check_close_req(key):           # case the window has been closed
-            self.close_window = True            # close_window is set True
-    
-    
-    
-    
-    
-    
-    def draw_circle(self, thk, animation):
-        """Draws an animated circle of radius 'r', with thickness in argument."""
-        
-        if animation == 'min':                  # case the animation is set to 'min'
-            cv2.circle(self.sketch, (self.gap+self.r, self.gap+self.r),
-                       self.r, (0, 0, 0), thk)  # black circle
-            
-            t_ref  = time.time()                # current time is assigned to t_ref variable
-            while time.time() - t_ref < 2:      # while loop for 2 seconds
-                cv2.imshow('monte carlo', self.sketch)  # monte carlo window is shown
-                key = cv2.waitKey(1)            # showtime in ms
-                if self.check_close_req(key):   # case the window has been closed
-                    self.close_window = True    # close_window is set True
-                    break                       # while loop is interrupted
-                
-            self.redraw(thk, clean=True)        # redraw function is called, in cleaning mode 
-        
-        else:                                   # case the animation is not set to 'min'  
-            idx = np.linspace(-np.pi, np.pi, self.r)   # evenly spaced array from -pi to pi, with r quantity of intervals
-            x1 = int(np.cos(-np.pi)*self.r)+self.center+self.gap   # initial x coordinate
-            y1 = int(np.sin(-np.pi)*self.r)+self.center+self.gap   # initial y coordinate
-            for i in range(self.r -1):          # iteration over the interval r
-                x2 = int(np.cos(idx[i+1])*self.r)+self.center+self.gap  # second x coordinate
-                y2 = int(np.sin(idx[i+1])*self.r)+self.center+self.gap  # second y coordinate
-                cv2.line(self.sketch, (x1, y1), (x2, y2), (0, 0, 0), thk)  # a line s drawn between (x1,y1) and (x2,y2)
-                x1 = x2                         # the second x coordinate is assigned to the initial x coordinate
-                y1 = y2                         # the second y coordinate is assigned to the initial x coordinate
-                cv2.imshow('monte carlo', self.sketch)   # monte carlo window is shown
-                key = cv2.waitKey(1)            # showtime in ms
-                if self.check_close_req(key):   # case the window has been closed
-                    self.close_window = True    # close_window is set True
-                    break                       # for loop is interrupted
-    
-    
-    
-    
-    
-    
-    def draw_arc(self, thk):
-        """Draws an animated arc of radius '2r', with thickness in argument."""
-        idx = np.linspace(-np.pi, np.pi, self.r)  # evenly spaced array from -pi to pi, with r quantity of intervals
-        x1 = int(np.cos(-np.pi)*2*self.r)+self.gap   # initial x coordinate (x1)
-        y1 = int(np.sin(-np.pi)*2*self.r)+self.h-self.gap  # initial x coordinate (y1)
-        
-        for i in range(self.r -1):              # iteration over the interval r
-            x2 = int(np.cos(idx[i+1])*2*self.r)+self.gap   # second x coordinate (x2)
-            y2 = int(np.sin(idx[i+1])*2*self.r)+self.h-self.gap  # second y coordinate (y2)
-            cv2.line(self.sketch, (x1, y1), (x2, y2), (0, 0, 0), thk)  # a line s drawn between (x1,y1) and (x2,y2)
-            x1 = x2                             # the second x coordinate is assigned to the initial x coordinate
-            y1 = y2                             # the second y coordinate is assigned to the initial x coordinate
-            
-            cv2.imshow('monte carlo', self.sketch)  # monte carlo window is shown
-            key = cv2.waitKey(1)                # showtime in ms
-            if self.check_close_req(key):       # case the window has been closed
-                self.close_window = True        # close_window is set True
-                break                           # for loop is interrupted
-    
-    
-    
+# indicator functions loaded by this process, by name
+INDICATORS = {}
+
+
+
+
+
+def load_indicator(name):
+    """Returns the indicator function named 'module:function' (or 'file.py:function'), loaded once per process.
+    The function is vectorized: it takes the (dim, n) array of the coordinates of n dots within the unit
+    hypercube, and returns the boolean array of the dots falling within the region.
+    Loading runs the code of the module, therefore only the trusted names are loaded (see indicator_allowed).
+    A ValueError is raised when the indicator can't be loaded, whatever the error of its code."""
+    if name not in INDICATORS:                       # case the indicator isn't loaded yet
+        source, _, function = name.rpartition(':')   # module (or file) and function names
+        try:                                         # tentative
+            if source.endswith('.py'):               # case of indicator defined in a file
+                spec = importlib.util.spec_from_file_location(pathlib.Path(source).stem, source)  # module spec of the file
+                module = importlib.util.module_from_spec(spec)  # module of the file
+                spec.loader.exec_module(module)      # file is executed
+            else:                                    # case of indicator defined in a module
+                module = importlib.import_module(source)  # module is imported
+            indicator = getattr(module, function)    # indicator function
+        except Exception as e:                       # case of any error while loading (i.e. SyntaxError)
+            raise ValueError(f"invalid indicator '{name}': {e!r}") from e
+        if not callable(indicator):                  # case the name isn't a function
+            raise ValueError(f"invalid indicator '{name}': not callable")
+        INDICATORS[name] = indicator                 # indicator function is kept
+    return INDICATORS[name]
+
+
+
+
+
+def indicator_allowed(name):
+    """Returns True when the indicator can be loaded for a job not started from the command line (job server,
+    coordinator and workers): only the names listed in the indicators setting (comma separated)."""
+    allowed = [n.strip() for n in settings.s['indicators'].split(',') if n.strip()]  # allowlist of the indicators
+    return name in allowed
+
+
+
+
+
+def count_inside(dots, rng, dim, indicator=None, chunk=2**20):
+    """Returns the quantity of dots (out of dots) falling within the region of the unit hypercube with dim
+    dimensions: the positive orthant of the unit hypersphere, or the region of the indicator function.
+    The dots are generated in chunks into the same buffer of 2 x chunk coordinates (as count_hits), so the
+    memory usage doesn't depend on dim. The coordinates of each dot are drawn in turn, so the dots of a run
+    are the same for any chunk; in two dimensions they are the same of the numpy kernel. The indicator
+    function gets the coordinates as a (dim, n) view."""
+    test = None if indicator is None else load_indicator(indicator)  # indicator function, or None for the hypersphere
+    step = max(1, 2 * chunk // dim)                  # dots per chunk
+    coords = np.empty(dim * min(step, dots), dtype = np.float64)  # buffer for the coordinates of one chunk
+    squares = np.empty(min(step, dots), dtype = np.float64)  # buffer for the squared distances of one chunk
+    hits = 0                                         # running quantity of dots within the region
+    for first in range(0, dots, step):               # iteration over the chunks
+        n = min(step, dots - first)                  # dots in this chunk (the last one can be smaller)
+        xs = coords[:dim * n].reshape(n, dim)        # coordinates of the chunk, one row per dot
+        rng.random(out = xs)                         # uniform distributed coordinates, written in place
+        if test is not None:                         # case of indicator function
+            hits += int(np.count_nonzero(test(xs.T)))  # dots within the region are added
+            continue                                 # next chunk
+        np.multiply(xs, xs, out = xs)                # squared coordinates, in place
+        np.sum(xs, axis = 1, out = squares[:n])      # squared distance from origin
+        hits += int(np.count_nonzero(squares[:n] <= 1))  # dots with distance from origin <= 1 are added
+    return hits
+
+
+
+
+
+def spec_region(spec):
+    """Returns the region of a job spec as (dim, indicator), or None for the quarter circle of the pi jobs."""
+    if spec.get('dim', 2) == 2 and spec.get('indicator') is None:  # case of pi job
+        return None
+    return spec.get('dim', 2), spec.get('indicator')
+
+
+
+
+
+def region_label(spec):
+    """Returns the short name of the region of a job spec (or catalog row): 'circle' for the pi jobs,
+    else the dimensions and 'sphere' or the indicator function name."""
+    region = spec_region(spec)                       # region of the job, or None for the pi jobs
+    if region is None:                               # case of pi job
+        return 'circle'
+    dim, indicator = region                          # dimensions and indicator of the region
+    return f"{dim}D " + ('sphere' if indicator is None else indicator.rsplit(':', 1)[-1])
+
+
+
+
+
+def region_scale(spec):
+    """Returns the factor turning the fraction of dots within the region into the estimate, and the exact
+    value (None when unknown): 2^dim and the volume of the unit hypersphere, or 1 and None for an indicator.
+    For the pi jobs these are 4 and pi."""
+    dim = spec.get('dim', 2)                         # dimensions of the job
+    if spec.get('indicator') is not None:            # case of indicator function
+        return 1, None                               # the fraction is the volume within the unit hypercube
+    return 2**dim, math.pi**(dim / 2) / math.gamma(dim / 2 + 1)
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+################# Functions for the jobs computation and results ##################
+###################################################################################
+
+# bit generators that can be used for the random dots
+SAMPLERS = {'PCG64': np.random.PCG64, 'PCG64DXSM': np.random.PCG64DXSM, 'MT19937': np.random.MT19937,
+            'Philox': np.random.Philox, 'SFC64': np.random.SFC64}
+
+
+
+
+
+def new_seed():
+    """Returns a new random seed (128 bits from the OS entropy), for the jobs without a set seed."""
+    return int(np.random.SeedSequence().entropy)
+
+
+
+
+
+def make_rng(seed, sampler, run):
+    """Returns the random generator for a run of a job.
+    Each run has its own stream, spawned from the job seed via the run index: the runs are
+    independent, and reproducible regardless the order (or the worker) they are computed."""
+    seed_seq = np.random.SeedSequence(seed, spawn_key=(run,))  # seed sequence of the run
+    return np.random.Generator(SAMPLERS[sampler](seed_seq))    # generator, based on the selected bit generator
+
+
+
+
+
+def run_batch(dots, seed, sampler, kernel, chunk, first_run, n_runs, region=None):
+    """Computes the runs from first_run to first_run + n_runs - 1, and returns their dots in circle
+    (or within the region, as returned by spec_region, counted by the numpy kernel).
+    This function is executed by the worker processes, therefore it only uses its arguments."""
+    hits_results = []                                # list for the dots in circle (one integer each run)
+    for run in range(first_run, first_run + n_runs): # iteration over the runs of the batch
+        rng = make_rng(seed, sampler, run)           # random generator of the run
+        if region is None:                           # case of pi job
+            hits = count_hits(dots, rng, kernel, chunk)  # quantity of dots in circle
+        else:                                        # case of other region
+            hits = count_inside(dots, rng, *region, chunk)  # quantity of dots within the region
+        hits_results.append(check_hits(hits, dots))  # dots in circle are checked and appended
+    return hits_results
+
+
+
+
+
+def hits_dtype(dots):
+    """Returns the smallest unsigned integer type holding the dots in circle of a run with dots dots:
+    uint32 (4 bytes per run) up to 2^32 - 1 dots, else uint64 (8 bytes per run)."""
+    return np.uint32 if dots <= np.iinfo(np.uint32).max else np.uint64
+
+
+
+
+
+def hits_to_pi(hits, dots):
+    """Returns the estimated pi of each run (float64 array), derived on demand from the dots in circle.
+    4 x hits is exact as float64, therefore the values equal 4 * hits / dots made with Python integers."""
+    return 4 * np.asarray(hits, dtype = np.float64) / dots
+
+
+
+
+
+def shared_views(buf, runs, dots):
+    """Returns the arrays of the shared results (hits and done flag of each run) on the buffer buf.
+    The arrays (and their views) hold the buffer, therefore it can't be closed while they are in use."""
+    dtype = hits_dtype(dots)                         # type of the dots in circle
+    hits = np.frombuffer(buf, dtype = dtype, count = runs, offset = 0)  # dots in circle per run
+    done = np.frombuffer(buf, dtype = np.uint8, count = runs, offset = np.dtype(dtype).itemsize * runs)  # completed flag per run
+    return hits, done
+
+
+
+
+
+def init_shared_worker(counter):
+    """Initializer of the worker processes writing into the shared results: the counter of the completed
+    runs is inherited at the process creation (synchronized objects can't be passed to each task)."""
+    global shared_counter                            # shared_counter global is used by run_shared_batch
+    shared_counter = counter                         # counter is assigned to the global
+
+
+
+
+
+def run_shared_batch(name, runs, dots, seed, sampler, kernel, chunk, first_run, n_runs):
+    """Computes the runs from first_run to first_run + n_runs - 1, writing the results in place into the
+    shared results (block name, of a job with runs runs). Executed by the worker processes."""
+    shm = shared_memory.SharedMemory(name = name)    # shared memory block is attached
+    try:                                             # tentative
+        hits_results, done = shared_views(shm.buf, runs, dots)  # arrays on the shared memory
+        for run in range(first_run, first_run + n_runs):  # iteration over the runs of the batch
+            hits = check_hits(count_hits(dots, make_rng(seed, sampler, run), kernel, chunk), dots)
+            hits_results[run] = hits                 # dots in circle of the run
+            done[run] = 1                            # run is flagged as completed
+            with shared_counter.get_lock():          # the counter is locked
+                shared_counter.value += 1            # completed runs are incremented
+        del hits_results, done                       # arrays are released, before closing the block
+    finally:                                         # in any case
+        shm.close()                                  # shared memory block is detached
+
+
+
+
+
+def split_runs(runs, dots, chunk, workers):
+    """Splits the runs in batches, returned as list of (first_run, n_runs) tuples.
+    Batches are made of about 16 chunks of dots, and there are at least as many batches as workers."""
+    batch_runs = max(1, (16 * chunk) // dots)        # runs per batch, to have about 16 chunks of dots
+    batch_runs = min(batch_runs, max(1, runs // workers))  # at least one batch per worker, when possible
+    return [(first, min(batch_runs, runs - first)) for first in range(0, runs, batch_runs)]
+
+
+
+
+
+def parse_spec(spec, local=False):
+    """Validates a job spec (dict), and returns it with the missing keys from the settings.
+    A ValueError is raised in case of invalid values. The indicator functions are code to be run, therefore
+    they're accepted from local jobs (the command line) or when listed in the indicators setting."""
+    s = settings.get_settings()                      # settings, for the missing keys
+    try:                                             # tentative
+        kernel = str(spec.get('kernel', s['kernel'])) # kernel counting the dots in circle
+        job = {'runs': int(spec.get('runs', s['runs'])),          # runs of the job
+               'dots': int(spec.get('dots', s['dots'])),          # dots per run
+               'sampler': str(spec.get('sampler', s['sampler'])), # bit generator
+               'kernel': kernel,                                  # kernel counting the dots in circle
+               'chunk': int(spec.get('chunk', tuned_chunk(kernel))),  # dots generated at once (calibrated when not set)
+               'seed': spec.get('seed')}                          # seed (None for a random one)
+        dim, indicator = int(spec.get('dim', 2)), spec.get('indicator') or None  # region of the job
+        if dim != 2 or indicator is not None:        # case of other region than the quarter circle
+            job['dim'] = dim                         # dimensions of the unit hypercube
+            job['indicator'] = None if indicator is None else str(indicator)  # indicator function, or None
+        if job['seed'] in (None, ''):                # case the seed is not set
+            job['seed'] = new_seed()                 # a random seed is assigned (returned with the result)
+        job['seed'] = int(job['seed'])               # seed is parsed as integer
+    except (TypeError, ValueError, AttributeError) as e:  # case of not parsable values
+        raise ValueError(f"invalid job spec: {e}")
+    if job['runs'] < 1 or job['dots'] < 1 or job['chunk'] < 1 or job['seed'] < 0:
+        raise ValueError("runs, dots and chunk must be positive, seed must not be negative")
+    if job['sampler'] not in SAMPLERS:               # case of unknown bit generator
+        raise ValueError(f"unknown sampler '{job['sampler']}', valid ones: {', '.join(SAMPLERS)}")
+    if job['kernel'] not in KERNELS:                 # case of unknown kernel
+        raise ValueError(f"unknown kernel '{job['kernel']}', valid ones: {', '.join(KERNELS)}")
+    job['kernel'] = select_kernel(job['kernel'])     # numba falls back to numpy, when not installed
+    if spec_region(job) is not None:                 # case of other region than the quarter circle
+        if job['dim'] < 1:                           # case of invalid dimensions
+            raise ValueError("dim must be positive")
+        if job['indicator'] is not None:             # case of indicator function
+            if not local and not indicator_allowed(job['indicator']):  # case of untrusted indicator
+                raise ValueError(f"indicator '{job['indicator']}' not allowed: only --integrate and --race "
+                                 f"take any indicator, else it must be listed in the indicators setting")
+            load_indicator(job['indicator'])         # indicator is loaded, to be checked (ValueError)
+        if job['kernel'] != 'numpy':                 # case of kernel specific to the circle
+            print(f"The {job['kernel']} kernel only counts the dots in circle, the numpy kernel is used")
+            job['kernel'] = 'numpy'                  # numpy kernel is used
+    return job
+
+
+
+
+
+def args_spec():
+    """Returns the job spec keys passed as arguments (to be completed by parse_spec)."""
+    spec = {'seed': args.seed, 'sampler': args.sampler, 'kernel': args.kernel, 'chunk': args.chunk,
+            'dim': args.dim, 'indicator': args.indicator}
+    return {key: value for key, value in spec.items() if value is not None}
+
+
+
+
+
+def job_result(spec, hits_results, seconds):
+    """Returns the result of a job as a dict (JSON serializable).
+    The per-run dots in circle are under the 'hits' key. For other regions, 'pi' is the estimated volume."""
+    result = {'version': version,                    # version of this script
+              'spec': dict(spec),                    # job spec (runs, dots, sampler, kernel, chunk, seed)
+              'runs_made': len(hits_results),        # completed runs
+              'seconds': round(seconds, 3)}          # computation time
+    scale, exact = region_scale(spec)                # scale of the fraction of dots, and exact value
+    if spec_region(spec) is not None:                # case of other region than the quarter circle
+        result['exact'] = exact                      # exact volume (None for an indicator)
+    if len(hits_results) >= 1:                       # case there is at least one run completed
+        pi_ext, pi_st_dev, pi_error = aggregate_hits(hits_results, spec['dots'], scale, exact)
+        result.update({'pi': pi_ext, 'st_dev': pi_st_dev, 'error': pi_error,
+                       'dots_per_s': round(len(hits_results) * spec['dots'] / max(seconds, 1e-9)),
+                       'ci': bootstrap_ci(hits_results, spec['dots'], seed = spec['seed'], scale = scale)})  # confidence intervals
+    result['hits'] = [int(h) for h in hits_results]  # dots in circle, one integer per run
+    return result
+
+
+
+
+
+def save_result(result, fname):
+    """Saves the result of a job, as fname_result.json (summary) and fname_hits.npy (dots in circle per run)."""
+    summary = {key: value for key, value in result.items() if key != 'hits'}  # result without the per-run data
+    with open(fname + '_result.json', 'w') as f:     # opens the summary file in writing mode
+        f.write(json.dumps(summary, indent=1))       # summary is saved as JSON
+    np.save(fname + '_hits.npy', np.array(result['hits'], dtype=hits_dtype(result['spec']['dots'])))  # per-run data saved as binary
+
+
+
+
+
+def latest_result():
+    """Returns the latest result saved in the logs folder (without the _result.json suffix), or None."""
+    folder = os.path.join(pathlib.Path().resolve(), 'logs')  # folder with the results
+    if not os.path.exists(folder):                   # case the folder does not exist
+        return None                                  # None is returned
+    fnames = sorted(f for f in os.listdir(folder) if f.endswith('_result.json'))  # results, sorted by datetime
+    return os.path.join(folder, fnames[-1][:-len('_result.json')]) if fnames else None
+
+
+
+
+
+def compute_runs(spec, first_run, n_runs, workers, governor, deadline=None):
+    """Computes the runs from first_run to first_run + n_runs - 1 on the worker processes, with the
+    active workers set by the thermal governor. Returns the dots in circle of each run, in runs order.
+    With a deadline (time budget), only the runs completed in time are returned (fewer than n_runs)."""
+    batches = split_runs(n_runs, spec['dots'], spec['chunk'], workers)  # batches of runs
+    governor.reset(spec['chunk'])                    # thermal governor is set for this job
+    hits_results = []                                # list for the dots in circle (one integer each run)
+    with ProcessPoolExecutor(max_workers = workers) as executor:  # pool of worker processes
+        def submit(first, n):                        # submits a batch, with the chunk adapted by the governor
+            chunk = governor.chunk                   # chunk of the batch (the dots don't depend on the chunk)
+            return executor.submit(run_batch, spec['dots'], spec['seed'], spec['sampler'], spec['kernel'],
+                                   chunk, first_run + first, n, spec_region(spec))
+        scheduler = BatchScheduler(batches, submit, governor, deadline)  # batches, submitted as workers are active
+        while not scheduler.done():                  # until all the batches are completed
+            time.sleep(0.1)                          # waits for the worker processes
+            governor.update(scheduler.runs_done(), spec['dots'])  # thermal sample, and workers adaptation
+            scheduler.schedule()                     # batches are submitted to the resumed workers
+        for future in scheduler.wait():              # iteration over the batches, in submission (runs) order
+            hits_results.extend(future.result())     # dots in circle of the batch are appended
+    return hits_results
+
+
+
+
+
+def extend_job(fname, n_runs, workers, governor, deadline=None, catalog=None):
+    """Appends n_runs runs to the job saved as fname, continuing the runs random streams (with a
+    deadline, as many runs as complete in time). The extended result is saved with a new datetime
+    (indexed in the jobs catalog, when given), and returned. The new runs use the kernel of the job: a
+    ValueError is raised when it isn't available here (numba), not to mix the runs of two kernels."""
+    result = load_result(fname)                      # previous job result
+    spec = dict(result['spec'])                      # job spec of the previous job
+    if spec['kernel'] == 'numba' and not numba_available:  # case the job kernel isn't available
+        raise ValueError(f"{fname} was computed by the numba kernel, that is not installed: "
+                         f"its runs can't be extended with the same kernel")
+    hits_results = result['hits']                    # dots in circle of the previous runs
+    
+    start = time.time()                              # current time is assigned to start variable
+    hits_results += compute_runs(spec, len(hits_results), n_runs, workers, governor, deadline)  # new runs are appended
+    spec['runs'] = len(hits_results)                 # total runs of the extended job
+    
+    result = job_result(spec, hits_results, result['seconds'] + time.time() - start)  # extended job result
+    if governor.samples:                             # case of thermal samples
+        result['thermal'] = governor.summary()       # throughput vs temperature of the new runs
+    datetime = dt.datetime.now().strftime('%Y%m%d_%H%M%S')  # datetime reference, for the file name
+    fname = os.path.join(pathlib.Path().resolve(), 'logs', datetime)  # extended result name (without suffix)
+    save_result(result, fname)                       # extended result is saved
+    if catalog is not None:                          # case of jobs catalog
+        catalog.add(result, fname, 'extend')         # extended job is indexed
+    return result
+
+
+
+
+
+def load_result(fname):
+    """Loads a result saved via save_result (fname without the _result.json suffix)."""
+    with open(fname + '_result.json', 'r') as f:     # opens the summary file in reading mode
+        result = json.load(f)                        # summary is parsed
+    result['hits'] = [int(h) for h in np.load(fname + '_hits.npy')]  # per-run data is loaded
+    return result
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+################# Functions for the convergence study (sweep) #####################
+###################################################################################
+
+def sweep_levels(dots):
+    """Returns the dots levels of the sweep: the sliders values (unit x 10^multiplier), up to dots.
+    The levels are log-spaced (9 per decade), and the last one is always dots."""
+    levels = [unit * 10**mult for mult in range(3, len(str(dots))) for unit in range(1, 10)]
+    return [level for level in levels if level < dots] + [dots]
+
+
+
+
+
+def count_hits_prefixes(dots, rng, prefixes, chunk=2**20):
+    """Returns the dots in circle within the first p dots, for each p of prefixes (ascending, up to dots).
+    The dots are generated once, in chunks (interleaved coordinates, as count_hits), and the prefixes are
+    read off the running count: the first p dots are the dots of a run with p dots."""
+    xy = np.empty(2 * min(chunk, dots), dtype = np.float64)  # buffer for the interleaved coordinates of one chunk
+    d2 = np.empty(min(chunk, dots), dtype = np.float64)  # buffer for the squared distances of one chunk
+    prefix_hits = []                                 # dots in circle at each prefix
+    hits = 0                                         # running quantity of dots in circle
+    k = 0                                            # index of the next prefix
+    for first in range(0, dots, chunk):              # iteration over the chunks
+        n = min(chunk, dots - first)                 # dots in this chunk (the last one can be smaller)
+        xyc = xy[:2*n]                               # view of the buffer, for this chunk
+        rng.random(out = xyc)                        # uniform distributed x0, y0, x1, y1, ... written in place
+        np.multiply(xyc, xyc, out = xyc)             # squared coordinates, in place
+        np.add(xyc[0::2], xyc[1::2], out = d2[:n])   # squared distance from origin
+        in_circle = d2[:n] <= 1                      # boolean array for the dots within the circle
+        
+        pos = 0                                      # position within the chunk already counted
+        while k < len(prefixes) and prefixes[k] <= first + n:  # case there are prefixes ending in this chunk
+            end = prefixes[k] - first                # prefix end, within the chunk
+            hits += int(np.count_nonzero(in_circle[pos:end]))  # dots in circle until the prefix end
+            prefix_hits.append(hits)                 # dots in circle at the prefix
+            pos = end                                # position already counted is updated
+            k += 1                                   # next prefix
+        hits += int(np.count_nonzero(in_circle[pos:]))  # dots in circle in the rest of the chunk
+    return prefix_hits
+
+
+
+
+
+def run_sweep_batch(dots, seed, sampler, chunk, prefixes, first_run, n_runs):
+    """Computes the runs from first_run to first_run + n_runs - 1, returning their dots in circle
+    at each prefix. This function is executed by the worker processes."""
+    batch_hits = []                                  # list with the prefixes dots in circle, per run
+    for run in range(first_run, first_run + n_runs): # iteration over the runs of the batch
+        rng = make_rng(seed, sampler, run)           # random generator of the run
+        batch_hits.append(count_hits_prefixes(dots, rng, prefixes, chunk))
+    return batch_hits
+
+
+
+
+
+def sweep(spec, workers):
+    """Convergence study: the dots are drawn once per run, at the largest dots, and the estimates
+    are read off at every dots level. Returns the table (text) of mean, error and st.dev vs dots."""
+    levels = sweep_levels(spec['dots'])              # dots levels of the study
+    prefix_hits = np.zeros((spec['runs'], len(levels)), dtype = np.int64)  # dots in circle per run and level
+    
+    start = time.time()                              # current time is assigned to start variable
+    with ProcessPoolExecutor(max_workers = workers) as executor:  # pool of worker processes
+        batches = split_runs(spec['runs'], spec['dots'], spec['chunk'], workers)  # batches of runs
+        futures = {executor.submit(run_sweep_batch, spec['dots'], spec['seed'], spec['sampler'],
+                                   spec['chunk'], levels, first, n): first for first, n in batches}
+        for future, first in futures.items():        # iteration over the batches
+            batch_hits = future.result()             # dots in circle at each level, per run of the batch
+            prefix_hits[first:first + len(batch_hits)] = batch_hits  # batch results are stored
+    seconds = time.time() - start                    # computation time
+    
+    rows = [f"Sweep of {spec['runs']:,d} runs, up to {spec['dots']:,d} dots (seed {spec['seed']}, "
+            f"sampler {spec['sampler']}), made in {seconds:.1f} s", '',
+            f"{'dots':>13}{'pi':>14}{'error':>14}{'st.dev':>14}{'st.dev*sqrt(dots)':>19}"]
+    for k, level in enumerate(levels):               # iteration over the dots levels
+        pi_ext, pi_st_dev, pi_error = aggregate_hits([int(h) for h in prefix_hits[:, k]], level)
+        rows.append(f"{level:>13,d}{pi_ext:>14.8f}{pi_error:>14.8f}{pi_st_dev:>14.8f}"
+                    f"{pi_st_dev * math.sqrt(level):>19.5f}")
+    return '\n'.join(rows)
+
+
+
+
+
+def write_table(table, datetime, name):
+    """Writes a table (sweep, benchmark) to the text file <datetime>_<name>.txt in the logs folder."""
+    folder = pathlib.Path().resolve()                # active folder
+    folder = os.path.join(folder,'logs')             # folder to store the table
+    if not os.path.exists(folder):                   # if case the folder does not exist
+        os.makedirs(folder)                          # folder is made if it doesn't exist
+    
+    fname = datetime + '_' + name + '.txt'           # file name for the table
+    fname = os.path.join(folder,fname)               # folder and file name for the table
+    with open(fname, 'w') as f:                      # opens the file fname in writing mode
+        f.write(table + '\n')                        # writes the table
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+################# Functions for the kernels benchmark #############################
+###################################################################################
+
+def benchmark(spec):
+    """Runs the same job with each kernel (in this process), and returns the table (text) of speed and
+    statistics. The z-scores check the kernels give the same estimator: the mean vs pi, and vs the numpy
+    kernel mean, in units of standard error (|z| above 3 is suspicious)."""
+    kernels = [k for k in KERNELS if k != 'numba' or numba_available]  # available kernels
+    if 'numba' in kernels:                           # case the numba kernel is benchmarked
+        numba_hits(1000, np.zeros(1, dtype = np.int64))  # JIT compilation, not to be timed
+    
+    stats = {}                                       # dict with dots/s, mean and st.dev, by kernel
+    for kernel in kernels:                           # iteration over the kernels
+        start = time.time()                          # current time is assigned to start variable
+        hits_results = run_batch(spec['dots'], spec['seed'], spec['sampler'], kernel, spec['chunk'],
+                                 0, spec['runs'])    # dots in circle of each run
+        seconds = time.time() - start                # computation time
+        pi_ext, pi_st_dev, _ = aggregate_hits(hits_results, spec['dots'])
+        stats[kernel] = (spec['runs'] * spec['dots'] / seconds, pi_ext, pi_st_dev)
+    
+    runs = spec['runs']                              # runs per kernel
+    rows = [f"Benchmark of {runs:,d} runs of {spec['dots']:,d} dots per kernel (seed {spec['seed']}, "
+            f"sampler {spec['sampler']}, chunk {spec['chunk']:,d})", '',
+            f"{'kernel':>8}{'dots/s':>16}{'speedup':>9}{'pi':>14}{'st.dev':>14}{'z vs pi':>9}{'z vs numpy':>12}"]
+    ref_speed, ref_pi, ref_st_dev = stats['numpy']   # reference values, from the numpy kernel
+    for kernel, (speed, pi_ext, pi_st_dev) in stats.items():  # iteration over the kernels results
+        z_pi = (pi_ext - np.pi) / max(pi_st_dev / math.sqrt(runs), 1e-300)  # mean vs pi
+        z_ref = (pi_ext - ref_pi) / max(math.sqrt((pi_st_dev**2 + ref_st_dev**2) / runs), 1e-300)  # mean vs numpy
+        rows.append(f"{kernel:>8}{speed:>16,.0f}{speed / ref_speed:>9.2f}{pi_ext:>14.8f}{pi_st_dev:>14.8f}"
+                    f"{z_pi:>9.2f}{z_ref:>12.2f}")
+    return '\n'.join(rows)
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+################# Functions for the race mode #####################################
+###################################################################################
+
+# job spec keys that can be changed by a race variant
+VARIANT_KEYS = ('runs', 'dots', 'sampler', 'kernel', 'chunk', 'seed', 'dim', 'indicator')
+
+
+
+
+
+def parse_variant(text, base, local=False):
+    """Returns the job spec of a race variant, written as 'key=value,key=value' (VARIANT_KEYS), over the
+    base spec keys. A ValueError is raised in case of invalid variant."""
+    spec = dict(base)                                # keys shared by all the variants
+    for item in text.split(','):                     # iteration over the variant items
+        key, sep, value = item.partition('=')        # spec key and value
+        if not sep or key.strip() not in VARIANT_KEYS:  # case of malformed item, or unknown key
+            raise ValueError(f"invalid variant item '{item}', valid keys: {', '.join(VARIANT_KEYS)}")
+        spec[key.strip()] = value.strip()            # variant value
+    return parse_spec(spec, local)
+
+
+
+
+
+def run_race_batch(dots, seed, sampler, kernel, chunk, first_run, n_runs, region=None):
+    """Computes a batch of runs as run_batch, and returns their dots in circle with the seconds taken by
+    the worker process. This function is executed by the worker processes."""
+    start = time.time()                              # current time is assigned to start variable
+    hits_results = run_batch(dots, seed, sampler, kernel, chunk, first_run, n_runs, region)
+    return hits_results, time.time() - start
+
+
+
+
+
+def race(labels, specs, workers, interval=1):
+    """Runs the job variants concurrently on the same pool of worker processes. The batches of runs are
+    interleaved fairly: a batch is submitted for the variant with the lowest share of submitted runs, so the
+    variants progress together (the runs are split in small batches, at least 8 per worker). The overall
+    progress is printed every interval seconds (on one line), and the estimate of each variant when it ends.
+    Returns the table (text) of statistics and throughput, and the convergence curves per variant, as
+    lists of (dots drawn, estimate, standard error)."""
+    state = [{'batches': deque(split_runs(s['runs'], s['dots'], s['chunk'], 8 * workers)), 'submitted': 0,
+              'hits': [0] * s['runs'], 'runs': 0, 'sum': 0, 'squares': 0, 'seconds': 0.0, 'curve': []}
+             for s in specs]                         # progress of each variant
+    running = {}                                     # (variant, first_run) by future, of the submitted batches
+    total_runs, ended = sum(s['runs'] for s in specs), 0  # runs of all the variants, and ended variants
+    shown, width = 0, 0                              # time and width of the last progress line
+    
+    start = time.time()                              # current time is assigned to start variable
+    with ProcessPoolExecutor(max_workers = workers) as executor:  # pool of worker processes
+        while True:                                  # iteration over the completed batches
+            while len(running) < 2 * workers:        # case of free slots (two batches per worker)
+                behind = [k for k, v in enumerate(state) if v['batches']]  # variants with batches to submit
+                if not behind:                       # case all the batches are submitted
+                    break                            # while loop is interrupted
+                k = min(behind, key = lambda k: state[k]['submitted'] / specs[k]['runs'])  # variant behind
+                first, n = state[k]['batches'].popleft()  # next batch of the variant
+                state[k]['submitted'] += n           # submitted runs of the variant
+                s = specs[k]                         # job spec of the variant
+                running[executor.submit(run_race_batch, s['dots'], s['seed'], s['sampler'], s['kernel'],
+                                        s['chunk'], first, n, spec_region(s))] = (k, first)
+            if not running:                          # case all the batches are completed
+                break                                # while loop is interrupted
+            
+            done, _ = wait_futures(running, return_when = 'FIRST_COMPLETED')  # completed batches
+            for future in done:                      # iteration over the completed batches
+                k, first = running.pop(future)       # variant and first run of the batch
+                hits, seconds = future.result()      # dots in circle of the batch, and worker seconds
+                v, dots = state[k], specs[k]['dots'] # progress and dots of the variant
+                v['hits'][first:first + len(hits)] = hits  # batch results are stored
+                v['runs'] += len(hits)               # completed runs
+                v['sum'] += sum(hits)                # running sum of the dots in circle (Python integers)
+                v['squares'] += sum(h * h for h in hits)  # running sum of the squared dots in circle
+                v['seconds'] += seconds              # worker seconds of the variant
+                scale = region_scale(specs[k])[0]    # scale of the fraction of dots within the region
+                estimate = scale * v['sum'] / (v['runs'] * dots)  # running estimate
+                variance = scale**2 * (v['runs'] * v['squares'] - v['sum']**2) / (v['runs'] * dots)**2
+                v['curve'].append((v['runs'] * dots, estimate, math.sqrt(max(variance, 0) / v['runs'])))
+                if v['runs'] == specs[k]['runs']:    # case the variant is ended
+                    ended += 1                       # ended variants
+                    text = (f"{labels[k]} ended in {time.time() - start:.1f} s: estimate {estimate:.8f}, "
+                            f"st.err {v['curve'][-1][2]:.8f}")  # feedback of the ended variant
+                    print('\r' + text.ljust(width), flush=True)  # printed over the progress line
+                    width = 0                        # the progress line is overwritten
+            if running and time.time() - shown >= interval:  # case the progress is due
+                runs = sum(v['runs'] for v in state)  # completed runs of all the variants
+                text = (f"{runs:,d} of {total_runs:,d} runs completed ({100 * runs / total_runs:.0f}%), "
+                        f"{ended} of {len(specs)} variants ended")  # overall progress
+                print('\r' + text.ljust(width), end='', flush=True)  # progress line is updated in place
+                shown, width = time.time(), len(text)  # time and width of the progress line
+    seconds = time.time() - start                    # computation time
+    
+    total_dots = sum(s['runs'] * s['dots'] for s in specs)  # dots of all the variants
+    total_seconds = max(sum(v['seconds'] for v in state), 1e-9)  # worker seconds of all the variants
+    width = max(9, max(len(label) for label in labels) + 2)  # width of the variant column
+    rows = [f"Race of {len(specs)} variants on {workers} workers, made in {seconds:.1f} s "
+            f"({total_dots / seconds:,.0f} dots/s in total)", '',
+            f"{'variant':<{width}}{'runs':>10}{'dots':>13}{'estimate':>14}{'error':>14}{'st.dev':>14}"
+            f"{'worker s':>10}{'share':>8}{'dots/s':>16}"]
+    for label, v, s in zip(labels, state, specs):    # iteration over the variants
+        scale, exact = region_scale(s)               # scale and exact value of the variant region
+        pi_ext, pi_st_dev, pi_error = aggregate_hits(v['hits'], s['dots'], scale, exact)
+        error = '-' if pi_error is None else f"{pi_error:.8f}"  # error, or '-' when the exact value is unknown
+        rows.append(f"{label:<{width}}{s['runs']:>10,d}{s['dots']:>13,d}{pi_ext:>14.8f}{error:>14}"
+                    f"{pi_st_dev:>14.8f}{v['seconds']:>10.1f}{100 * v['seconds'] / total_seconds:>7.1f}%"
+                    f"{s['runs'] * s['dots'] / max(v['seconds'], 1e-9):>16,.0f}")
+    rows += ['', "worker s: seconds of the worker processes on the variant; dots/s: dots per worker second"]
+    return '\n'.join(rows), [v['curve'] for v in state]
+
+
+
+
+
+def race_chart(labels, specs, curves, fname):
+    """Saves the chart of the race (fname, png): the running estimate of each variant with its 95% band, and
+    the absolute error (or the standard error, when the exact value is unknown), vs the dots drawn."""
+    figure = Figure(figsize = (10, 8), tight_layout = True)  # figure, not shared with pyplot
+    ax_estimate, ax_error = figure.add_subplot(2, 1, 1), figure.add_subplot(2, 1, 2)  # estimate and error charts
+    exacts = set()                                   # exact values of the variants
+    for label, spec, curve in zip(labels, specs, curves):  # iteration over the variants
+        dots, estimate, st_err = (np.array(c) for c in zip(*curve))  # convergence curve of the variant
+        exact = region_scale(spec)[1]                # exact value, or None
+        line, = ax_estimate.plot(dots, estimate, linewidth = 1, label = label)  # running estimate
+        ax_estimate.fill_between(dots, estimate - 1.96 * st_err, estimate + 1.96 * st_err,
+                                 color = line.get_color(), alpha = 0.15)  # 95% band of the estimate
+        ax_error.plot(dots, st_err if exact is None else np.abs(estimate - exact), linewidth = 1,
+                      color = line.get_color(), label = label)  # error of the running estimate
+        exacts.add(exact)                            # exact value is collected
+    if len(exacts) == 1 and None not in exacts:      # case of a common exact value
+        ax_estimate.axhline(exacts.pop(), color = 'k', linestyle = ':', linewidth = 1)  # exact value
+    ax_estimate.set_xscale('log')                    # dots on log scale
+    ax_estimate.set_ylabel('running estimate')       # y axis label is assigned
+    ax_estimate.set_title('Race of the variants: running estimate (95% band)', fontsize = 12)
+    ax_estimate.grid(linewidth = 0.5)                # chart grid is added
+    ax_estimate.legend(fontsize = 9)                 # legend with the variants
+    ax_error.set_xscale('log')                       # dots on log scale
+    ax_error.set_yscale('log')                       # error on log scale
+    ax_error.set_xlabel('dots drawn')                # x axis label is assigned
+    ax_error.set_ylabel('absolute error (st.err. when no exact value)')  # y axis label is assigned
+    ax_error.grid(linewidth = 0.5)                   # chart grid is added
+    os.makedirs(os.path.dirname(fname), exist_ok=True)  # folder is made if it doesn't exist
+    figure.savefig(fname)                            # chart is saved as image file
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+################# Functions for the calibration (auto-tuning) #####################
+###################################################################################
+
+def load_tuning():
+    """Loads the calibration results (pi_tuning.txt), when made on this machine; else returns an empty dict."""
+    fname = os.path.join(pathlib.Path().resolve(), 'pi_tuning.txt')  # folder and file name for the tuning
+    if not os.path.exists(fname):                    # case the calibration has not been made
+        return {}                                    # empty dict is returned
+    try:                                             # tentative
+        with open(fname, 'r') as f:                  # tuning file is opened in reading mode
+            tuning = json.load(f)                    # json file is parsed to a local dict variable
+    except (OSError, ValueError):                    # case of unreadable file
+        print("Could not load pi_tuning.txt")        # feedback is printed to the terminal
+        return {}                                    # empty dict is returned
+    if tuning.get('host') != socket.gethostname() or tuning.get('cpus') != os.cpu_count():  # other machine
+        print("pi_tuning.txt is from another machine, run --calibrate again")  # feedback is printed to the terminal
+        return {}                                    # empty dict is returned
+    return tuning
+
+
+
+
+
+def tuned_chunk(kernel):
+    """Returns the calibrated chunk for the kernel, or the chunk of the settings when not calibrated."""
+    return int(tuning.get('chunk', {}).get(kernel, settings.get_settings()['chunk']))
+
+
+
+
+
+def time_chunks(kernel, chunks, dots, repeats=3):
+    """Returns the dots/s of the kernel with each chunk (best of repeats). This function is executed
+    by a worker process: the numba JIT isn't made in the main process, that later forks the timed workers."""
+    if kernel == 'numba':                            # case of numba kernel
+        numba_hits(1000, np.zeros(1, dtype = np.int64))  # JIT compilation, not to be timed
+    speeds = []                                      # list for the dots/s of each chunk
+    for chunk in chunks:                             # iteration over the chunks
+        best = 0                                     # best dots/s
+        for repeat in range(repeats):                # iteration over the repetitions
+            rng = make_rng(0, 'PCG64', repeat)       # random generator of the repetition
+            start = time.perf_counter()              # time reference
+            count_hits(dots, rng, kernel, chunk)     # dots in circle (not used)
+            best = max(best, dots / (time.perf_counter() - start))  # best dots/s
+        speeds.append(best)                          # best dots/s of the chunk
+    return speeds
+
+
+
+
+
+def time_workers(kernel, chunk, dots, n_workers):
+    """Returns the dots/s of n_workers worker processes, each one computing 4 runs of dots."""
+    with ProcessPoolExecutor(max_workers = n_workers) as executor:  # pool of worker processes
+        list(executor.map(run_batch, *zip(*[(1000, 0, 'PCG64', kernel, chunk, i, 1)
+                                             for i in range(n_workers)])))  # processes are started (not timed)
+        start = time.perf_counter()                  # time reference
+        futures = [executor.submit(run_batch, dots, 0, 'PCG64', kernel, chunk, 4 * i, 4)
+                   for i in range(n_workers)]        # 4 runs per worker
+        wait_futures(futures)                        # waits the runs to complete
+        return 4 * n_workers * dots / (time.perf_counter() - start)
+
+
+
+
+
+def calibrate(kernel, dots=2**22):
+    """Microbenchmarks a few chunk sizes (per kernel, in a single process) and worker counts (with the kernel
+    and its best chunk), and returns the tuning dict (best chunk per kernel, and workers) and a text table.
+    The best chunk depends on the CPU caches, the best worker count on the cores and the memory bandwidth."""
+    kernels = [k for k in KERNELS if k != 'numba' or numba_available]  # available kernels
+    chunks = [2**14, 2**16, 2**18, 2**20, 2**22]     # chunk sizes to be timed
+    
+    rows = [f"Calibration on {socket.gethostname()} ({os.cpu_count()} CPUs), {dots:,d} dots per timing", '',
+            f"{'kernel':>8}" + ''.join(f"{'chunk ' + str(c):>16}" for c in chunks)]
+    best_chunk = {}                                  # best chunk, by kernel
+    for k in kernels:                                # iteration over the kernels
+        with ProcessPoolExecutor(max_workers = 1) as executor:  # a single worker process
+            speeds = executor.submit(time_chunks, k, chunks, dots).result()  # dots/s of each chunk
+        best_chunk[k] = chunks[int(np.argmax(speeds))]  # fastest chunk
+        rows.append(f"{k:>8}" + ''.join(f"{s:>16,.0f}" for s in speeds))
+    
+    cpus = os.cpu_count() or 1                       # CPU cores
+    candidates = sorted({n for n in (1, 2, 4, 8, 16, 32, 64) if n < cpus} | {cpus})  # worker counts to be timed
+    rows += ['', f"{'workers':>8}{'dots/s':>16}   (kernel {kernel}, chunk {best_chunk[kernel]:,d})"]
+    speeds = []                                      # dots/s of each worker count
+    for n in candidates:                             # iteration over the worker counts
+        speeds.append(time_workers(kernel, best_chunk[kernel], dots, n))  # dots/s with n workers
+        rows.append(f"{n:>8}{speeds[-1]:>16,.0f}")
+    workers = candidates[int(np.argmax(speeds))]     # fastest worker count
+    
+    tuning = {'host': socket.gethostname(),          # machine of the calibration
+              'cpus': os.cpu_count(),                # CPU cores of the machine
+              'date': dt.datetime.now().strftime('%Y%m%d_%H%M%S'),  # date of the calibration
+              'workers': workers,                    # best worker count
+              'chunk': best_chunk}                   # best chunk, by kernel
+    rows += ['', f"Best: {workers} workers, chunk " + ', '.join(f"{c:,d} ({k})" for k, c in best_chunk.items())]
+    return tuning, '\n'.join(rows)
+
+
+
+
+
+def save_tuning(tuning):
+    """Saves the calibration results to pi_tuning.txt (next to pi_settings.txt)."""
+    fname = os.path.join(pathlib.Path().resolve(), 'pi_tuning.txt')  # folder and file name for the tuning
+    with open(fname, 'w') as f:                      # tuning file is opened in writing mode
+        f.write(json.dumps(tuning, indent=1))        # tuning is saved as JSON
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+################# Functions for the memory admission control ######################
+###################################################################################
+
+# bytes per dot of a chunk, and per run, used to estimate the peak memory of a job
+PLOT_BYTES_PER_DOT = 72                              # plotted runs: x, y, distance, cumsum, arange, pi_arr and in_circle
+COUNT_BYTES_PER_DOT = 25                             # counted runs: x and y buffers, raw draws and in_circle
+WORKER_BYTES = 48 * 2**20                            # baseline of a worker process (interpreter and numpy)
+RUN_BYTES = 48                                       # per run, besides the shared results (job result and charts data)
+MIN_CHUNK = 2**14                                    # smallest chunk picked by the admission control
+MAX_DRAW_SECONDS = 3600                              # plotting time above which the animation is lowered to 'min'
+
+
+
+
+
+def available_memory():
+    """Returns the available memory in bytes (MemAvailable of /proc/meminfo, else the free pages),
+    or None when unknown."""
+    try:                                             # tentative
+        with open('/proc/meminfo', 'r') as f:        # memory info of the kernel
+            for line in f:                           # iteration over the memory info lines
+                if line.startswith('MemAvailable:'): # case of available memory line
+                    return int(line.split()[1]) * 1024  # kB are converted to bytes
+    except OSError:                                  # case of systems without /proc/meminfo
+        pass                                         # do nothing
+    try:                                             # tentative
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')  # free memory pages
+    except (ValueError, OSError, AttributeError):    # case the free pages aren't available
+        return None                                  # None is returned
+
+
+
+
+
+def memory_budget(memory_mb):
+    """Returns the memory budget of a job in bytes: memory_mb, or half of the available memory when 0
+    (None when the available memory is unknown)."""
+    if memory_mb > 0:                                # case of configured budget
+        return int(memory_mb * 2**20)
+    available = available_memory()                   # available memory, or None
+    return None if available is None else available // 2
+
+
+
+
+
+def job_memory(runs, dots, chunk, animation, workers):
+    """Returns the estimated peak memory (bytes) of a job: the arrays of one chunk of a plotted run,
+    the worker processes with their chunk buffers (animation 'min'), and the results of the runs."""
+    n = min(chunk, dots)                             # dots of the largest chunk
+    peak = PLOT_BYTES_PER_DOT * n                    # plotted runs (the first one is always plotted)
+    if animation == 'min' and workers > 1 and runs >= 3:  # case the runs are computed by the worker processes
+        peak += workers * (WORKER_BYTES + COUNT_BYTES_PER_DOT * n)  # worker processes and their buffers
+    return peak + runs * (RUN_BYTES + np.dtype(hits_dtype(dots)).itemsize + 1)  # results of the runs
+
+
+
+
+
+def probe_speeds(kernel, chunk):
+    """Returns the dots/s of the kernel (single process, a short timing) and the seconds to draw a dot.
+    The numba kernel is timed via the numpy one, to not compile it before forking the worker processes."""
+    rng = make_rng(0, 'PCG64', 0)                    # random generator of the timing
+    dots = 2**18                                     # dots of the timing
+    start = time.perf_counter()                      # time reference
+    count_hits(dots, rng, 'numpy' if kernel == 'numba' else kernel, min(chunk, dots))  # dots in circle (not used)
+    speed = dots / (time.perf_counter() - start)     # dots/s of the kernel
+    
+    sketch = np.zeros((100, 100, 3), dtype = np.uint8)  # scratch image
+    start = time.perf_counter()                      # time reference
+    for i in range(5000):                            # iteration over the timed dots
+        cv2.circle(sketch, (i % 100, i // 50), 1, (255, 0, 0), -1)  # dot is drawn
+    return speed, (time.perf_counter() - start) / 5000
+
+
+
+
+
+def job_seconds(runs, dots, animation, workers, speed, draw_s):
+    """Returns the estimated seconds of a job: dots drawing of the plotted runs, animation steps and
+    showtime of each run, and the dots counting of the other runs (on the worker processes, if any)."""
+    plotted = runs if animation in ('max', 'med') else min(runs, 2)  # plotted runs
+    stepped = runs if animation == 'max' else 1      # runs plotted with the accelerating steps
+    steps = 100 * math.log(max(dots, 100) / 100 + 1)  # about 100 steps per decade of dots
+    parallel = workers if animation == 'min' and workers > 1 and runs >= 3 else 1  # processes counting the dots
+    showtime = {'min': 0.001, 'med': 0.1, 'max': 1}.get(animation, 0.001)  # showtime of each run, in seconds
+    return (plotted * dots * draw_s + stepped * steps * 0.005 + runs * showtime
+            + (runs - plotted) * dots / (speed * parallel))
+
+
+
+
+
+def admit_job(runs, dots, chunk, animation, workers, budget, speeds, keep_chunk=False, deadline=None):
+    """Memory admission control: estimates the peak memory and the time of a job, and returns the plan as
+    dict (chunk, animation, workers, peak bytes, budget, seconds, admitted, notes explaining the changes).
+    Animations 'max' and 'med' are lowered to 'min' when plotting all the runs would exceed MAX_DRAW_SECONDS
+    (or the time budget). Then, to fit the memory budget, the chunk is halved down to MIN_CHUNK (unless
+    keep_chunk), as the memory of each run is bound to the chunk and not to the dots; and else the runs are
+    counted in this process, without worker processes. Jobs still exceeding the budget are not admitted."""
+    notes = []                                       # list for the decisions, as text
+    limit = MAX_DRAW_SECONDS if deadline is None else min(MAX_DRAW_SECONDS, deadline - time.time())  # plotting limit
+    seconds = job_seconds(runs, dots, animation, workers, *speeds)  # estimated seconds
+    if animation in ('max', 'med') and runs > 2 and seconds > limit:  # case plotting all the runs takes too long
+        min_seconds = job_seconds(runs, dots, 'min', workers, *speeds)  # estimated seconds with animation 'min'
+        notes.append(f"animation lowered from '{animation}' to 'min': plotting all the runs would take about "
+                     f"{timedelta(seconds = round(seconds))}, instead of {timedelta(seconds = round(min_seconds))}")
+        animation, seconds = 'min', min_seconds      # animation and estimated seconds of the job
+    
+    new_chunk, new_workers = chunk, workers          # chunk and worker processes of the job
+    for new_workers in ([workers, 1] if budget is not None and workers > 1 else [workers]):  # with, and without workers
+        new_chunk = chunk                            # requested chunk
+        if budget is not None and not keep_chunk:    # case of known memory budget, and chunk that can change
+            new_chunk = min(chunk, 2**math.ceil(math.log2(max(dots, 1))))  # smallest power of two covering the dots
+            while new_chunk > MIN_CHUNK and job_memory(runs, dots, new_chunk, animation, new_workers) > budget:
+                new_chunk //= 2                      # chunk is halved
+        if budget is None or job_memory(runs, dots, new_chunk, animation, new_workers) <= budget:
+            break                                    # for loop is interrupted (the job fits the budget)
+    
+    if new_chunk >= min(chunk, dots):                # case the chunk isn't lowered below the dots of a run
+        new_chunk = chunk                            # requested chunk is kept
+    else:                                            # case the chunk is lowered
+        notes.append(f"chunk lowered from {chunk:,d} to {new_chunk:,d} dots, to stream each run within "
+                     f"the memory budget")
+    if job_memory(runs, dots, new_chunk, animation, new_workers) < job_memory(runs, dots, new_chunk, animation, workers):
+        notes.append(f"runs counted in this process instead of {workers} worker processes, to fit the "
+                     f"memory budget")
+        seconds = job_seconds(runs, dots, animation, 1, *speeds)  # estimated seconds without workers
+    chunk, workers = new_chunk, new_workers          # chunk and worker processes of the job
+    
+    peak = job_memory(runs, dots, chunk, animation, workers)  # estimated peak memory
+    admitted = budget is None or peak <= budget      # case the job fits the memory budget
+    if not admitted:                                 # case the job doesn't fit the memory budget
+        notes.append(f"not admitted: about {peak / 2**20:,.1f} MB are needed, beyond the memory budget of "
+                     f"{budget / 2**20:,.1f} MB; lower the runs, or raise memory_mb")
+    return {'chunk': chunk, 'animation': animation, 'workers': workers, 'peak': peak, 'budget': budget,
+            'seconds': seconds, 'admitted': admitted, 'notes': notes}
+
+
+
+
+
+def plan_text(plan):
+    """Returns the explanation (text) of the admission plan of a job."""
+    budget = 'unknown' if plan['budget'] is None else f"{plan['budget'] / 2**20:,.1f} MB"  # memory budget
+    lines = [f"Job plan: peak memory about {plan['peak'] / 2**20:,.1f} MB (budget {budget}), "
+             f"time about {timedelta(seconds = round(plan['seconds']))}, chunk {plan['chunk']:,d}, "
+             f"animation '{plan['animation']}'"]
+    return '\n'.join(lines + [f"  - {note}" for note in plan['notes']])
+
+
+
+
+
+def admit_spec(spec, workers):
+    """Memory admission control of the jobs without animation (job server and coordinator), before they
+    are queued or leased: raises ValueError when the estimated peak memory of the job with its worker
+    processes exceeds the memory budget (--memory-mb, else the memory_mb setting)."""
+    memory_mb = settings.get_settings()['memory_mb'] if args.memory_mb is None else args.memory_mb
+    budget = memory_budget(memory_mb)                # memory budget of a job, or None when unknown
+    peak = job_memory(spec['runs'], spec['dots'], spec['chunk'], 'min', workers)  # estimated peak memory
+    if budget is not None and peak > budget:         # case the job doesn't fit the memory budget
+        raise ValueError(f"job not admitted: about {peak / 2**20:,.1f} MB are needed, beyond the memory "
+                         f"budget of {budget / 2**20:,.1f} MB; lower the runs, or raise memory_mb")
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+################# Class for the settings management ###############################
+###################################################################################
+class Settings():
+    def __init__(self):
+        self.s = self.load_settings()                # the dict s is loaded
+        if len(self.s) > 0:                          # case the dict is not empty
+            self.h = int(self.s['h'])                # h is parsed as integer (windows height for the openCV animation)
+            self.wait = int(self.s['wait'])          # wait is parsed as integer (delay to initially slow down the dots plot)
+            self.step = int(self.s['step'])          # step is parsed as integer (delay reduction step of the wait parameter)
+            self.runs = int(self.s['runs'])          # runs is parsed as integer (number of Monte Carlo repetitions)
+            self.dots = int(self.s['dots'])          # dots is parsed as integer (quantity of datapoints, dots when animation)
+            self.animation = str(self.s['animation']) # animation is parsed as string (there are 3 levels of animation)
+            self.timings = str(self.s['timings'])    # timings is parsed as string ('on' to measure the runs phases)
+            self.kernel = str(self.s['kernel'])      # kernel is parsed as string ('numpy', 'integer' or 'numba')
+            self.chunk = int(self.s['chunk'])        # chunk is parsed as integer (dots generated at once)
+            self.seed = str(self.s['seed'])          # seed is parsed as string (empty for a random seed each job)
+            self.sampler = str(self.s['sampler'])    # sampler is parsed as string (bit generator of the dots)
+            self.cache_mb = float(self.s['cache_mb'])  # cache_mb is parsed as float (results cache size limit, 0 disables it)
+            self.thermal_c = float(self.s['thermal_c'])  # thermal_c is parsed as float (temperature ceiling, 0 disables it)
+            self.live_charts = str(self.s['live_charts'])  # live_charts is parsed as string ('on' to chart the runs during a job)
+            self.retention_days = float(self.s['retention_days'])  # retention_days is parsed as float (jobs older are pruned, 0 keeps all)
+            self.memory_mb = float(self.s['memory_mb'])  # memory_mb is parsed as float (memory budget of a job, 0 for half the available)
+            self.render_h = int(self.s['render_h'])  # render_h is parsed as integer (height of the dots layer, 0 for h)
+            self.indicators = str(self.s['indicators'])  # indicators is parsed as string (indicator functions allowed to remote jobs)
+        else:                                        # case the dict is empty
+            self.close_window = True                 # close_window is set True
+            print("Error on loading settings")       # feedback is printe to the terminal
+    
+    
+    
+    
+    
+    def get_settings(self):
+        """Returns the settings s ."""
+        return self.s
+    
+    
+    
+    
+    
+    def load_settings(self):
+        """Loades the settings s ."""
+        s = {}                                       # disct s is created
+        fname = 'pi_settings.txt'                    # file name for the settings
+        folder = pathlib.Path().resolve()            # active folder
+        fname = os.path.join(folder,fname)           # folder and file name for the settings
+        if os.path.exists(fname):                    # case the settings file exists
+            with open(fname, "r") as f:              # settings file is opened in reading mode
+                s = json.load(f)                     # json file is parsed to a local dict variable
+            s = self.parse_settings(s)               # parse the settings
+        else:                                        # case the settings does not file exist
+            print("Could not find pi_settings.txt")  # feedback is printed to the terminal    
+        return s                                     # s (settings) is returned
+    
+    
+    
+    
+    
+    def save_settings(self, s):
+        """Saves the settings s ."""
+        
+        fname = 'pi_settings.txt'               # file name for the settings
+        folder = pathlib.Path().resolve()       # active folder
+        for key, value in s.items():            # iteration through the dict data
+            s[key]=str(value)                   # values of data are converted to string
+        os.umask(0) # The default umask is 0o22 which turns off write permission of group and others
+        fname = os.path.join(folder, fname)     # folder and file name for the settings
+        with open(os.open(fname, os.O_CREAT | os.O_WRONLY, 0o777), 'w') as f:  # settings_backup file is opened in writing mode
+            f.write(json.dumps(s, indent=0))    # content of the setting file is saved in file
+            f.truncate()                        # truncates file (prevents older characters at file-end, if new content is shorter)
+        s = self.parse_settings(s)              # parse the settings
+        return s
+    
+    
+    
+    
+    
+    def parse_settings(self, s):
+        """Parse the settings s ."""
+        s['h'] = int(s['h'])                    # h is parsed as integer (windows height for the openCV animation)
+        s['wait'] = int(s['wait'])              # wait is parsed as integer (delay to initially slow down the dots plot)
+        s['step'] = int(s['step'])              # step is parsed as integer (delay reduction step of the wait parameter)
+        s['runs'] = int(s['runs'])              # runs is parsed as integer (number of Monte Carlo repetitions)
+        s['dots'] = int(s['dots'])              # dots is parsed as integer (quantity of datapoints, dots when animation)
+        s['animation'] = str(s['animation'])    # animation is parsed as string (thre levels of animations)
+        s['timings'] = str(s.get('timings', 'off'))  # timings is parsed as string ('on' to measure the runs phases)
+        s['kernel'] = str(s.get('kernel', 'numpy'))  # kernel is parsed as string ('numpy', 'integer' or 'numba')
+        s['chunk'] = int(s.get('chunk', 2**20))  # chunk is parsed as integer (dots generated at once)
+        s['seed'] = str(s.get('seed', ''))      # seed is parsed as string (empty for a random seed each job)
+        s['sampler'] = str(s.get('sampler', 'PCG64'))  # sampler is parsed as string (bit generator of the dots)
+        s['cache_mb'] = float(s.get('cache_mb', 200))  # cache_mb is parsed as float (results cache size limit, 0 disables it)
+        s['thermal_c'] = float(s.get('thermal_c', 75))  # thermal_c is parsed as float (temperature ceiling, 0 disables it)
+        s['live_charts'] = str(s.get('live_charts', 'on'))  # live_charts is parsed as string ('on' to chart the runs during a job)
+        s['retention_days'] = float(s.get('retention_days', 0))  # retention_days is parsed as float (jobs older are pruned, 0 keeps all)
+        s['memory_mb'] = float(s.get('memory_mb', 0))  # memory_mb is parsed as float (memory budget of a job, 0 for half the available)
+        s['render_h'] = int(s.get('render_h', 0))  # render_h is parsed as integer (height of the dots layer, 0 for h)
+        s['indicators'] = str(s.get('indicators', ''))  # indicators is parsed as string (indicator functions allowed to remote jobs)
+        return s
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+###################### Class for the results cache ################################
+###################################################################################
+
+class ResultCache():
+    """Disk-backed cache of the job results, content-addressed by the job spec and the code version.
+    An entry is made of <key>_result.json, <key>_hits.npy and the eventual <key>_<chart>.png files.
+    The least recently used entries are evicted when the cache folder exceeds max_mb."""
+    
+    def __init__(self, max_mb):
+        self.folder = os.path.join(pathlib.Path().resolve(), 'cache')  # folder of the cache entries
+        self.max_bytes = int(float(max_mb) * 2**20)  # size limit of the cache folder
+        self.enabled = self.max_bytes > 0            # a size limit of zero disables the cache
+        with open(__file__, 'rb') as f:              # this script is opened in binary reading mode
+            self.code = version + '_' + hashlib.sha256(f.read()).hexdigest()[:16]  # code version
+    
+    
+    
+    
+    
+    
+    def cacheable(self, spec):
+        """Returns True when the job is reproducible, therefore its result can be cached.
+        The indicator functions can change without the code version, so their results aren't cached."""
+        return self.enabled and spec.get('indicator') is None
+    
+    
+    
+    
+    
+    
+    def key(self, spec):
+        """Returns the key of a job: hash of the spec values affecting the result, and of the code version."""
+        items = {k: spec[k] for k in ('runs', 'dots', 'seed', 'sampler', 'kernel', 'dim') if k in spec}  # relevant spec (not the chunk)
+        items['code'] = self.code                    # results of different code versions aren't mixed
+        return hashlib.sha256(json.dumps(items, sort_keys=True).encode()).hexdigest()[:32]
+    
+    
+    
+    
+    
+    
+    def get(self, spec):
+        """Returns the cached result of the job (also marking it as recently used), or None."""
+        if not self.cacheable(spec):                 # case the job can't be cached
+            return None                              # None is returned
+        fname = os.path.join(self.folder, self.key(spec))  # entry name (without suffix)
+        try:                                         # tentative
+            result = load_result(fname)              # cached result is loaded
+            os.utime(fname + '_result.json')         # entry access time, used for the LRU eviction
+        except (OSError, ValueError, KeyError):      # case of missing or damaged entry
+            return None                              # None is returned
+        return result
+    
+    
+    
+    
+    
+    
+    def put(self, spec, result):
+        """Stores the result of a completed job, and evicts the least recently used entries if needed."""
+        if not self.cacheable(spec) or result['runs_made'] != spec['runs']:  # case of not cacheable job
+            return                                   # function is exited
+        os.makedirs(self.folder, exist_ok=True)      # folder is made if it doesn't exist
+        fname = os.path.join(self.folder, self.key(spec))  # entry name (without suffix)
+        save_result(result, fname)                   # result is saved into the cache
+        self.evict(keep = self.key(spec))            # cache size is kept within the limit
+    
+    
+    
+    
+    
+    
+    def add_chart(self, spec, name, fname):
+        """Stores a chart image (fname) of a cached job, as <key>_<name>.png ."""
+        if spec is None or not self.cacheable(spec):  # case of not cacheable job
+            return                                   # function is exited
+        entry = os.path.join(self.folder, self.key(spec))  # entry name (without suffix)
+        if os.path.exists(entry + '_result.json') and os.path.exists(fname):  # case the entry and chart exist
+            shutil.copyfile(fname, f"{entry}_{name}.png")  # chart is copied into the cache
+            self.evict(keep = self.key(spec))        # cache size is kept within the limit
+    
+    
+    
+    
+    
+    
+    def copy_charts(self, spec, datetime):
+        """Copies the cached charts of a job to the charts folder, named by datetime.
+        Returns the names of the copied charts."""
+        entry = os.path.join(self.folder, self.key(spec))  # entry name (without suffix)
+        folder = os.path.join(pathlib.Path().resolve(), 'charts')  # folder to store the chart images
+        names = []                                   # list for the copied charts
+        for name in ('histogram', 'error', 'st_dev'):  # iteration over the charts
+            if os.path.exists(f"{entry}_{name}.png"):  # case the chart is cached
+                os.makedirs(folder, exist_ok=True)   # folder is made if it doesn't exist
+                shutil.copyfile(f"{entry}_{name}.png", os.path.join(folder, f"{datetime}_{name}.png"))
+                names.append(name)                   # chart name is appended
+        return names
+    
+    
+    
+    
+    
+    
+    def evict(self, keep=None):
+        """Removes the least recently used entries (except keep), until the cache is within the size limit."""
+        entries = {}                                 # dict with size and last use time, by entry key
+        for f in os.listdir(self.folder):            # iteration over the cache files
+            path = os.path.join(self.folder, f)      # cache file with folder
+            if not os.path.isfile(path):             # case of folder (i.e. the slides cache)
+                continue                             # next file
+            key = f.split('_')[0]                    # entry key of the file
+            size, last_use = entries.get(key, (0, 0))  # entry size and last use, so far
+            stat = os.stat(path)                     # file size and times
+            if f.endswith('_result.json'):           # case of the result file (touched when used)
+                last_use = stat.st_mtime             # last use of the entry
+            entries[key] = (size + stat.st_size, last_use)  # entry size and last use are updated
+        
+        total = sum(size for size, _ in entries.values())  # cache size
+        for key, (size, _) in sorted(entries.items(), key=lambda e: e[1][1]):  # entries, least recently used first
+            if total <= self.max_bytes:              # case the cache is within the size limit
+                break                                # for loop is interrupted
+            if key == keep:                          # case of the entry to keep
+                continue                             # entry is skipped
+            for f in os.listdir(self.folder):        # iteration over the cache files
+                if f.split('_')[0] == key:           # case the file belongs to the entry
+                    os.remove(os.path.join(self.folder, f))  # file is removed
+            total -= size                            # cache size is updated
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+###################### Class for the jobs catalog #################################
+###################################################################################
+
+class JobCatalog():
+    """Index of the past jobs (SQLite, pi_catalog.db), with the job spec, the summary statistics, the
+    timings, the host and the paths of the artifacts (result files, pi values log, timings, profile and
+    charts), named by the job datetime. It is queried by dots, runs, kernel, host and date (indexed), and
+    the jobs older than the retention days are pruned together with their artifacts.
+    The jobs already in the logs folder are indexed when the catalog is created."""
+    
+    def __init__(self, fname='pi_catalog.db'):
+        self.fname = os.path.join(pathlib.Path().resolve(), fname)  # folder and file name of the catalog
+        self.host = socket.gethostname()             # host running the jobs
+        new = not os.path.exists(self.fname)         # case the catalog is created now
+        self.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                            id INTEGER PRIMARY KEY, datetime TEXT UNIQUE, created REAL, host TEXT,
+                            version TEXT, source TEXT, runs INTEGER, dots INTEGER, sampler TEXT, kernel TEXT,
+                            chunk INTEGER, seed TEXT, runs_made INTEGER, pi REAL, st_dev REAL, error REAL,
+                            seconds REAL, dots_per_s REAL, ci_low REAL, ci_high REAL, timings TEXT, result TEXT,
+                            dim INTEGER DEFAULT 2, indicator TEXT)""")
+        self.migrate()                               # region columns are added to the catalogs made before them
+        self.execute("CREATE INDEX IF NOT EXISTS jobs_dots ON jobs (dots, created)")  # queries by dots and date
+        self.execute("CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created)")  # queries by date, and pruning
+        self.execute("""CREATE TABLE IF NOT EXISTS artifacts (
+                            datetime TEXT, kind TEXT, path TEXT, PRIMARY KEY (datetime, kind))""")
+        if new:                                      # case the catalog is created now
+            self.import_logs()                       # the jobs in the logs folder are indexed
+    
+    
+    
+    
+    
+    
+    def execute(self, sql, params=(), many=False):
+        """Executes a statement on a new connection (the catalog is used by the GUI and the Monte Carlo
+        threads), and returns the fetched rows as dicts."""
+        db = sqlite3.connect(self.fname, timeout = 10)  # connection to the catalog
+        db.row_factory = sqlite3.Row                 # rows are accessed by column name
+        try:                                         # tentative
+            with db:                                 # the statement is committed (or rolled back on errors)
+                cursor = db.executemany(sql, params) if many else db.execute(sql, params)
+                return [dict(row) for row in cursor.fetchall()]
+        finally:                                     # in any case
+            db.close()                               # the connection is closed
+    
+    
+    
+    
+    
+    
+    def migrate(self):
+        """Adds the region columns (dim and indicator) to a catalog made before them, filled from the
+        result files of the indexed jobs (2 and None when the file is missing)."""
+        columns = {c['name'] for c in self.execute("PRAGMA table_info(jobs)")}  # columns of the jobs table
+        if 'dim' in columns:                         # case of up to date catalog
+            return                                   # function is exited
+        self.execute("ALTER TABLE jobs ADD COLUMN dim INTEGER DEFAULT 2")  # dimensions of the region
+        self.execute("ALTER TABLE jobs ADD COLUMN indicator TEXT")  # indicator function of the region, or NULL
+        regions = []                                 # region of the indexed jobs, from their result files
+        for job in self.execute("SELECT datetime, result FROM jobs"):  # iteration over the indexed jobs
+            try:                                     # tentative
+                with open(job['result'] + '_result.json', 'r') as fr:  # opens the summary file in reading mode
+                    spec = json.load(fr)['spec']     # job spec
+            except (OSError, ValueError, KeyError):  # case of missing or damaged result
+                continue                             # next job (default region)
+            regions.append((spec.get('dim', 2), spec.get('indicator'), job['datetime']))
+        self.execute("UPDATE jobs SET dim = ?, indicator = ? WHERE datetime = ?", regions, many=True)
+    
+    
+    
+    
+    
+    
+    def add(self, result, fname, source, timings=None):
+        """Adds the job result saved as fname (without the _result.json suffix), made by source
+        ('gui', 'cache', 'extend', 'coordinator' or 'export'), with the eventual timings per phase."""
+        datetime = os.path.basename(fname)           # datetime of the job (name of its artifacts)
+        spec, ci = result['spec'], (result.get('ci') or {}).get('bca', (None, None))  # job spec and BCa interval
+        self.execute("INSERT OR REPLACE INTO jobs VALUES (NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                     (datetime, datetime_seconds(datetime), self.host, result.get('version'), source, spec['runs'],
+                      spec['dots'], spec['sampler'], spec['kernel'], spec['chunk'], str(spec['seed']),
+                      result['runs_made'], result.get('pi'), result.get('st_dev'), result.get('error'),
+                      result['seconds'], result.get('dots_per_s'), ci[0], ci[1],
+                      json.dumps(timings) if timings else None, fname, spec.get('dim', 2), spec.get('indicator')))
+    
+    
+    
+    
+    
+    
+    def add_artifact(self, datetime, kind, fname):
+        """Records an artifact (file fname) of the job made at datetime: 'log', 'timings', 'profile' or a chart."""
+        self.execute("INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?)", (datetime, kind, fname))
+    
+    
+    
+    
+    
+    
+    def import_logs(self):
+        """Indexes the job results in the logs folder, with their artifacts in the logs and charts folders."""
+        folders = [os.path.join(pathlib.Path().resolve(), f) for f in ('logs', 'charts')]  # artifacts folders
+        if not os.path.exists(folders[0]):           # case the logs folder does not exist
+            return                                   # function is exited
+        for f in sorted(os.listdir(folders[0])):     # iteration over the logs files
+            if not f.endswith('_result.json'):       # case the file isn't a job result
+                continue                             # next file
+            fname = os.path.join(folders[0], f[:-len('_result.json')])  # result name (without suffix)
+            try:                                     # tentative
+                with open(fname + '_result.json', 'r') as fr:  # opens the summary file in reading mode
+                    self.add(json.load(fr), fname, 'import')  # job is indexed
+            except (OSError, ValueError, KeyError):  # case of damaged result
+                continue                             # next file
+            datetime = os.path.basename(fname)       # datetime of the job
+            for folder in folders:                   # iteration over the artifacts folders
+                for a in os.listdir(folder) if os.path.exists(folder) else []:  # iteration over the files
+                    kind = os.path.splitext(a[len(datetime) + 1:])[0]  # artifact kind (i.e. 'log', 'histogram')
+                    if a.startswith(datetime + '_') and kind not in ('result', 'hits'):  # case of job artifact
+                        self.add_artifact(datetime, kind, os.path.join(folder, a))
+    
+    
+    
+    
+    
+    
+    def query(self, runs=None, dots=None, kernel=None, host=None, since=None, until=None, limit=None):
+        """Returns the jobs matching the filters (None matches all), latest first.
+        since and until are dates as YYYY-MM-DD, until included."""
+        where, params = [], []                       # conditions and their parameters
+        for column, value in (('runs', runs), ('dots', dots), ('kernel', kernel), ('host', host)):
+            if value is not None:                    # case of filter on the column
+                where.append(f"{column} = ?")        # condition on the column
+                params.append(value)                 # parameter of the condition
+        if since is not None:                        # case of filter on the first date
+            where.append("created >= ?")             # condition on the job date
+            params.append(dt.datetime.strptime(since, '%Y-%m-%d').timestamp())
+        if until is not None:                        # case of filter on the last date
+            where.append("created < ?")              # condition on the job date
+            params.append((dt.datetime.strptime(until, '%Y-%m-%d') + timedelta(days=1)).timestamp())
+        sql = "SELECT * FROM jobs" + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY created DESC"
+        if limit is not None:                        # case of limited quantity of jobs
+            sql += f" LIMIT {int(limit)}"            # latest jobs only
+        return self.execute(sql, params)
+    
+    
+    
+    
+    
+    
+    def get(self, ids):
+        """Returns the jobs with the ids in argument, in the same order (missing ids are skipped)."""
+        jobs = {j['id']: j for j in self.execute(f"SELECT * FROM jobs WHERE id IN ({','.join('?' * len(ids))})", ids)}
+        return [jobs[i] for i in ids if i in jobs]
+    
+    
+    
+    
+    
+    
+    def artifacts(self, datetime):
+        """Returns the paths of the artifacts of the job made at datetime, by kind."""
+        return {a['kind']: a['path'] for a in self.execute("SELECT * FROM artifacts WHERE datetime = ?", (datetime,))}
+    
+    
+    
+    
+    
+    
+    def prune(self, days):
+        """Removes the jobs older than days, with their result files and artifacts.
+        Returns the quantity of removed jobs."""
+        jobs = self.execute("SELECT datetime, result FROM jobs WHERE created < ?", (time.time() - 86400 * days,))
+        for job in jobs:                             # iteration over the jobs to remove
+            paths = list(self.artifacts(job['datetime']).values())  # artifacts of the job
+            paths += [job['result'] + '_result.json', job['result'] + '_hits.npy']  # result files of the job
+            for path in paths:                       # iteration over the files of the job
+                if os.path.isfile(path):             # case the file still exists
+                    os.remove(path)                  # file is removed
+        datetimes = [(job['datetime'],) for job in jobs]  # datetimes of the removed jobs
+        self.execute("DELETE FROM artifacts WHERE datetime = ?", datetimes, many=True)
+        self.execute("DELETE FROM jobs WHERE datetime = ?", datetimes, many=True)
+        return len(jobs)
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+################# Functions for the jobs catalog tables ###########################
+###################################################################################
+
+def datetime_seconds(datetime):
+    """Returns the seconds since epoch of a datetime reference (YYYYmmdd_HHMMSS, as used in the file names)."""
+    return dt.datetime.strptime(datetime[:15], '%Y%m%d_%H%M%S').timestamp()
+
+
+
+
+
+def jobs_table(jobs):
+    """Returns the table (text) of the jobs of the catalog, one row per job."""
+    rows = [f"{'id':>6}  {'datetime':<16}{'host':<14}{'region':<14}{'runs':>12}{'dots':>15}{'kernel':>9}"
+            f"{'estimate':>13}{'error':>13}{'st.dev':>12}{'seconds':>10}{'dots/s':>15}"]
+    for j in jobs:                                   # iteration over the jobs
+        rows.append(f"{j['id']:>6}  {j['datetime']:<16}{j['host'][:13]:<14}{region_label(j)[:13]:<14}"
+                    f"{j['runs_made']:>12,d}{j['dots']:>15,d}{j['kernel']:>9}{j['pi'] or 0:>13.8f}{j['error'] or 0:>13.8f}{j['st_dev'] or 0:>12.8f}"
+                    f"{j['seconds']:>10.1f}{j['dots_per_s'] or 0:>15,.0f}")
+    rows.append(f"\n{len(jobs):,d} jobs")          # quantity of listed jobs
+    return '\n'.join(rows)
+
+
+
+
+
+def compare_table(jobs):
+    """Returns the table (text) comparing the jobs side by side. The z-scores compare each job mean with
+    the mean of the first job of the same region, in units of standard error (|z| above 3 is a significant
+    difference): the estimates of different regions aren't compared."""
+    refs = {}                                        # first job of each region, reference of its z-scores
+    for j in jobs:                                   # iteration over the jobs
+        refs.setdefault(region_label(j), j)          # the first job of the region is its reference
+    fields = [('datetime', '{}'), ('host', '{}'), ('version', '{}'), ('source', '{}'), ('region', '{}'),
+              ('runs_made', '{:,d}'), ('dots', '{:,d}'), ('sampler', '{}'), ('kernel', '{}'), ('chunk', '{:,d}'),
+              ('seed', '{}'), ('estimate', '{:.8f}'), ('error', '{:.8f}'), ('st_dev', '{:.8f}'),
+              ('ci_low', '{:.8f}'), ('ci_high', '{:.8f}'), ('seconds', '{:.1f}'),
+              ('dots_per_s', '{:,.0f}')]             # compared fields, and format
+    rows = [f"{'job':<12}" + ''.join(f"{j['id']:>22}" for j in jobs)]
+    jobs = [dict(j, region = region_label(j), estimate = j['pi']) for j in jobs]  # jobs with region and estimate
+    for field, fmt in fields:                        # iteration over the compared fields
+        values = [fmt.format(j[field]) if j[field] is not None else '-' for j in jobs]  # formatted values
+        rows.append(f"{field:<12}" + ''.join(f"{v[-21:]:>22}" for v in values))
+    z = []                                           # z-scores of the job means vs the first job mean of the region
+    for j in jobs:                                   # iteration over the jobs
+        ref = refs[j['region']]                      # first job of the same region
+        if j['id'] == ref['id'] or any(k['runs_made'] == 0 or k['pi'] is None for k in (j, ref)):
+            z.append('-')                            # '-' for the reference, and for the jobs without runs
+            continue                                 # next job
+        se = math.sqrt((j['st_dev'] or 0)**2 / j['runs_made'] + (ref['st_dev'] or 0)**2 / ref['runs_made'])
+        z.append(f"{(j['pi'] - ref['pi']) / se:.2f}" if se > 0 else '-')  # z-score, or '-' for equal jobs
+    rows.append(f"{'z vs first':<12}" + ''.join(f"{v:>22}" for v in z))
+    return '\n'.join(rows)
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+###################### Class for the shared results ###############################
+###################################################################################
+
+class SharedResults():
+    """Results of the runs of a job in shared memory: dots in circle (uint32, or uint64 above 2^32 - 1 dots)
+    and done flag (uint8) of each run, plus an atomic counter of the completed runs. As dots is constant
+    within a job, the dots in circle fully describe each run (5 bytes per run): the estimated pi, mean and
+    variance are derived from them on demand. Worker processes write their runs in place (run_shared_batch),
+    and the GUI and the charts read zero-copy views of the completed runs, without pickling nor copying."""
+    
+    def __init__(self, runs, dots, counter):
+        self.runs = runs                             # quantity of runs of the job
+        self.dots = dots                             # dots per run
+        self.counter = counter                       # atomic counter of the completed runs (multiprocessing.Value)
+        size = (np.dtype(hits_dtype(dots)).itemsize + 1) * runs  # bytes of the dots in circle and done flags
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, size))  # shared memory block
+        self.name = self.shm.name                    # name of the block, used by the worker processes to attach it
+        self.hits, self.done = shared_views(self.shm.buf, runs, dots)  # arrays on the shared memory
+        self.done[:] = 0                             # no runs are completed
+        self.prefix = 0                              # quantity of runs completed, from the first one without gaps
+        with counter.get_lock():                     # the counter is locked
+            counter.value = 0                        # the counter is reset
+    
+    
+    
+    
+    
+    
+    def put(self, run, hits):
+        """Stores the dots in circle of a run computed in this process."""
+        self.hits[run] = hits                        # dots in circle of the run
+        self.done[run] = 1                           # run is flagged as completed
+        with self.counter.get_lock():                # the counter is locked
+            self.counter.value += 1                  # completed runs are incremented
+    
+    
+    
+    
+    
+    
+    def load(self, hits_results):
+        """Stores the dots in circle of the first runs (from a previous job, or from the results cache)."""
+        n = len(hits_results)                        # quantity of runs to store
+        self.hits[:n] = hits_results                 # dots in circle of the runs
+        self.done[:n] = 1                            # runs are flagged as completed
+        with self.counter.get_lock():                # the counter is locked
+            self.counter.value += n                  # completed runs are incremented
+    
+    
+    
+    
+    
+    
+    def progress(self):
+        """Returns the quantity of completed runs (read from the shared counter)."""
+        return self.counter.value
+    
+    
+    
+    
+    
+    
+    def completed(self):
+        """Returns a zero-copy view (hits array) of the completed runs, from the first run up to
+        the first one not yet completed (the worker processes can complete the runs out of order)."""
+        if self.prefix < self.runs:                  # case not all the runs are known as completed
+            not_done = np.flatnonzero(self.done[self.prefix:] == 0)  # runs not completed, after the prefix
+            self.prefix = self.runs if len(not_done) == 0 else self.prefix + int(not_done[0])
+        return self.hits[:self.prefix]
+    
+    
+    
+    
+    
+    
+    def release(self):
+        """Unlinks the shared memory block, and closes it. Returns False when the block can't be closed
+        yet, because views of it are still in use (the release can be retried later)."""
+        if self.hits is not None:                    # case the block isn't unlinked yet
+            self.hits = self.done = None             # arrays on the shared memory are released
+            self.shm.unlink()                        # the block is removed (memory is freed once closed)
+        try:                                         # tentative
+            self.shm.close()                         # the block is closed
+        except BufferError:                          # case there are views still in use
+            return False                             # False is returned
+        return True
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+################# Functions for the thermal monitoring ############################
+###################################################################################
+
+def read_temperature():
+    """Returns the highest temperature of the thermal zones (/sys/class/thermal) in °C, or None."""
+    folder = '/sys/class/thermal'                    # folder of the thermal zones
+    temps = []                                       # list for the zones temperatures
+    try:                                             # tentative
+        zones = [z for z in os.listdir(folder) if z.startswith('thermal_zone')]  # thermal zones
+    except OSError:                                  # case the folder does not exist
+        return None                                  # None is returned
+    for zone in zones:                               # iteration over the thermal zones
+        try:                                         # tentative
+            with open(os.path.join(folder, zone, 'temp')) as f:  # zone temperature file
+                temps.append(int(f.read()) / 1000)   # temperature in m°C is converted to °C
+        except (OSError, ValueError):                # case the zone can't be read
+            pass                                     # do nothing
+    return max(temps) if temps else None
+
+
+
+
+
+def read_throttled():
+    """Returns the throttling flags of the Raspberry Pi firmware (vcgencmd get_throttled), or None.
+    Bit 0: under-voltage, bit 1: arm frequency capped, bit 2: throttled, bit 3: soft temperature limit;
+    bits 16 to 19 flag the same conditions occurred since boot."""
+    try:                                             # tentative
+        out = subprocess.run(['vcgencmd', 'get_throttled'], capture_output=True, text=True, timeout=2).stdout
+        return int(out.strip().split('=')[1], 16)    # output is like 'throttled=0x50000'
+    except (OSError, subprocess.SubprocessError, IndexError, ValueError):  # case vcgencmd isn't available
+        return None
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+###################### Class for the thermal scheduling ###########################
+###################################################################################
+
+class ThermalGovernor():
+    """Adapts the active worker processes to stay below a temperature ceiling (i.e. a Raspberry Pi in
+    its enclosure). Every interval seconds the temperature, the firmware throttling state and the
+    throughput are sampled: above the ceiling (or when throttled) a worker is paused and the chunk
+    halved, below the ceiling minus the hysteresis they are restored, one step at a time.
+    The samples give the sustained throughput vs temperature of the job."""
+    
+    def __init__(self, workers, ceiling, enabled=True, interval=2, hysteresis=5):
+        self.max_workers = workers                   # quantity of worker processes of the pool
+        self.ceiling = ceiling                       # temperature ceiling in °C
+        self.interval = interval                     # seconds between the samples
+        self.hysteresis = hysteresis                 # °C below the ceiling, to restore workers and chunk
+        self.enabled = enabled and ceiling > 0 and read_temperature() is not None  # case of usable sensor
+        self.reset()                                 # job variables are initialized
+    
+    
+    
+    
+    
+    
+    def reset(self, chunk=2**20):
+        """Clears the samples, and restores all the workers and the chunk of the new job."""
+        self.base_chunk = chunk                      # chunk of the job (upper limit for the adapted one)
+        self.active = self.max_workers               # active worker processes
+        self.chunk = self.base_chunk                 # adapted chunk (the dots of a run don't depend on the chunk)
+        self.samples = []                            # (seconds, °C, active workers, dots, throttled) per sample
+        self.last = None                             # time and completed runs at the last sample
+    
+    
+    
+    
+    
+    
+    def update(self, runs_done, dots):
+        """Takes a sample (when interval seconds are elapsed), and adapts the active workers and the chunk."""
+        if not self.enabled:                         # case the governor isn't enabled
+            return                                   # function is exited
+        now = time.time()                            # current time
+        if self.last is None or now - self.last[0] < self.interval:  # case of first call, or too early
+            self.last = self.last or (now, runs_done)  # reference for the first sample
+            return                                   # function is exited
+        
+        temp = read_temperature()                    # current temperature
+        flags = read_throttled()                     # current throttling flags (None if not a Raspberry Pi)
+        throttled = flags is not None and flags & 0b1110 != 0  # case frequency is capped or throttled now
+        self.samples.append((now - self.last[0], temp, self.active, (runs_done - self.last[1]) * dots, throttled))
+        self.last = (now, runs_done)                 # reference for the next sample
+        
+        if temp is not None and (temp >= self.ceiling or throttled):  # case of too hot
+            self.active = max(1, self.active - 1)    # a worker is paused
+            self.chunk = max(2**14, self.chunk // 2) # chunk is halved
+        elif temp is not None and temp < self.ceiling - self.hysteresis:  # case of enough margin
+            self.active = min(self.max_workers, self.active + 1)  # a worker is resumed
+            self.chunk = min(self.base_chunk, self.chunk * 2)  # chunk is doubled
+    
+    
+    
+    
+    
+    
+    def summary(self):
+        """Returns the sustained throughput per temperature band (5 °C), as list of dicts."""
+        bands = {}                                   # seconds, dots, worker-seconds, throttled seconds, by band
+        for seconds, temp, active, dots, throttled in self.samples:  # iteration over the samples
+            if temp is None:                         # case the temperature couldn't be read
+                continue                             # next sample
+            band = bands.setdefault(5 * int(temp // 5), [0, 0, 0, 0])  # band of the sample
+            band[0] += seconds                       # seconds in the band
+            band[1] += dots                          # dots computed in the band
+            band[2] += active * seconds              # worker-seconds in the band
+            band[3] += seconds if throttled else 0   # throttled seconds in the band
+        return [{'temp_c': f"{b}-{b+5}", 'seconds': round(s, 1), 'dots_per_s': round(d / s),
+                 'workers': round(w / s, 1), 'throttled_s': round(t, 1)}
+                for b, (s, d, w, t) in sorted(bands.items())]
+    
+    
+    
+    
+    
+    
+    def table(self):
+        """Returns the throughput vs temperature as text table."""
+        lines = [f"{'temp °C':>8}  {'seconds':>8}  {'dots/s':>13}  {'workers':>7}  {'throttled s':>11}"]
+        for band in self.summary():                  # iteration over the temperature bands
+            lines.append(f"{band['temp_c']:>8}  {band['seconds']:>8.1f}  {band['dots_per_s']:>13,d}  "
+                         f"{band['workers']:>7.1f}  {band['throttled_s']:>11.1f}")
+        return '\n'.join(lines)
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+###################### Class for the batches scheduling ###########################
+###################################################################################
+
+class BatchScheduler():
+    """Submits the batches of runs to a pool of worker processes, keeping at most governor.active of them
+    running: the next batch is submitted as soon as a running one completes (future done callback),
+    and when the governor resumes a worker (schedule is called again by the polling loop).
+    With a deadline (time budget) the batches are cut to the runs expected to complete in time, per the
+    measured seconds per run (single run batches until measured), and the later runs are dropped."""
+    
+    def __init__(self, batches, submit, governor, deadline=None):
+        self.batches = deque(batches)                # (first_run, n_runs) of the batches to be submitted
+        self.submit = submit                         # function submitting a batch, returning its future
+        self.governor = governor                     # thermal governor, setting the active workers
+        self.deadline = deadline                     # time by which the runs have to be completed, or None
+        self.futures = {}                            # n_runs of the submitted batches, by future
+        self.started = {}                            # submission time of the batches, by future
+        self.run_seconds = None                      # measured seconds per run, on one worker
+        self.lock = RLock()                          # lock, as the done callbacks run on the executor thread
+        self.schedule()                              # the first batches are submitted
+    
+    
+    
+    
+    
+    
+    def schedule(self, _future=None):
+        """Submits batches, until the running ones are as many as the active workers.
+        When called on a batch completion (_future), the seconds per run are measured."""
+        with self.lock:                              # the batches and futures are locked
+            if _future is not None and not _future.cancelled() and _future.exception() is None:
+                seconds = (time.time() - self.started[_future]) / self.futures[_future]  # seconds per run
+                self.run_seconds = seconds if self.run_seconds is None else (self.run_seconds + seconds) / 2
+            
+            while self.batches and sum(not f.done() for f in self.futures) < self.governor.active:
+                first_run, n_runs = self.batches.popleft()  # next batch
+                if self.deadline is not None:        # case of time budget
+                    fit = self.fit(n_runs)           # runs of the batch expected to complete in time
+                    if fit == 0:                     # case no more runs complete in time
+                        self.batches.clear()         # the remaining batches are dropped
+                        break                        # while loop is interrupted
+                    if fit < n_runs:                 # case the batch is cut
+                        self.batches.appendleft((first_run + fit, n_runs - fit))  # remaining runs of the batch
+                        n_runs = fit                 # runs of the submitted batch
+                future = self.submit(first_run, n_runs)  # batch is submitted
+                self.futures[future] = n_runs        # future is stored
+                self.started[future] = time.time()   # submission time of the batch
+                future.add_done_callback(self.schedule)  # next batch is submitted on completion
+    
+    
+    
+    
+    
+    
+    def fit(self, n_runs):
+        """Returns how many runs of a batch are expected to complete before the deadline (1 until measured)."""
+        remaining = self.deadline - time.time()      # seconds before the deadline
+        if remaining <= 0:                           # case the deadline is passed
+            return 0
+        if self.run_seconds is None:                 # case the seconds per run are not measured yet
+            return 1                                 # single run batch
+        return min(n_runs, int(remaining / self.run_seconds))
+    
+    
+    
+    
+    
+    
+    def done(self):
+        """Returns True when all the batches are completed (or cancelled)."""
+        with self.lock:                              # the batches and futures are locked
+            return not self.batches and all(f.done() for f in self.futures)
+    
+    
+    
+    
+    
+    
+    def runs_done(self):
+        """Returns the runs of the completed batches."""
+        with self.lock:                              # the batches and futures are locked
+            return sum(n for f, n in self.futures.items() if f.done() and not f.cancelled())
+    
+    
+    
+    
+    
+    
+    def cancel(self):
+        """Drops the batches not yet submitted, and cancels the ones not yet started."""
+        with self.lock:                              # the batches and futures are locked
+            self.batches.clear()                     # batches not yet submitted are dropped
+            for future in self.futures:              # iteration over the submitted batches
+                future.cancel()                      # batch is cancelled, if not yet started
+    
+    
+    
+    
+    
+    
+    def wait(self):
+        """Waits the started batches to complete, raising the eventual errors of the worker processes.
+        Returns the futures of the batches, in submission order."""
+        futures = list(self.futures)                 # futures of the submitted batches
+        wait_futures(futures)                        # waits the started batches to complete
+        for future in futures:                       # iteration over the batches
+            if not future.cancelled():               # case the batch has been computed
+                future.result()                      # eventual errors of the worker processes are raised
+        return futures
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+################# Functions for the animation export ##############################
+###################################################################################
+
+def encode_video(fname, fps, size, frames):
+    """Encoder process of the animation export: writes the frames received from the queue (frame and
+    quantity of repetitions) to the video file, until None is received. The codec follows the extension."""
+    fourcc = cv2.VideoWriter_fourcc(*('MJPG' if fname.lower().endswith('.avi') else 'mp4v'))  # video codec
+    writer = cv2.VideoWriter(fname, fourcc, fps, size)  # video writer
+    while True:                                      # iteration over the received frames
+        item = frames.get()                          # frame and its repetitions, or None
+        if item is None:                             # case the animation is completed
+            break                                    # while loop is interrupted
+        frame, repeat = item                         # frame and its repetitions
+        for _ in range(repeat):                      # iteration over the repetitions
+            writer.write(frame)                      # frame is encoded
+    writer.release()                                 # the video file is closed
+
+
+
+
+
+def quantize_frame(frame):
+    """Converts a BGR frame to a palette image (256 colors), as used by the GIF format."""
+    return Image.fromarray(frame[:, :, ::-1]).quantize(colors = 256)  # RGB image is reduced to a palette
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+###################### Class for the animation export #############################
+###################################################################################
+
+class Exporter():
+    """Offline renderer of the Monte Carlo animation: the sketches are written to a video file (.mp4, .avi)
+    or to an animated GIF, instead of being shown. The waits of the animation are turned into a video
+    clock, so the video plays at the on-screen speed while it is rendered as fast as possible: only the
+    sketches at the frame times are encoded, and a sketch shown for longer is repeated.
+    The video frames are encoded by a separate process; the GIF frames are quantized by a pool of processes,
+    and the repeated sketches become a single GIF frame with a longer duration."""
+    
+    def __init__(self, fname, fps, size, workers):
+        self.fname = fname                           # video file name
+        self.fps = fps                               # frames per second of the video
+        self.gif = fname.lower().endswith('.gif')    # case of animated GIF
+        self.clock = 0                               # video clock in ms (sum of the waits)
+        self.frames = 0                              # frames emitted so far
+        self.last = None                             # last emitted sketch (GIF), to merge the repeated ones
+        self.workers = max(1, workers)               # quantity of processes quantizing the GIF frames
+        if self.gif:                                 # case of animated GIF
+            self.pool = multiprocessing.Pool(self.workers)  # processes quantizing the frames
+            self.backlog = deque()                   # frames being quantized (async result, duration in ms)
+            self.images = []                         # quantized frames
+            self.durations = []                      # duration in ms of each quantized frame
+        else:                                        # case of video file
+            self.queue = multiprocessing.Queue(maxsize = 32)  # frames to be encoded (bounded)
+            self.encoder = multiprocessing.Process(target = encode_video,
+                                                   args = (fname, fps, size, self.queue))  # encoder process
+            self.encoder.start()                     # the encoder process is started
+    
+    
+    
+    
+    
+    
+    def add(self, sketch, wait):
+        """Adds a sketch shown for wait ms: it's emitted for the frame times falling in its showtime."""
+        self.clock += wait                           # video clock is advanced
+        repeat = int(self.clock * self.fps / 1000) - self.frames  # frames covered by this sketch
+        if repeat <= 0:                              # case no frame time within the showtime
+            return                                   # function is exited (sketch is skipped)
+        self.frames += repeat                        # emitted frames are updated
+        
+        if not self.gif:                             # case of video file
+            self.queue.put((sketch.copy(), repeat))  # a copy of the sketch is sent to the encoder
+            return
+        
+        duration = 1000 * repeat / self.fps          # GIF frame duration in ms
+        if self.last is not None and np.array_equal(sketch, self.last):  # case the sketch is unchanged
+            if self.backlog:                         # case the previous frame is being quantized
+                self.backlog[-1][1] += duration      # the previous frame lasts longer
+            else:                                    # case the previous frame is already quantized
+                self.durations[-1] += duration       # the previous frame lasts longer
+            return
+        self.last = sketch.copy()                    # a copy of the sketch is kept
+        self.backlog.append([self.pool.apply_async(quantize_frame, (self.last,)), duration])
+        while len(self.backlog) > 4 * self.workers:  # case of too many frames being quantized
+            self.collect()                           # the oldest frame is collected
+    
+    
+    
+    
+    
+    
+    def collect(self):
+        """Collects the oldest frame being quantized (GIF)."""
+        result, duration = self.backlog.popleft()    # oldest frame being quantized
+        self.images.append(result.get())             # quantized frame
+        self.durations.append(duration)              # duration of the frame
+    
+    
+    
+    
+    
+    
+    def close(self):
+        """Completes the video file, and returns its name (None when no frames have been emitted)."""
+        if not self.gif:                             # case of video file
+            self.queue.put(None)                     # end of the frames
+            self.encoder.join()                      # waits the encoder to complete the video file
+        else:                                        # case of animated GIF
+            while self.backlog:                      # case of frames being quantized
+                self.collect()                       # the oldest frame is collected
+            self.pool.close()                        # no more frames for the pool
+            self.pool.join()                         # the quantizing processes are ended
+            if self.images:                          # case of emitted frames
+                self.images[0].save(self.fname, save_all=True, append_images=self.images[1:],
+                                    duration=[int(round(d)) for d in self.durations], loop=0)
+        return self.fname if self.frames > 0 else None
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+###################### Class for the animation stream #############################
+###################################################################################
+
+class StreamServer():
+    """Asyncio based HTTP server (bound to localhost) streaming the Monte Carlo animation as MJPEG.
+    The sketch is only copied, at most fps times per second and when viewers are connected: the JPEG
+    encoding is made by a separate thread, and each viewer is sent the latest frame (slow viewers skip frames).
+    
+    GET  /             page showing the stream
+    GET  /stream.mjpg  frames as multipart/x-mixed-replace JPEG images
+    GET  /frame.jpg    latest frame as JPEG image"""
+    
+    QUALITY = 80                                 # JPEG quality of the frames
+    
+    def __init__(self, port, fps):
+        self.host = '127.0.0.1'                  # the server is only reachable from localhost
+        self.port = port                         # TCP port of the server
+        self.period = 1 / max(0.1, fps)          # minimum seconds between two frames
+        self.viewers = 0                         # quantity of connected viewers of the stream
+        self.published = 0                       # time of the latest copied sketch
+        self.frame = None                        # latest copied sketch, to be encoded
+        self.jpeg = None                         # latest encoded frame
+        self.seq = 0                             # counter of the encoded frames
+        self.pending = Event()                   # set when a copied sketch waits to be encoded
+    
+    
+    
+    
+    
+    
+    def start(self):
+        """Starts the server and the encoder, as daemon threads."""
+        Thread(target = lambda: asyncio.run(self.main()), daemon = True).start()  # server thread
+        Thread(target = self.encode, daemon = True).start()  # encoder thread
+        print(f"Animation stream on http://{self.host}:{self.port}/stream.mjpg")
+        return self
+    
+    
+    
+    
+    
+    
+    def publish(self, sketch):
+        """Passes the sketch to the encoder, when viewers are connected and the fps cap allows it."""
+        if self.viewers == 0 or time.time() - self.published < self.period:  # case no frame is due
+            return                               # function is exited (the sketch isn't copied)
+        self.published = time.time()             # time of the copied sketch
+        self.frame = sketch.copy()               # a copy of the sketch is kept (the sketch is redrawn)
+        self.pending.set()                       # the encoder is notified
+    
+    
+    
+    
+    
+    
+    def encode(self):
+        """Encoder thread: encodes the copied sketches to JPEG."""
+        while True:                              # iteration over the copied sketches
+            self.pending.wait()                  # waits for a copied sketch
+            self.pending.clear()                 # the copied sketch is being encoded
+            ok, jpeg = cv2.imencode('.jpg', self.frame, [cv2.IMWRITE_JPEG_QUALITY, self.QUALITY])
+            if ok:                               # case of successful encoding
+                self.jpeg = jpeg.tobytes()       # latest encoded frame
+                self.seq += 1                    # encoded frames counter is incremented
+    
+    
+    
+    
+    
+    
+    async def main(self):
+        """Opens the TCP server, and serves the requests."""
+        server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        async with server:                       # the server is closed on exit
+            await server.serve_forever()         # requests are served
+    
+    
+    
+    
+    
+    
+    async def handle_client(self, reader, writer):
+        """Parses an HTTP request, and serves the page, the stream or the latest frame."""
+        try:                                     # tentative
+            request_line = (await reader.readline()).decode('latin-1').split()  # method, path and protocol
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):  # header lines are skipped
+                pass                             # do nothing
+            path = request_line[1].split('?')[0] if len(request_line) >= 2 else ''  # requested path
+            
+            if path == '/':                      # case of page request
+                page = b'<html><body style="margin:0"><img src="/stream.mjpg"></body></html>'
+                await self.send(writer, 200, 'text/html', page)
+            elif path == '/stream.mjpg':         # case of stream request
+                await self.stream(writer)
+            elif path == '/frame.jpg' and self.jpeg is not None:  # case of latest frame request
+                await self.send(writer, 200, 'image/jpeg', self.jpeg)
+            else:                                # case of unknown path, or no frame yet
+                await self.send(writer, 404, 'text/plain', b'not found')
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):  # case of broken connection or request
+            pass                                 # do nothing
+        finally:                                 # in any case
+            writer.close()                       # the connection is closed
+    
+    
+    
+    
+    
+    
+    async def stream(self, writer):
+        """Sends the encoded frames as multipart JPEG images, until the viewer disconnects."""
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: multipart/x-mixed-replace; boundary=frame\r\n'
+                     b'Cache-Control: no-cache\r\nConnection: close\r\n\r\n')
+        self.viewers += 1                        # viewers are incremented (the sketches are copied)
+        self.published = 0                       # the next sketch is copied, for the new viewer
+        sent = 0                                 # counter of the latest frame sent to this viewer
+        try:                                     # tentative
+            while True:                          # iteration over the frames
+                if self.seq != sent and self.jpeg is not None:  # case of new encoded frame
+                    sent, jpeg = self.seq, self.jpeg  # latest encoded frame
+                    writer.write(b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n'
+                                 % len(jpeg) + jpeg + b'\r\n')
+                    await writer.drain()         # waits for the data to be sent (slow viewers skip frames)
+                await asyncio.sleep(self.period) # waits for the next frame
+        finally:                                 # in any case
+            self.viewers -= 1                    # viewers are decremented
+    
+    
+    
+    
+    
+    
+    async def send(self, writer, code, content_type, payload):
+        """Writes an HTTP response."""
+        reason = {200: 'OK', 404: 'Not Found'}[code]  # reason phrase of the status code
+        writer.write(f"HTTP/1.1 {code} {reason}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() + payload)
+        await writer.drain()                     # waits for the data to be sent
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+###################### Class for the Monte Carlo  t ###############################
+###################################################################################
+
+class MonteCarlo(Thread):
+    """Class for the monte carlo data generation and analysis.
+    It uses openCV to display the output"""
+    
+    def __init__(self):
+        super().__init__()
+  
+        self.close_window = False               # boolean to track is the openCV window gets closed (X on right side of the bar)
+        
+        s = settings.get_settings()             # settings are retrieved
+        self.wait = int(str(s['wait']))         # initial delay in ms per each dot plotting
+        self.step = int(str(s['step']))         # delay reduction step of the wait parameter
+        self.h = int(str(s['h']))               # window height parameter
+        self.w = int(1.66 * self.h)             # window width parameter is proportional to the height
+        self.gap = int(0.04 * self.h)           # gap parameter is is proportional to the height
+        self.x_text = self.h - self.gap//2      # x coordinate for the text starting position
+        
+        # the square, circle and dots are drawn on a layer at the render height, upscaled to h when shown
+        render_h = s['render_h'] if args.render_h is None else args.render_h  # height of the dots layer (0 for h)
+        self.lh = min(self.h, render_h) if render_h > 0 else self.h  # height of the dots layer
+        self.lw = round(self.x_text * self.lh / self.h)  # width of the dots layer (left of the text)
+        self.lgap = int(0.04 * self.lh)         # gap parameter of the dots layer
+        self.r = int((self.lh -2*self.lgap)//2) # radius parameter is proportional to the height of the dots layer
+        self.center = self.r                    # radius r is assigned to center variable
+        self.upscale = self.lh < self.h         # case the dots layer is upscaled when shown
+        self.interpolation = cv2.INTER_AREA if args.render_interp == 'area' else cv2.INTER_NEAREST  # upscaling
+              
+        self.font = cv2.FONT_HERSHEY_SIMPLEX    # type of cv2 font used in this script
+        self.fontScale1 = 0.00175 * self.h      # font size used, when not (locally)  changed
+        self.fontScale2 = 0.0015 * self.h       # font size used, when not (locally)  changed
+        self.fontColor = (255,255,255)          # font color, when not (locally) changed
+        if self.fontScale2 < 0.6:               # case fontScale2 is smaller than 0.6 
+            self.lineType = 1                   # font thickness is set to 1
+        else:                                   # case fontScale2 is equal or larger than 0.6 
+            self.lineType = 2                   # font thickness is set to 2
+        
+        self.timings = Timings(enabled = args.timings or s['timings'] == 'on')  # per-phase timers of the runs
+        self.profiler = None                    # cProfile object, only used when the --profile argument is passed
+        self.results = None                     # shared results of the runs (SharedResults)
+        self.retired = []                       # shared results of previous jobs, still in use by the GUI
+        self.counter = multiprocessing.Value('q', 0)  # atomic counter of the completed runs
+        self.workers = workers                  # quantity of worker processes, for the runs that aren't plotted
+        self.job_workers = workers              # worker processes of the current job (per the admission control)
+        self.executor = None                    # pool of worker processes (started on first use)
+        self.cache_spec = None                  # job spec of a cacheable job (seeded), else None
+        self.exporter = None                    # exporter of the animation to a video file, else None
+        self.pi_ci = None                       # bootstrap confidence intervals of the last job, else None
+        self.kernel = select_kernel(args.kernel or s['kernel'])  # kernel for the runs that aren't plotted
+        self.chunk = max(1, args.chunk or tuned_chunk(self.kernel))  # dots generated at once (calibrated when not set)
+        self.base_chunk = self.chunk            # requested chunk, eventually lowered per job by the admission control
+        self.speeds = None                      # dots/s of the kernel and seconds per drawn dot (measured on first use)
+        self.sampler = args.sampler or s['sampler']  # bit generator for the dots coordinates
+        
+        self.init_draw()                        # cals the function that initializes the graphical area
+    
+    
+    
+    
+    
+    @property
+    def pi_results(self):
+        """Estimated pi of the completed runs, derived on demand from their dots in circle."""
+        return hits_to_pi(self.hits_results, self.dots) if self.results is not None else np.zeros(0)
+    
+    
+    
+    
+    
+    
+    @property
+    def hits_results(self):
+        """Dots in circle of the completed runs: zero-copy view of the shared results."""
+        return self.results.completed() if self.results is not None else np.zeros(0, dtype = np.uint32)
+    
+    
+    
+    
+    
+    
+    def new_results(self, keep=0):
+        """Allocates the shared results for the runs of the job, keeping the first keep runs of the previous
+        job (when extended). The previous shared results are released, once not in use anymore."""
+        previous = self.results                 # shared results of the previous job
+        self.results = SharedResults(self.runs, self.dots, self.counter)  # shared results of this job
+        if keep > 0:                            # case the previous runs are kept
+            self.results.load(previous.hits[:keep])  # previous runs are copied
+        if previous is not None:                # case of previous shared results
+            self.retired.append(previous)       # previous shared results are retired
+        self.retired = [r for r in self.retired if not r.release()]  # retired results not yet closed are kept
+    
+    
+    
+    
+    
+    
+    def close(self):
+        """Stops the worker processes, and releases the shared results."""
+        if self.executor is not None:           # case the worker processes are started
+            self.executor.shutdown(wait=False, cancel_futures=True)  # worker processes are released
+        for results in self.retired + [self.results]:  # iteration over the shared results
+            if results is not None:             # case of shared results
+                results.release()               # shared memory is released
+    
+    
+    
+    
+    
+    
+    def init_draw(self):
+        """Funtion generating the pixels arrays to base the animation upon: the sketch (window resolution,
+        with the text), and the dots layer (render resolution, with square, circle and dots)."""
+        self.sketch = np.zeros([self.h, self.w , 3],dtype=np.uint8)  # empty array
+        self.sketch.fill(230)                   # array is filled with light gray
+        if self.upscale:                        # case the dots layer is upscaled when shown
+            self.layer = np.full([self.lh, self.lw, 3], 230, dtype=np.uint8)  # dots layer, light gray
+        else:                                   # case the dots layer is at the window resolution
+            self.layer = self.sketch[:, :self.x_text]  # dots layer is the left part of the sketch (drawn in place)
+    
+    
+    
+    
+    
+    
+    def draw_square(self, thk):
+        """Draws a square of side 2xradius, with thickness in argument."""
+        
+        # black square edge (outer square)
+        cv2.rectangle(self.layer, (self.lgap, self.lgap),
+                      (self.lgap+2*self.r, self.lgap+2*self.r), (0, 0, 0), thk)
+        
+        # black square edge (1st sector)
+        cv2.rectangle(self.layer, (self.lgap, self.lgap),
+                      (self.lgap+self.r, self.lgap+self.r), (0, 0, 0), thk)
+        
+        # black square edge (3rd sector)
+        cv2.rectangle(self.layer, (self.lgap+self.r, self.lgap+self.r),
+                      (self.lgap+2*self.r, self.lgap+2*self.r), (0, 0, 0), thk)
+        
+        self.display(100)                       # monte carlo window is shown for 100 ms
+    
+    
+    
+    
+    
+    
+    def draw_circle(self, thk, animation):
+        """Draws an animated circle of radius 'r', with thickness in argument."""
+        
+        if animation == 'min':                  # case the animation is set to 'min'
+            cv2.circle(self.layer, (self.lgap+self.r, self.lgap+self.r),
+                       self.r, (0, 0, 0), thk)  # black circle
+            
+            self.display(2000)                  # monte carlo window is shown for 2 seconds
+            
+            self.redraw(thk, clean=True)        # redraw function is called, in cleaning mode 
+        
+        else:                                   # case the animation is not set to 'min'  
+            idx = np.linspace(-np.pi, np.pi, self.r)   # evenly spaced array from -pi to pi, with r quantity of intervals
+            x1 = int(np.cos(-np.pi)*self.r)+self.center+self.lgap  # initial x coordinate
+            y1 = int(np.sin(-np.pi)*self.r)+self.center+self.lgap  # initial y coordinate
+            for i in range(self.r -1):          # iteration over the interval r
+                x2 = int(np.cos(idx[i+1])*self.r)+self.center+self.lgap  # second x coordinate
+                y2 = int(np.sin(idx[i+1])*self.r)+self.center+self.lgap  # second y coordinate
+                cv2.line(self.layer, (x1, y1), (x2, y2), (0, 0, 0), thk)  # a line s drawn between (x1,y1) and (x2,y2)
+                x1 = x2                         # the second x coordinate is assigned to the initial x coordinate
+                y1 = y2                         # the second y coordinate is assigned to the initial x coordinate
+                if self.display(1):             # monte carlo window is shown, case the window has been closed
+                    break                       # for loop is interrupted
+    
+    
+    
+    
+    
+    
+    def draw_arc(self, thk):
+        """Draws an animated arc of radius '2r', with thickness in argument."""
+        idx = np.linspace(-np.pi, np.pi, self.r)  # evenly spaced array from -pi to pi, with r quantity of intervals
+        x1 = int(np.cos(-np.pi)*2*self.r)+self.lgap  # initial x coordinate (x1)
+        y1 = int(np.sin(-np.pi)*2*self.r)+self.lh-self.lgap  # initial x coordinate (y1)
+        
+        for i in range(self.r -1):              # iteration over the interval r
+            x2 = int(np.cos(idx[i+1])*2*self.r)+self.lgap  # second x coordinate (x2)
+            y2 = int(np.sin(idx[i+1])*2*self.r)+self.lh-self.lgap  # second y coordinate (y2)
+            cv2.line(self.layer, (x1, y1), (x2, y2), (0, 0, 0), thk)  # a line s drawn between (x1,y1) and (x2,y2)
+            x1 = x2                             # the second x coordinate is assigned to the initial x coordinate
+            y1 = y2                             # the second y coordinate is assigned to the initial x coordinate
+            
+            if self.display(1):                 # monte carlo window is shown, case the window has been closed
+                break                           # for loop is interrupted
+    
+    
+    
+    
+    
+    
+    def redraw(self, thk, clean=False):
+        """Draws a gray square to erase previous draw.
+        Redraws a square of side 2xradius and the circle, with thickness in argument."""
+        if clean:
+              # gray rectangle to 'erase' previous drawing
+              cv2.rectangle(self.layer, (0, 0), (self.lgap+2*self.r+4, self.lh),
+                          (230, 230, 230), -1)
+        
+        # black square edge (outer square)
+        cv2.rectangle(self.layer, (-4, self.lgap), (self.lgap+2*self.r, self.lh+4),
+                      (0, 0, 0), thk)
+        
+        # black square edge (1st sector)
+        cv2.rectangle(self.layer, (self.lgap, self.lgap), (self.lgap+2*self.r, self.lh-self.lgap),
+                      (0, 0, 0), thk)
+        
+        # black square edge (3rd sector)
+        cv2.rectangle(self.layer, (-4, self.lh-self.lgap), (self.lgap, self.lh+4),
+                      (0, 0, 0), thk)
+        
+        # black circle
+        cv2.circle(self.layer, (self.lgap, self.lh-self.lgap), 2*self.r,
+                   (0, 0, 0), thk)
+        
+        # the comand cv2.imshow() is not applied on purpose on this function
+    
+    
+    
+    
+    
+    
+    def resize_draw(self, thk, animation):
+        """Resizes as animation the square, circle and sectors, with fix top-right vertex."""
+        
+        if animation == 'min':                  # case the animation is set to 'min'
+            idx = [self.r]                      # a single value (the radius r) is assigned to idx
+            idx2 = [2*self.r]                   # a single value (the diameter 2*r) is assigned to idx2
+        else:                                   # case the animation is not set to 'min'
+            idx = np.linspace(0, self.r, self.r) # evenly spaced array from 0 to r, with r quantity of intervals
+            idx2 = np.linspace(self.r, 2*self.r, self.r) # evenly spaced array from r to 2*r, with r quantity of intervals
+        
+        x2 = self.lgap+2*self.r                 # x2 coordinate, based on gap and radius r
+        y1 = self.lgap                          # y1 coordinate, based on gap
+        
+        for i in range(len(idx)):               #iteration over the idx intervals (one iteration in case of animation 'min')
+            # gray rectangle to 'erase' previous drawing
+            cv2.rectangle(self.layer, (0, 0), (self.lgap+2*self.r+4, self.lh),
+                          (230, 230, 230), -1)
+            # black square (outer square)
+            cv2.rectangle(self.layer, (self.lgap-2*int(idx[i]), y1),
+                          (x2, self.lgap+2*self.r+2*int(idx[i])), (0, 0, 0), thk)
+            
+            # black square (1st sector)
+            cv2.rectangle(self.layer, (x2-int(idx2[i]), y1), (x2, y1+int(idx2[i])),
+                          (0, 0, 0), thk)
+            
+            # black square (3rd sector)
+            cv2.rectangle(self.layer, (self.lgap-2*int(idx[i]), y1+int(idx2[i])),
+                          (x2-int(idx2[i]), self.lgap+2*self.r+2*int(idx[i])),
+                          (0, 0, 0), thk)
+            
+            # black circle
+            cv2.circle(self.layer, (x2-int(idx2[i]), y1+int(idx2[i])), self.r+int(idx[i]),
+                       (0, 0, 0), thk)
+            
+            if self.display(10):                # monte carlo window is shown, case the window has been closed
+                break                           # for loop is interrupted
+        
+        if not self.close_window:               # case close_window is set False 
+            run = 0                             # zero is assigned to run variable
+            self.plot_dots(run, in_circle=0, i=0, pi=0, wait=2000, startup=True) # dots plotting function
+    
+    
+    
+    
+    
+    
+    def plot_dots(self, run, in_circle, i, pi, wait, startup=False):
+        """Plots the monte carlo dots.
+        Argument in_circle is the quantity of dots in circle, out of the first i+1 dots."""
+        if startup:                             # case startup is set True (sketch gets prepared)
+            cv2.rectangle(self.sketch, (self.x_text, 4*self.gap),
+                          (self.w, self.h), (230, 230, 230), -1)  # gray rectangle to 'erase' previous text
+            cv2.putText(self.sketch, f'run ', (self.x_text, 6*self.gap),
+                        self.font, self.fontScale2,(0,0,0),self.lineType)
+            cv2.putText(self.sketch, f'dots in circle ', (self.x_text, 9*self.gap),
+                        self.font, self.fontScale2,(0,0,0),self.lineType)
+            cv2.putText(self.sketch, f'total dots ', (self.x_text, 12*self.gap),
+                        self.font, self.fontScale2,(0,0,0),self.lineType)
+            cv2.putText(self.sketch, f'pi ~ ', (self.x_text, 15*self.gap),
+                        self.font, self.fontScale1,(0,0,0),self.lineType)
+        
+        else:                                   # case startup is set False (sketch is already prepared)
+            cv2.rectangle(self.sketch, (self.x_text, 4*self.gap),
+                          (self.w, self.h), (230, 230, 230), -1)  # gray rectangle to 'erase' previous text
+            cv2.putText(self.sketch, f'run {run+1} of {self.runs}', (self.x_text, 6*self.gap),
+                        self.font, self.fontScale2,(0,0,0),self.lineType)
+            cv2.putText(self.sketch, f'dots in circle {in_circle:,d}', (self.x_text, 9*self.gap),
+                        self.font, self.fontScale2,(0,0,0),self.lineType)
+            cv2.putText(self.sketch, f'total dots {i+1:,d}', (self.x_text, 12*self.gap),
+                        self.font, self.fontScale2,(0,0,0),self.lineType)
+            cv2.putText(self.sketch, f'pi ~ {pi:.8f}', (self.x_text, 15*self.gap),
+                        self.font, self.fontScale1,(0,0,0),self.lineType)
+        
+        self.display(wait, timed=True)          # monte carlo window is shown for wait ms
+    
+    
+    
+    
+    
+    
+    def plot_formula(self):
+        """Prints a repetitive part of the openCV sketch (the formula) ."""
+        cv2.putText(self.sketch, f'pi ~ 4 x', (self.x_text, 3*self.gap),
+                    self.font, self.fontScale2,(0,0,0),self.lineType)
+        cv2.putText(self.sketch, f'dots in circle', (self.x_text+int(160*self.fontScale2),int(2.3*self.gap)),
+                    self.font, self.fontScale2,(0,0,0),self.lineType)
+        cv2.putText(self.sketch, f'total dots', (self.x_text+int(160*self.fontScale2), int(3.9*self.gap)),
+                    self.font, self.fontScale2,(0,0,0),self.lineType)
+        cv2.line(self.sketch, (self.x_text+int(155*self.fontScale2), int(2.7*self.gap)),
+                 (self.x_text+int(370*self.fontScale2),int(2.7*self.gap)), (0,0,0), 2)
+        
+        self.display(1)                         # monte carlo window is shown
+    
+    
+    
+    
+    
+    
+    def write_log(self, pi_results, datetime):
+        """writes the estimated pi values (runs quantity) to a text file."""
+        folder = pathlib.Path().resolve()       # active folder 
+        folder = os.path.join(folder,'logs')    # folder to store the pi values
+        if not os.path.exists(folder):          # if case the folder does not exist
+            os.makedirs(folder)                 # folder is made if it doesn't exist
+        
+        fname = datetime + '_log.txt'           # file name for the log
+        fname = os.path.join(folder,fname)      # folder and file name for the settings
+        
+        with open(fname, 'w') as f:             # opens the file fname in writing mode 
+            max_values = 50000                  # upper limit for the quantity of estimated pi to save
+            if len(pi_results) > max_values:    # case quantity of estimated pi values is above the limit
+                for pi in pi_results[:max_values]: # iterates estimated pi values in pi_results (first within limit)
+                    f.write(str(pi)+'\n')       # writes one estimated pi value per row
+            else:                               # case quantity of estimated pi values is within limit
+                for pi in pi_results:           # iterates on estimated pi values in pi_results
+                    f.write(str(pi)+'\n')       # writes one estimated pi value per row
+        catalog.add_artifact(datetime, 'log', fname)  # log file is recorded in the jobs catalog
+    
+    
+    
+    
+    
+    
+    def save_job_result(self, seconds):
+        """Saves the job result (spec, summary and dots in circle per run) to the logs folder."""
+        folder = pathlib.Path().resolve()       # active folder 
+        folder = os.path.join(folder,'logs')    # folder to store the results
+        if not os.path.exists(folder):          # if case the folder does not exist
+            os.makedirs(folder)                 # folder is made if it doesn't exist
+        
+        result = job_result(self.job_spec(), self.hits_results, seconds)  # job result
+        self.pi_ci = result.get('ci')           # bootstrap confidence intervals of the job
+        if self.pi_ci is not None:              # case of at least 2 runs
+            print_ci(self.pi_ci)                # confidence intervals are printed to terminal
+        if governor.samples:                    # case of thermal samples
+            result['thermal'] = governor.summary()  # throughput vs temperature of the job
+        save_result(result, os.path.join(folder, self.datetime))  # job result is saved
+        timings = {k: round(v, 3) for k, v in self.timings.totals.items()}  # seconds per phase (when enabled)
+        catalog.add(result, os.path.join(folder, self.datetime), 'gui' if self.exporter is None else 'export', timings)
+        if self.cache_spec is not None:         # case of cacheable job
+            cache.put(self.cache_spec, result)  # job result is stored into the results cache
+    
+    
+    
+    
+    
+    
+    def admit(self, runs, dots, animation, extend=False, deadline=None):
+        """Returns the admission plan of a job (see admit_job), with runs more runs when extend is True
+        (the chunk of the extended job is kept). The kernel speed and the drawing time are measured once."""
+        extend = extend and len(self.hits_results) >= 1  # case the previous job gets extended
+        if extend:                              # case the previous job gets extended
+            runs, dots = len(self.hits_results) + runs, self.dots  # total runs, and dots of the previous job
+        if self.speeds is None:                 # case the speeds aren't measured yet
+            self.speeds = probe_speeds(self.kernel, self.base_chunk)  # dots/s and seconds per drawn dot
+        memory_mb = settings.get_settings()['memory_mb'] if args.memory_mb is None else args.memory_mb
+        return admit_job(runs, dots, self.chunk if extend else self.base_chunk, animation, self.workers,
+                         memory_budget(memory_mb), self.speeds, keep_chunk = extend, deadline = deadline)
+    
+    
+    
+    
+    
+    
+    def cut_runs(self, runs):
+        """Ends the job at runs total runs (time budget): the job spec follows, and it isn't cached."""
+        self.runs = runs                        # total runs of the job
+        self.cache_spec = None                  # the job isn't stored into the results cache (spec not requested)
+    
+    
+    
+    
+    
+    
+    def job_spec(self):
+        """Returns the spec of the current job (runs, dots, sampler, kernel, chunk and seed)."""
+        return {'runs': self.runs, 'dots': self.dots, 'sampler': self.sampler,
+                'kernel': self.kernel, 'chunk': self.chunk, 'seed': self.seed}
+    
+    
+    
+    
+    
+    
+    def cached_job(self, result):
+        """Restores a job from its cached result: the results are sent to the GUI, and saved as for
+        a computed job (log, result and the cached charts), without generating any dot."""
+        self.results.load(result['hits'])       # dots in circle (and estimated pi) of each run
+        self.pi_ext, self.pi_st_dev, self.pi_error = result['pi'], result['st_dev'], result['error']
+        self.pi_ci = result.get('ci')           # bootstrap confidence intervals of the job
+        
+        # overal results are sent to the queue, via a ticket, and a tkinter event generator is called
+        ticket = Ticket(ticket_type=TicketPurpose.SHARE_PI_VALUE,
+                        ticket_run = self.runs - 1,
+                        ticket_value = f"{self.pi_ext}",
+                        ticket_bg = 'yes',
+                        ticket_progress= 100)   # ticket with the the overall results
+        self.send_ticket(ticket)                # ticket is sent to the GUI
+        
+        print(f"\nResult from the cache: {self.runs} runs, each one with {self.dots} dots, seed {self.seed}")
+        print(f"Estimated pi = {self.pi_ext:.8f}") # feedback is printed to terminal
+        print(f"Error = {self.pi_error:.8f}")   # feedback is printed to terminal
+        print(f"St.dev = {self.pi_st_dev:.8f}") # feedback is printed to terminal
+        if self.pi_ci is not None:              # case of confidence intervals
+            print_ci(self.pi_ci)                # confidence intervals are printed to terminal
+        print("\n"*3)                           # 3 empty lines are printed
+        
+        self.datetime = dt.datetime.now().strftime('%Y%m%d_%H%M%S')  # date_time variable is assigned, for file name generation
+        if len(self.pi_results) >= 10:          # case there are at least 10 runs
+            self.write_log(self.pi_results, self.datetime) # pi values data is saved into a text file
+        folder = os.path.join(pathlib.Path().resolve(), 'logs')  # folder to store the results
+        os.makedirs(folder, exist_ok=True)      # folder is made if it doesn't exist
+        save_result(result, os.path.join(folder, self.datetime))  # job result is saved
+        catalog.add(result, os.path.join(folder, self.datetime), 'cache')  # job is indexed in the jobs catalog
+        for name in cache.copy_charts(self.cache_spec, self.datetime):  # pre-rendered charts are copied to the charts folder
+            catalog.add_artifact(self.datetime, name, os.path.join(pathlib.Path().resolve(), 'charts',
+                                                                   f"{self.datetime}_{name}.png"))
+        
+        return self.pi_ext, self.pi_st_dev, self.pi_error, self.pi_results, self.datetime
+    
+    
+    
+    
+    
+    
+    def write_profile(self, datetime):
+        """Saves the cProfile stats of the runs to the logs folder, and prints the top functions.
+        The saved file can be opened with pstats, snakeviz, etc."""
+        folder = pathlib.Path().resolve()       # active folder 
+        folder = os.path.join(folder,'logs')    # folder to store the profile stats
+        if not os.path.exists(folder):          # if case the folder does not exist
+            os.makedirs(folder)                 # folder is made if it doesn't exist
+        
+        fname = datetime + '_profile.prof'      # file name for the profile stats
+        fname = os.path.join(folder,fname)      # folder and file name for the profile stats
+        self.profiler.dump_stats(fname)         # profile stats are saved
+        catalog.add_artifact(datetime, 'profile', fname)  # profile stats are recorded in the jobs catalog
+        stats = pstats.Stats(self.profiler)     # stats object from the profiler
+        stats.sort_stats('cumulative').print_stats(15)  # the 15 functions with largest cumulative time are printed
+        self.profiler = None                    # profiler is released
+    
+    
+    
+    
+    
+    
+    def check_close_req(self, key):
+        """Function that verifies is the ESC button is pressed when a CV2 window is opened.
+        It also checks if the window closing 'X' of 'pi' window is pressed.
+        The function returns True in case of window closig request."""
+        
+        try:                                    # tentative
+            # method to close CV2 windows, via the mouse click on the windows bar X
+            if cv2.getWindowProperty("monte carlo", cv2.WND_PROP_VISIBLE) <1:  # X on top bar 
+                return True                     # True is returned
+        except:                                 # except case     
+            pass                                # do nothing
+        
+        if key == 27 & 0xFF:                    # ESC button method to close CV2 windows
+            return True                         # True is returned
+    
+    
+    
+    
+    
+    
+    def display(self, wait, timed=False):
+        """Shows the sketch on the monte carlo window for wait ms, checking the closing requests.
+        When the animation is exported, the sketch is passed to the exporter instead (without waiting).
+        The dots layer is upscaled to the sketch first, when rendered at lower resolution.
+        When timed is True, the time spent is accumulated to the upscale, imshow and waitKey timings.
+        Returns True in case of window closing request."""
+        if self.upscale:                        # case the dots layer is upscaled
+            t_tic = self.timings.tic()          # time reference for the upscale phase
+            self.sketch[:, :self.x_text] = cv2.resize(self.layer, (self.x_text, self.h),
+                                                      interpolation = self.interpolation)  # dots layer, at the window resolution
+            if timed:                           # case of timed display
+                self.timings.toc('upscale', t_tic)  # time spent on the upscale is accumulated
+        if stream is not None:                  # case the animation is streamed
+            stream.publish(self.sketch)         # sketch is passed to the stream (copied only when due)
+        if self.exporter is not None:           # case the animation is exported
+            self.exporter.add(self.sketch, wait) # frame is added to the video, for wait ms
+            return self.close_window            # close_window is returned
+        
+        t_tic = self.timings.tic()              # time reference for the imshow phase
+        cv2.imshow('monte carlo', self.sketch)  # monte carlo window is shown
+        if timed:                               # case of timed display
+            self.timings.toc('imshow', t_tic)   # time spent on imshow is accumulated
+        
+        t_tic = self.timings.tic()              # time reference for the waitKey phase
+        t_ref = time.time()                     # current time is assigne to t_ref variable
+        while True:                             # showtime loop (at least one waitKey)
+            key = cv2.waitKey(1)                # showtime in ms
+            if self.check_close_req(key):       # case the window has been closed
+                self.close_window = True        # close_window is set True
+                break                           # while loop is interrupted
+            if time.time() - t_ref >= wait/1000:  # case the showtime is over
+                break                           # while loop is interrupted
+        if timed:                               # case of timed display
+            self.timings.toc('waitKey', t_tic)  # time spent on waitKey is accumulated
+        return self.close_window                # close_window is returned
+    
+    
+    
+    
+    
+    
+    def send_ticket(self, ticket):
+        """Sends a ticket to the GUI, via the queue and a tkinter event.
+        Without GUI (exported animation) the ticket is dropped."""
+        if self.exporter is None:               # case the GUI is running
+            queue_manager.queue_message.put(ticket)  # ticket is added to the queue
+            gui.trigger_event()                 # an event is generated at the GUI class
+    
+    
+    
+    
+    
+    
+    def prepare_sketch(self, animation):
+        """Prepares the sketch."""
+        self.init_draw()                        # init_draw function is called (prepare the sketch)
+        
+        if not self.close_window:               # in case close_window is not set True
+            self.draw_square(thk=1)             # black square edge
+        
+        if not self.close_window:               # in case close_window is not set True 
+            thk=1                               # thickness is set to 1
+            self.draw_circle(thk, animation)    # circle in square is drawn
+        
+        if not self.close_window:               # in case close_window is not set True     
+            self.plot_formula()                 # formula is plotted to the openCV sketch
+        
+        if not self.close_window:               # in case close_window is not set True
+            # some sleep time to let user realizing about the graphic on screen
+            self.display(3000)                  # monte carlo window is shown for 3 seconds
+        
+        if not self.close_window:               # in case close_window is not set True
+            thk=1                               # thickness is set to 1
+            self.resize_draw(thk, animation)    # resize_draw function is called (from 4 sectors to 1st sector)
     
     
     
-    def redraw(self, thk, clean=False):
-        """Draws a gray square to erase previous draw.
-        Redraws a square of side 2xradius and the circle, with thickness in argument."""
-        if clean:
-              # gray rectangle to 'erase' previous drawing
-              cv2.rectangle(self.sketch, (0, 0), (self.gap+2*self.r+4, self.h),
-                          (230, 230, 230), -1)
+    
+    
+    
+    def print_time(self):
+        """Cecks if time is synchronized at Raspberry Pi."""
+        try:           # tentative
+            output = subprocess.check_output(["timedatectl", "status"])   # timedatectl status
+            output = output.decode("utf-8")     # output is converted from Unicode 8 bit characters
+            if "synchronized: yes" in output:   # case datetime is synchronized
+                print(dt.datetime.now().strftime("%Y-%m-%d  %H:%M:%S"))
+        except:        # case of exception
+            pass       # do nothing
+    
+    
+    
+    
+    
+    
+    def parallel_runs(self, first_run, last_run, deadline=None):
+        """Computes the runs from first_run to last_run - 1 (not plotted) on the worker processes, that write
+        the results in place into the shared results. The progress is read from the shared counter, and
+        sent to the GUI and to the monte carlo window every 100 ms (instead of a ticket per run).
+        The batches are submitted as the workers are active, per the thermal governor, and cut to the
+        deadline when given (the runs from the first one not completed are then left out)."""
+        if self.executor is None:               # case the worker processes aren't started yet
+            self.executor = ProcessPoolExecutor(max_workers = self.workers, initializer = init_shared_worker,
+                                                initargs = (self.counter,))  # pool of worker processes
         
-        # black square edge (outer square)
-        cv2.rectangle(self.sketch, (-4, self.gap), (self.gap+2*self.r, self.h+4),
-                      (0, 0, 0), thk)
+        def submit(first, n):                   # submits a batch, with the chunk adapted by the governor
+            chunk = governor.chunk              # chunk of the batch (the dots don't depend on the chunk)
+            return self.executor.submit(run_shared_batch, self.results.name, self.runs, self.dots, self.seed,
+                                        self.sampler, self.kernel, chunk, first_run + first, n)
+        
+        batches = split_runs(last_run - first_run, self.dots, self.chunk, self.workers)  # batches of runs
+        scheduler = BatchScheduler(batches, submit, governor, deadline)  # batches, submitted as workers are active
+        
+        start_count = self.results.progress()   # completed runs, before the worker processes
+        shown = 0                               # runs completed by the worker processes, last shown
+        while not scheduler.done():             # until all the batches are completed
+            done = self.results.progress() - start_count  # runs completed by the worker processes
+            governor.update(done, self.dots)    # thermal sample, and workers adaptation
+            scheduler.schedule()                # batches are submitted to the resumed workers
+            if done > shown:                    # case of new completed runs
+                run = first_run + done - 1      # index of the latest completed run (as counted)
+                hits = int(self.results.completed()[-1])  # dots in circle of the latest completed run (without gaps)
+                pi_ext = 4 * hits / self.dots   # estimated pi of the latest completed run
+                ticket = Ticket(ticket_type=TicketPurpose.SHARE_PI_VALUE,
+                                ticket_run = 1 if shown == 0 else run - self.first_run,  # first ticket starts the time estimate
+                                ticket_value = f"{pi_ext}",
+                                ticket_bg = 'no',
+                                ticket_progress = 100 * (run+1-self.first_run) / (self.runs-self.first_run))
+                self.send_ticket(ticket)        # ticket is sent to the GUI
+                shown = done                    # shown runs are updated
+                self.plot_dots(run, hits, self.dots-1, pi_ext, wait=100)  # shows the progress
+            elif self.exporter is None:         # case of no new completed runs, with the window shown
+                self.display(100)               # monte carlo window is shown for 100 ms (keeps it responsive)
+            else:                               # case of no new completed runs, with the animation exported
+                time.sleep(0.1)                 # waits for the worker processes (no frame is exported)
+            
+            if self.close_window or not tk_running:  # in case close_window is set True or tk got closed
+                scheduler.cancel()              # batches not yet started are cancelled
+                break                           # while loop is interrupted
+        
+        scheduler.wait()                        # waits the started batches, raising their eventual errors
+    
+    
+    
+    
+    
+    
+    def single_run(self, run):
+        """Generates the dots of one run, and it plots them according to the animation level.
+        This function is kept separated from monte_carlo, to be easily profiled.
+        The estimated pi of the run, and the quantity of dots in circle, are returned."""
+        
+        # notes about the animation
+        
+        # when animation 'max':
+            # First run the dots are plot with increasing speed
+            # From second run dots are plot with the last speed used in 1st run
+        
+        # when animation 'med':
+            # First run the dots are plot with increasing speed
+            # From second run all dots are plot together
+        
+        # when animation 'min':
+            # First run the dots are plot with increasing speed
+            # From second run to last but, dots arenot printed
+            # The last run all dots are plotted together
+        
+        plotted = self.animation in ('max', 'med') or run == self.first_run or run == self.runs-1  # case the dots get plotted
+        self.rng = make_rng(self.seed, self.sampler, run)  # random generator of this run
+        
+        if not plotted:                           # case the dots of this run are not plotted
+            # the dots coordinates aren't needed, therefore only the dots in circle are counted
+            t_ref = self.timings.tic()            # time reference for the kernel phase
+            hits = count_hits(self.dots, self.rng, self.kernel, self.chunk)  # quantity of dots in circle
+            check_hits(hits, self.dots)           # dots in circle are checked against overflow
+            self.timings.toc('kernel', t_ref)     # time spent on the kernel is accumulated
+            pi_ext = 4 * hits / self.dots         # estimated pi of the run
+            self.results.put(run, hits)           # the dots in circle are stored
+            self.pi_error = pi_ext-np.pi          # the error of the estimated pi is assigned to pi_error list
+            return pi_ext, hits
+        
+        hits = 0                                  # running quantity of dots in circle
+        for first in range(0, self.dots, self.chunk):  # iteration over the chunks of dots
+            n = min(self.chunk, self.dots - first)  # dots in this chunk (the last one can be smaller)
+            
+            if self.close_window or not tk_running:  # in case close_window is not set True or tk got closed
+                # the remaining dots are only counted, to complete the run
+                hits += count_hits(self.dots - first, self.rng, self.kernel, self.chunk)
+                break                             # for loop is interrupted
+            
+            ########################   the key montecarlo part are these few lines of code   ##################
+            if self.kernel == 'integer':          # case of integer kernel (same dots as the not plotted runs)
+                t_ref = self.timings.tic()        # time reference for the rng phase
+                raw = self.rng.bit_generator.random_raw(n)  # one raw 64-bit draw per dot
+                self.timings.toc('rng', t_ref)    # time spent on the random generation is accumulated
+                
+                t_ref = self.timings.tic()        # time reference for the distance phase
+                in_circle = integer_in_circle(raw)  # boolean array for the points within the circle area
+                x = raw.view(np.uint32)[0::2] * 2.0**-32  # x coordinates, scaled to [0, 1)
+                y = raw.view(np.uint32)[1::2] * 2.0**-32  # y coordinates, scaled to [0, 1)
+                self.timings.toc('distance', t_ref)  # time spent on distance and compare is accumulated
+            
+            else:                                 # case of float kernels
+                t_ref = self.timings.tic()        # time reference for the rng phase
+                xy = self.rng.random(2*n)         # interleaved coordinates (same dots as the not plotted runs)
+                x, y = xy[0::2], xy[1::2]         # x and y coordinates (size=n)
+                self.timings.toc('rng', t_ref)    # time spent on the random generation is accumulated
+                
+                t_ref = self.timings.tic()        # time reference for the distance phase
+                in_circle = x*x + y*y <= 1        # boolean array for the points within the circle area (distance <= 1)
+                self.timings.toc('distance', t_ref)  # time spent on distance and compare is accumulated
+            
+            t_ref = self.timings.tic()            # time reference for the cumsum phase
+            in_circle_cum = np.cumsum(in_circle, dtype = np.int64)  # cumulative sum of the points within circle (64-bit)
+            in_circle_cum += np.int64(hits)       # dots in circle from the previous chunks are added
+            self.timings.toc('cumsum', t_ref)     # time spent on the cumulative sum is accumulated
+            
+            # array with extimated pi value, at each dot (in_circle_cum at index j refers to first+j+1 dots)
+            t_ref = self.timings.tic()            # time reference for the pi_arr phase
+            pi_arr = 4 * in_circle_cum / np.arange(first+1, first+n+1, dtype = np.float64)
+            self.timings.toc('pi_arr', t_ref)     # time spent on the pi_arr building is accumulated
+            
+            hits = int(in_circle_cum[n-1])        # running quantity of dots in circle
+            # #############################################################################################
+            
+            
+            # iterative part within each chunk
+            for j in range(n):                    # iteration over the dots of the chunk
+                
+                if self.close_window or not tk_running:  # in case close_window is not set True or tk got closed
+                    break                         # for loop is interrupted
+                
+                t_ref = self.timings.tic()        # time reference for the circle phase
+                if in_circle[j]:   # case the dot falls within the circle: distance of the dot at pos j has value <= 1
+                                   # dot is printed in blue
+                    cv2.circle(self.layer, (self.lgap+int(2*self.r*x[j]),
+                                             self.lh-self.lgap-int(2*self.r*(y[j]))), 1, (255, 0, 0), -1)
+                else:              # case the dot falls outside the circle: distance of the dot at pos j has value > 1
+                                   # dot is printed in red
+                    cv2.circle(self.layer, (self.lgap+int(2*self.r*x[j]),
+                                             self.lh-self.lgap-int(2*self.r*(y[j]))), 1, (0, 0, 255), -1)
+                self.timings.toc('circle', t_ref) # time spent on the dots drawing is accumulated
+                
+                if run == self.first_run or self.animation == 'max':  # case of the 1st run or animation is set 'max'
+                    
+                    i = first + j                 # index of the dot within the run
+                    if i % self.step == 0 and not self.close_window:   # case the iteration have not reached the 'step' value
+                        self.pi_ext = pi_arr[j]   # the estimated pi value is retrieved from pi_arr (array of estimated pi values)
+                        self.plot_dots(run, in_circle_cum[j], i, self.pi_ext, self.wait_a) # dots and updated info are plotted
+                        
+                        # approach used to make the animation accelerating 
+                        newstep = max(1, i // 100)  # for the first 100 dots the new step remins at one 
+                        if newstep > self.accel_step:  # case newstep is bigger than the step
+                            self.accel_step = newstep  # newstep is assigned to step
+                            self.wait_a -= 10     # wait_a time is reduced by 10 (ms)
+                            self.wait_a = max(1, self.wait_a) # wait_a time is never smaller than 1 ms
+        
+        check_hits(hits, self.dots)               # dots in circle are checked against overflow
+        pi_ext = 4 * hits / self.dots             # estimated pi of the run
+        self.results.put(run, hits)               # the dots in circle are stored
+        self.pi_error = pi_ext-np.pi              # the error of the estimated pi is assigned to pi_error list
+        
+        return pi_ext, hits
+    
+    
+    
+    
+    
+    
+    def monte_carlo(self, runs, dots, animation, extend=False, deadline=None, plan=None):
+        """This is the key program part for the Monte Carlo.
+        When extend is True, runs more runs are appended to the previous job (same dots and seed),
+        continuing the runs random streams from the last completed run.
+        When a deadline is given (time budget), runs is the maximum: the job ends with the last run expected
+        to complete in time, and the statistics are made on the completed runs.
+        plan is the admission plan of the job, when already made by the caller (see admit)."""
+        
+        start = time.time()                     # current time is assignet to start variable
+        self.print_time()
+        
+        self.s = settings.get_settings()        # settings are retrieved
+        self.wait_a = int(self.s['wait'])       # wait is 'loaded' each time this function is called
+        self.accel_step = int(str(self.s['step']))  # delay reduction step of the wait parameter
+        
+        if extend and len(self.hits_results) >= 1:  # case the previous job gets extended
+            self.first_run = len(self.hits_results)  # the new runs follow the completed ones
+            dots = self.dots                    # dots of the previous job are kept
+        else:                                   # case of a new job
+            self.first_run = 0                  # runs start from zero
+        
+        # memory admission control: the chunk and the animation are adapted to the memory budget
+        if plan is None:                        # case the job isn't admitted yet
+            plan = self.admit(runs, dots, animation, extend, deadline)  # memory and time plan of the job
+        print(plan_text(plan))                  # plan is printed to terminal
+        if not plan['admitted']:                # case the job doesn't fit the memory budget
+            return 3.14, 0, 0, np.zeros(0), ''  # the job isn't started
+        self.chunk, animation = plan['chunk'], plan['animation']  # chunk and animation of the job
+        self.job_workers = plan['workers']      # worker processes of the job (1 when the runs are counted here)
+        
+        # seed of the job: kept when extending, or from the arguments, from the settings, or a new random one
+        seeded = args.seed is not None or self.s['seed'] != ''  # case of a set seed (reproducible job)
+        if self.first_run > 0:                  # case the previous job gets extended
+            pass                                # seed is kept (the random streams continue)
+        elif args.seed is not None:             # case the seed is passed as argument
+            self.seed = args.seed               # seed argument is assigned to the montecarlo Class
+        elif self.s['seed'] != '':              # case the seed is set in the settings
+            self.seed = int(self.s['seed'])     # seed setting is assigned to the montecarlo Class
+        else:                                   # case the seed is not set
+            self.seed = new_seed()              # a new random seed is assigned (saved with the results)
+        
+        self.timings.reset()                    # timings from eventual previous job are cleared
+        governor.reset(self.chunk)              # thermal samples from eventual previous job are cleared
+        if args.profile:                        # case the --profile argument is passed
+            self.profiler = cProfile.Profile()  # a new profiler is assigned to the class
+        
+        # assigning local variables (from arguments) to montecarlo class 
+        self.runs = self.first_run + runs       # total runs (runs in argument, plus eventual previous ones)
+        self.dots = dots                        # dots in argument is assigned to the montecarlo Class
+        self.animation = animation              # animation in argument is assigned to the montecarlo Class
+        self.new_results(keep = self.first_run) # shared results of the runs (previous runs kept when extending)
+        
+        # seeded jobs are looked up in the results cache, and only computed in case of cache miss
+        self.cache_spec = None                  # None is assigned to cache_spec (job not cacheable)
+        if seeded and self.first_run == 0 and self.exporter is None and cache.cacheable(self.job_spec()):
+            self.cache_spec = self.job_spec()   # job spec is assigned to cache_spec
+            result = cache.get(self.cache_spec) # cached result, or None
+            if result is not None:              # case of cache hit
+                return self.cached_job(result)  # the cached result is returned, without computation
+        
+        # variables intended to be returned are initialized
+        # this is done to prevent issues in case the the window gets closed before completion
+        self.pi_ext = 3.14                      # 3.14 is assigned to pi_ext
+        self.pi_error = 0                       # zero is assiged to pi_error
+        self.pi_st_dev = 0                      # zero is assiged to pi_st_dev
+        self.pi_error = 0                       # zero is assiged to pi_error
+        self.datetime = ''                      # empty string is assiged to datetime
+        
+        # the sketch gets prepared
+        if not self.close_window or not tk_running:  # in case close_window is not set True or tk got closed
+            self.prepare_sketch(self.animation) # the sketch gets prepared (square, circle, quadrants, formula,etc)               
+        
+        
+        # iterative part of the montecarlo function              
+        loop_start = time.time()                # time reference for the seconds per run (time budget)
+        for run in range(self.first_run, self.runs):  # iteration over the runs
+            
+            if self.close_window or not tk_running:  # in case close_window is not set True or tk got closed
+                break                           # for loop is interrupted
+            
+            if self.results.done[run]:          # case the run has been computed by the worker processes
+                continue                        # next run
+            
+            # with animation 'min' the runs between the first and the last one aren't plotted,
+            # therefore they are computed by the worker processes, writing into the shared results
+            if animation == 'min' and self.job_workers > 1 and run == self.first_run + 1 and self.runs - run >= 2:
+                run_seconds = (time.time() - loop_start) / (run - self.first_run)  # seconds per plotted run
+                self.parallel_runs(run, self.runs - 1, None if deadline is None else deadline - run_seconds)
+                if deadline is not None and len(self.hits_results) < self.runs - 1:  # case the runs got cut by the time budget
+                    self.cut_runs(len(self.hits_results) + 1)  # the next run is the last one
+                continue                        # next run
+            
+            if self.profiler is not None:       # case the runs are profiled
+                self.profiler.enable()          # profiler starts collecting data
+            pi_ext, hits = self.single_run(run)  # dots generation and plot for this run
+            if self.profiler is not None:       # case the runs are profiled
+                self.profiler.disable()         # profiler stops collecting data
+            
+            
+            # last update for the printed dots and informations
+            self.plot_dots(run, hits, self.dots-1, pi_ext, wait=1)
+            
+            # iteration results are sent to the queue, via a ticket, and a tkinter event generator is called
+            ticket = Ticket(ticket_type=TicketPurpose.SHARE_PI_VALUE,
+                            ticket_run = run - self.first_run,
+                            ticket_value = f"{pi_ext}",
+                            ticket_bg = 'no',
+                            ticket_progress = 100 * (run+1-self.first_run) / (self.runs-self.first_run))  # ticket with the iteration results
+            t_ref = self.timings.tic()                # time reference for the queue phase
+            self.send_ticket(ticket)                  # ticket is sent to the GUI
+            self.timings.toc('queue', t_ref)          # time spent on the queue is accumulated
+            
+            # with time budget, the run is the last one when a further run wouldn't complete in time
+            run_seconds = (time.time() - loop_start) / (run + 1 - self.first_run)  # average seconds per run
+            if deadline is not None and run < self.runs-1 and time.time() + run_seconds > deadline:
+                self.cut_runs(run + 1)                # this run is the last one
+            
+            
+            if run == self.runs-1 and not self.close_window:  # case the run is the last one (and no closure request)
+                
+                # resuming the overall results
+                # average pi value, deviation from pi value and standard deviation of the calculated pi values
+                pi_ext, self.pi_st_dev, self.pi_error = aggregate_hits(self.hits_results, self.dots)
+                
+                
+                # overal results are sent to the queue, via a ticket, and a tkinter event generator is called
+                ticket = Ticket(ticket_type=TicketPurpose.SHARE_PI_VALUE,
+                                ticket_run = run - self.first_run,
+                                ticket_value = f"{pi_ext}",
+                                ticket_bg = 'yes',
+                                ticket_progress= 100 * (run+1-self.first_run) / (self.runs-self.first_run))  # ticket with the the overall results
+                self.send_ticket(ticket)              # ticket is sent to the GUI
+                
+                
+                # another the printed dots update, to incorporate the overall pi value
+                self.plot_dots(run, hits, self.dots-1, pi_ext, wait=1)
+                
+                
+                # iteration results are printed on the monte carlo window
+                if self.runs == 1:                    # case the set runs is one
+                    cv2.rectangle(self.sketch, (self.x_text, 4*self.gap),
+                                  (self.w, 7*self.gap), (230, 230, 230), -1)  # gray rectangle to 'erase' previous text
+                    cv2.putText(self.sketch, f'made {self.runs} iteration', (self.x_text, 6*self.gap),
+                                self.font, self.fontScale2,(0,0,0),self.lineType)  # text plot to the sketch
+                else:                                 # case the set runs is not one
+                    cv2.rectangle(self.sketch, (self.x_text, 4*self.gap),
+                                  (self.w, 10*self.gap), (230, 230, 230), -1)  # gray rectangle to 'erase' previous text
+                    cv2.putText(self.sketch, f'made {self.runs} iterations', (self.x_text, 6*self.gap),
+                                self.font, self.fontScale2,(0,0,0),self.lineType)  # text plot to the sketch
+                    cv2.putText(self.sketch, f'each one with', (self.x_text, 9*self.gap),
+                                self.font, self.fontScale2,(0,0,0),self.lineType)  # text plot to the sketch
+                    cv2.putText(self.sketch, f'error = {self.pi_error:.8f}', (self.x_text, 18*self.gap),
+                                self.font, self.fontScale1,(0,0,0),self.lineType)  # text plot to the sketch
+                    cv2.putText(self.sketch, f'st.dev = {self.pi_st_dev:.8f}', (self.x_text, 21*self.gap),
+                                self.font, self.fontScale1,(0,0,0),self.lineType)  # text plot to the sketch
+                
+                # enlarge black lines to visually increase separation between the circle and the square area
+                self.redraw(thk=2, clean=False)       # enlarged the arc and square borders
+                self.draw_arc(thk=2)                  # black circle, tick edge
+            
+            # quickly resuming the results of each run in the openCV window
+            if self.close_window:                     # case there is a request to quit
+                break                                 # for loop is interupted
+            showtime = {'min': 1, 'med': 100, 'max': 1000}.get(animation, 1)  # showtime in ms, per animation
+            if self.display(showtime, timed=True):    # monte carlo window is shown, case the window has been closed
+                break                                 # for loop is interupted
+            
+            # the openCV area is cleaned, for the next iteration
+            self.redraw(thk=1, clean=True)            # redraw function is called in 'cleaning' mode
+            
+            if run == self.runs-1:                    # case the run is the last one (runs eventually cut by the time budget)
+                break                                 # for loop is interupted
+                
+        loop_end = time.time()                        # end time of the runs (before the final results showtime)
+        if run == self.runs-1:                        # case it is the last run
+            self.display(10000)                       # final results are shown for 10 seconds
+        
+        if self.exporter is None:                     # case the animation is shown on screen
+            cv2.destroyAllWindows()                   # all openCV windows are closed
+        
+        if tk_running:                                # case tkinter is runnig
+            if self.close_window:                     # case the openCV window got closed
+                
+                # case there is at least one run completed
+                if self.runs > 1 and run > 0 and len(self.pi_results)>=1: 
+                    # estimated pi, st.dev and error from pi are calculated on the runs made (run)
+                    self.pi_ext, self.pi_st_dev, self.pi_error = aggregate_hits(self.hits_results, self.dots)
+                    print("Interrupted runs before end")   # feedback is printed to terminal
+                    print(f"Made a total of {run} runs, each one with {self.dots} dots") # feedback is printed to terminal
+                    print(f"Estimated pi = {self.pi_ext:.8f}") # feedback is printed to terminal
+                    print(f"Error = {self.pi_error:.8f}")    # feedback is printed to terminal
+                    print(f"St.dev = {self.pi_st_dev:.8f}")  # feedback is printed to terminal
+                    
+            else:                                     # case the openCV window is not closed
+                # estimated pi, st.dev and error from pi are calculated
+                self.pi_ext, self.pi_st_dev, self.pi_error = aggregate_hits(self.hits_results, self.dots)
+                if runs == 1 or run == 1:             # case of one single run
+                    print(f"Made one run with {self.dots} dots") # feedback is printed to terminal (singular form)
+                elif run>1:                           # case of more runs
+                    print(f"\nMade a total of {self.runs} runs, each one with {self.dots} dots")
+                print(f"Estimated pi = {self.pi_ext:.8f}") # feedback is printed to terminal
+                print(f"Error = {self.pi_error:.8f}")   # feedback is printed to terminal
+                print(f"St.dev = {self.pi_st_dev:.8f}") # feedback is printed to terminal
+                if deadline is not None:              # case of time budget
+                    seconds = loop_end - start        # seconds of the job, up to the last run
+                    print(f"Time budget of {deadline - start:.1f} s: {self.runs - self.first_run:,d} of {runs:,d} runs "
+                          f"made in {seconds:.1f} s ({(self.runs - self.first_run) * self.dots / seconds:,.0f} dots/s)")
+            
+        
+            # analysis time is printed to terminal if at least one complete run
+            if len(self.pi_results) >= 1:             # case there is at least one run completed
+                tot_time = time.time()-start          # analysis time in seconds (float) is calculated
+                hours = int(tot_time // 3600)         # hours are calculated
+                minutes = int(tot_time % 3600 // 60)  # minutes are calculated
+                seconds = int(tot_time % 3600 % 60)   # seconds are calculated
+                
+                # time is printed to terminal
+                print("Total time =", '{:02d}:{:02d}:{:02d}'.format(hours, minutes, seconds), "(animation =", str(animation)+")")
+                print("\n"*3)                         # 3 empty lines are printed
+            
+            
+            # a datetime reference is generated, for file name generation
+            self.datetime = dt.datetime.now().strftime('%Y%m%d_%H%M%S')  # date_time variable is assigned, for file name generation
+            
+            if len(self.pi_results) >= 10:            # case there are at least 10 runs completed
+                self.write_log(self.pi_results, self.datetime) # pi values data is saved into a text file
+            
+            if len(self.hits_results) >= 1:           # case there is at least one run completed
+                self.save_job_result(time.time()-start) # job result is saved into the logs folder
+            
+            if self.timings.enabled and len(self.pi_results) >= 1:  # case the timings are enabled
+                print("Time per phase, over all the runs:")  # feedback is printed to terminal
+                print(self.timings.summary(), "\n")   # timings table is printed to terminal
+                self.timings.write_log(self.datetime) # timings table is saved into a text file
+            
+            if governor.samples:                      # case of thermal samples
+                print(f"Throughput vs temperature (ceiling {governor.ceiling:.0f} °C):")  # feedback is printed to terminal
+                print(governor.table(), "\n")         # thermal table is printed to terminal
+            
+            if self.profiler is not None:             # case the runs have been profiled
+                self.write_profile(self.datetime)     # profile stats are saved and resumed
+            
+            # resets the close windows variable, for eventual new runs
+            self.close_window = False                 # close_window is set Fasle
+        
+        # this function has a return
+        return self.pi_ext, self.pi_st_dev, self.pi_error, self.pi_results, self.datetime
+
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+###################### Class for the local job server #############################
+###################################################################################
+
+class JobServer():
+    """Asyncio based local service (bound to localhost), accepting Monte Carlo jobs via HTTP/JSON.
+    The runs of each job are split in batches, computed by a pool of worker processes.
+    
+    POST /jobs              job spec as JSON (runs, dots, sampler, seed, kernel, chunk), returns the job id
+    GET  /jobs              list of the jobs with their status
+    GET  /jobs/<id>         status, progress and (when done) the result of the job
+    GET  /jobs/<id>/events  progress streamed as server-sent events
+    GET  /jobs/<id>/hits    dots in circle per run, as binary .npy (uint32, or uint64 above 2^32 - 1 dots)
+    Seeded jobs are served from the results cache, when available, else stored into it when done."""
+    
+    def __init__(self, port, workers, cache):
+        self.host = '127.0.0.1'                  # the server is only reachable from localhost
+        self.port = port                         # TCP port of the server
+        self.workers = workers                   # quantity of worker processes
+        self.executor = ProcessPoolExecutor(max_workers = workers)  # pool of worker processes
+        self.jobs = {}                           # dict with the jobs, by job id
+        self.job_count = 0                       # counter used to assign the job id
+        self.cache = cache                       # results cache
+    
+    
+    
+    
+    
+    
+    def serve(self):
+        """Runs the server, until interrupted via Ctrl+C."""
+        try:                                     # tentative
+            asyncio.run(self.main())             # the asyncio loop is started
+        except KeyboardInterrupt:                # case of Ctrl+C
+            print("\nClosing the job server\n")  # feedback is printed to the terminal
+        finally:                                 # in any case
+            self.executor.shutdown(wait=False, cancel_futures=True)  # worker processes are released
+    
+    
+    
+    
+    
+    
+    async def main(self):
+        """Opens the TCP server, and serves the requests."""
+        server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        print(f"Job server listening on http://{self.host}:{self.port}, with {self.workers} workers")
+        async with server:                       # the server is closed on exit
+            await server.serve_forever()         # requests are served
+    
+    
+    
+    
+    
+    
+    async def handle_client(self, reader, writer):
+        """Parses an HTTP request, and routes it to the related function."""
+        try:                                     # tentative
+            request_line = (await reader.readline()).decode('latin-1').split()  # method, path and protocol
+            headers = {}                         # dict for the request headers
+            while True:                          # iteration over the header lines
+                line = await reader.readline()   # header line
+                if line in (b'\r\n', b'\n', b''):  # case of empty line (end of headers)
+                    break                        # while loop is interrupted
+                key, _, value = line.decode('latin-1').partition(':')  # header name and value
+                headers[key.strip().lower()] = value.strip()  # header is added to the dict
+            length = int(headers.get('content-length', 0))  # size of the request body
+            body = await reader.readexactly(length) if length > 0 else b''  # request body
+            
+            if len(request_line) < 2:            # case of malformed request
+                await self.send_json(writer, 400, {'error': 'malformed request'})
+            else:                                # case of well formed request
+                await self.route(request_line[0], request_line[1], headers, body, writer)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):  # case of broken connection or request
+            pass                                 # do nothing
+        finally:                                 # in any case
+            writer.close()                       # the connection is closed
+    
+    
+    
+    
+    
+    
+    async def route(self, method, path, headers, body, writer):
+        """Calls the function related to the method and path of the request.
+        The jobs are only accepted as application/json, that a web page can't send cross-site without consent."""
+        parts = [p for p in path.split('?')[0].split('/') if p]  # path elements
+        job = self.jobs.get(parts[1]) if len(parts) >= 2 and parts[0] == 'jobs' else None  # requested job
+        
+        if method == 'POST' and parts == ['jobs']:      # case of new job submission
+            if headers.get('content-type', '').split(';')[0].strip() != 'application/json':  # case of other content
+                await self.send_json(writer, 415, {'error': 'the job spec must be sent as application/json'})
+                return
+            try:                                 # tentative
+                request = json.loads(body or b'{}')  # job spec as requested
+                spec = parse_spec(request)       # job spec is parsed and validated
+                admit_spec(spec, self.workers)   # job is refused when beyond the memory budget
+            except (ValueError, AttributeError) as e:   # case of invalid job spec, or job not admitted
+                await self.send_json(writer, 400, {'error': str(e)})
+                return
+            seeded = request.get('seed') not in (None, '')  # case of a set seed (reproducible job)
+            job = self.submit(spec, cacheable = seeded and self.cache.cacheable(spec))  # the job is scheduled
+            await self.send_json(writer, 201, self.job_status(job))
         
-        # black square edge (1st sector)
-        cv2.rectangle(self.sketch, (self.gap, self.gap), (self.gap+2*self.r, self.h-self.gap),
-                      (0, 0, 0), thk)
+        elif method == 'GET' and parts == ['jobs']:     # case of jobs list request
+            await self.send_json(writer, 200, [self.job_status(j) for j in self.jobs.values()])
+        
+        elif method == 'GET' and job is not None and len(parts) == 2:  # case of job status request
+            await self.send_json(writer, 200, self.job_status(job, with_hits=True))
         
-        # black square edge (3rd sector)
-        cv2.rectangle(self.sketch, (-4, self.h-self.gap), (self.gap, self.h+4),
-                      (0, 0, 0), thk)
+        elif method == 'GET' and job is not None and parts[2:] == ['events']:  # case of progress stream request
+            await self.stream_events(job, writer)
         
-        # black circle
-        cv2.circle(self.sketch, (self.gap, self.h-self.gap), 2*self.r,
-                   (0, 0, 0), thk)
+        elif method == 'GET' and job is not None and parts[2:] == ['hits']:  # case of binary result request
+            if job['status'] != 'done':          # case the job is not completed
+                await self.send_json(writer, 409, {'error': f"job is {job['status']}"})
+                return
+            buffer = io.BytesIO()                # in memory binary buffer
+            np.save(buffer, np.array(job['result']['hits'], dtype=hits_dtype(job['spec']['dots'])))  # dots in circle per run, as .npy
+            await self.send(writer, 200, 'application/octet-stream', buffer.getvalue())
         
-        # the comand cv2.imshow() is not applied on purpose on this function
+        else:                                    # case of unknown request
+            await self.send_json(writer, 404, {'error': f'not found: {method} {path}'})
     
     
     
     
     
     
-    def resize_draw(self, thk, animation):
-        """Resizes as animation the square, circle and sectors, with fix top-right vertex."""
-        
-        if animation == 'min':                  # case the animation is set to 'min'
-            idx = [self.r]                      # a single value (the radius r) is assigned to idx
-            idx2 = [2*self.r]                   # a single value (the diameter 2*r) is assigned to idx2
-        else:                                   # case the animation is not set to 'min'
-            idx = np.linspace(0, self.r, self.r) # evenly spaced array from 0 to r, with r quantity of intervals
-            idx2 = np.linspace(self.r, 2*self.r, self.r) # evenly spaced array from r to 2*r, with r quantity of intervals
+    def submit(self, spec, cacheable=False):
+        """Creates a job from the spec, and schedules its computation.
+        A cacheable job found in the results cache is immediately done, without computation."""
+        self.job_count += 1                      # job counter is incremented
+        job = {'id': str(self.job_count),        # job id
+               'spec': spec,                     # job spec
+               'status': 'queued',               # job status (queued, running, done, failed)
+               'runs_done': 0,                   # completed runs
+               'hits_done': 0,                   # dots in circle of the completed runs
+               'result': None,                   # job result, when done
+               'error': None,                    # error message, when failed
+               'cacheable': cacheable,           # the result is looked up and stored in the results cache
+               'subscribers': []}                # queues of the clients following the job events
+        self.jobs[job['id']] = job               # job is added to the jobs dict
         
-        x2 = self.gap+2*self.r                  # x2 coordinate, based on gap and radius r
-        y1 = self.gap                           # y1 coordinate, based on gap
+        result = self.cache.get(spec) if cacheable else None  # cached result, or None
+        if result is not None:                   # case of cache hit
+            job['result'] = result               # cached result is assigned to the job
+            job['runs_done'] = result['runs_made']  # all the runs are completed
+            job['hits_done'] = sum(result['hits'])  # dots in circle of all the runs
+            job['status'] = 'done'               # job status is updated
+        else:                                    # case of cache miss
+            job['task'] = asyncio.create_task(self.run_job(job))  # job computation is scheduled
+        return job
+    
+    
+    
+    
+    
+    
+    async def run_job(self, job):
+        """Computes the job runs in batches, on the worker processes, publishing the progress."""
+        loop = asyncio.get_running_loop()        # asyncio loop
+        spec = job['spec']                       # job spec
+        hits_results = [0] * spec['runs']        # dots in circle per run (filled as the batches complete)
+    
+        async def batch(first_run, n_runs):      # coroutine computing a batch in a worker process
+            hits = await loop.run_in_executor(self.executor, run_batch, spec['dots'], spec['seed'], spec['sampler'],
+                                              spec['kernel'], spec['chunk'], first_run, n_runs, spec_region(spec))
+            return first_run, hits
         
-        for i in range(len(idx)):               #iteration over the idx intervals (one iteration in case of animation 'min')
-            # gray rectangle to 'erase' previous drawing
-            cv2.rectangle(self.sketch, (0, 0), (self.gap+2*self.r+4, self.h),
-                          (230, 230, 230), -1)
-            # black square (outer square)
-            cv2.rectangle(self.sketch, (self.gap-2*int(idx[i]), y1),
-                          (x2, self.gap+2*self.r+2*int(idx[i])), (0, 0, 0), thk)
-            
-            # black square (1st sector)
-            cv2.rectangle(self.sketch, (x2-int(idx2[i]), y1), (x2, y1+int(idx2[i])),
-                          (0, 0, 0), thk)
-            
-            # black square (3rd sector)
-            cv2.rectangle(self.sketch, (self.gap-2*int(idx[i]), y1+int(idx2[i])),
-                          (x2-int(idx2[i]), self.gap+2*self.r+2*int(idx[i])),
-                          (0, 0, 0), thk)
+        start = time.time()                      # current time is assigned to start variable
+        job['status'] = 'running'                # job status is updated
+        try:                                     # tentative
+            batches = split_runs(spec['runs'], spec['dots'], spec['chunk'], self.workers)  # batches of runs
+            for done in asyncio.as_completed([batch(first, n) for first, n in batches]):  # batches, as completed
+                first_run, hits = await done     # first run index and dots in circle of the batch
+                hits_results[first_run:first_run + len(hits)] = hits  # batch results are stored
+                job['runs_done'] += len(hits)    # completed runs are updated
+                job['hits_done'] += sum(hits)    # dots in circle of the completed runs are updated
+                self.publish(job, 'progress', self.job_status(job))  # progress is sent to the subscribers
+            job['result'] = job_result(spec, hits_results, time.time() - start)  # job result
+            if job['cacheable']:                 # case of a cacheable job
+                self.cache.put(spec, job['result'])  # result is stored into the results cache
+            job['status'] = 'done'               # job status is updated
+            self.publish(job, 'done', self.job_status(job))  # completion is sent to the subscribers
+        except Exception as e:                   # case of errors on the computation
+            job['status'] = 'failed'             # job status is updated
+            job['error'] = repr(e)               # error message is stored
+            self.publish(job, 'failed', self.job_status(job))  # failure is sent to the subscribers
+    
+    
+    
+    
+    
+    
+    def job_status(self, job, with_hits=False):
+        """Returns the job status as dict (JSON serializable); the per-run hits are optional."""
+        status = {'id': job['id'], 'status': job['status'], 'spec': job['spec'],
+                  'runs_done': job['runs_done'],
+                  'progress': round(100 * job['runs_done'] / job['spec']['runs'], 2)}
+        if job['runs_done'] > 0:                 # case there are completed runs
+            status['pi'] = region_scale(job['spec'])[0] * job['hits_done'] / (job['runs_done'] * job['spec']['dots'])  # running estimate
+        if job['result'] is not None:            # case the job is done
+            status['result'] = {k: v for k, v in job['result'].items() if with_hits or k != 'hits'}
+        if job['error'] is not None:             # case the job failed
+            status['error'] = job['error']
+        return status
+    
+    
+    
+    
+    
+    
+    def publish(self, job, event, data):
+        """Sends an event to all the clients following the job."""
+        for queue in job['subscribers']:         # iteration over the subscribers queues
+            queue.put_nowait((event, data))      # event is added to the queue
+    
+    
+    
+    
+    
+    
+    async def stream_events(self, job, writer):
+        """Streams the job progress as server-sent events, until the job ends."""
+        queue = asyncio.Queue()                  # queue receiving the job events
+        job['subscribers'].append(queue)         # queue is subscribed to the job events
+        try:                                     # tentative
+            writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n'
+                         b'Cache-Control: no-cache\r\nConnection: close\r\n\r\n')
+            event = job['status'] if job['status'] in ('done', 'failed') else 'status'  # current state
+            await self.send_event(writer, event, self.job_status(job))
+            while event not in ('done', 'failed'):  # until the job ends
+                event, data = await queue.get()  # next job event
+                await self.send_event(writer, event, data)
+        finally:                                 # in any case
+            job['subscribers'].remove(queue)     # queue is unsubscribed
+    
+    
+    
+    
+    
+    
+    async def send_event(self, writer, event, data):
+        """Writes a server-sent event."""
+        writer.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode())
+        await writer.drain()                     # waits for the data to be sent
+    
+    
+    
+    
+    
+    
+    async def send_json(self, writer, code, data):
+        """Writes an HTTP response with JSON content."""
+        await self.send(writer, code, 'application/json', json.dumps(data).encode())
+    
+    
+    
+    
+    
+    
+    async def send(self, writer, code, content_type, payload):
+        """Writes an HTTP response."""
+        reasons = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found', 409: 'Conflict',
+                   415: 'Unsupported Media Type'}
+        writer.write(f"HTTP/1.1 {code} {reasons.get(code, '')}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() + payload)
+        await writer.drain()                     # waits for the data to be sent
+
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+################# Function for the distributed workers ############################
+###################################################################################
+
+def run_worker(address):
+    """Worker of the distributed mode: connects to the coordinator at address (host:port), and computes
+    the leased runs until the job is done. Messages are JSON lines over TCP: the worker requests a lease,
+    computes its runs (each run has its own seed stream), and returns the dots in circle of each run."""
+    host, port = address.rsplit(':', 1)              # coordinator host and port
+    name = f"{socket.gethostname()}:{os.getpid()}"   # worker name, for the coordinator feedback
+    leases = 0                                       # quantity of computed leases
+    with socket.create_connection((host, int(port))) as sock:  # connection to the coordinator
+        stream = sock.makefile('rw')                 # text stream of the connection
+        while True:                                  # iteration over the leases
+            stream.write(json.dumps({'type': 'lease', 'worker': name}) + '\n')  # lease request
+            stream.flush()                           # the request is sent
+            msg = json.loads(stream.readline() or '{"type": "done"}')  # coordinator reply
             
-            # black circle
-            cv2.circle(self.sketch, (x2-int(idx2[i]), y1+int(idx2[i])), self.r+int(idx[i]),
-                       (0, 0, 0), thk)
+            if msg['type'] == 'done':                # case the job is completed (or the coordinator closed)
+                break                                # while loop is interrupted
+            if msg['type'] == 'wait':                # case there are no leases available now
+                time.sleep(msg['seconds'])           # waits before a new request
+                continue                             # next request
             
-            cv2.imshow('monte carlo', self.sketch)  # monte carlo window is shown
-            key = cv2.waitKey(10)               # showtime in ms
-            if self.check_close_req(key):       # case the window has been closed
-                self.close_window = True        # close_window is set True
-                break                           # for loop is interrupted
-        
-        if not self.close_window:               # case close_window is set False 
-            run = 0                             # zero is assigned to run variable
-            self.plot_dots(run, in_circle_cum=0, i=0, pi=0, wait=2000, startup=True) # dots plotting function
+            spec, reason = msg['spec'], None         # job spec, and reason to refuse its leases
+            if spec.get('indicator') is not None and not indicator_allowed(spec['indicator']):  # case of untrusted code
+                reason = f"indicator '{spec['indicator']}' not in the indicators setting"
+            elif spec['kernel'] == 'numba' and not numba_available:  # case the job kernel isn't available here
+                reason = "numba is not installed"    # runs of other kernels aren't mixed into the job
+            if reason is not None:                   # case the job can't be computed by this worker
+                print(f"Worker {name}: {reason}, lease refused")  # feedback is printed to the terminal
+                stream.write(json.dumps({'type': 'refuse', 'lease': msg['lease'], 'worker': name,
+                                         'reason': reason}) + '\n')  # the lease is returned to the coordinator
+                stream.flush()                       # the refusal is sent
+                stream.readline()                    # acknowledgement
+                break                                # while loop is interrupted (the lease is assigned again)
+            hits = run_batch(spec['dots'], spec['seed'], spec['sampler'], spec['kernel'],
+                             spec['chunk'], msg['first_run'], msg['n_runs'], spec_region(spec))  # dots in circle of each run
+            stream.write(json.dumps({'type': 'result', 'lease': msg['lease'], 'first_run': msg['first_run'],
+                                     'hits': hits, 'total': sum(hits)}) + '\n')  # compact result of the lease
+            stream.flush()                           # the result is sent
+            stream.readline()                        # acknowledgement
+            leases += 1                              # computed leases are incremented
+    print(f"Worker {name}: {leases} leases computed")  # feedback is printed to the terminal
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+################# Class for the distributed coordinator ###########################
+###################################################################################
+
+class Coordinator():
+    """Coordinator of the distributed mode: the runs of a job are split in leases (batches of runs),
+    fetched over TCP by the workers, on other hosts or on localhost (JSON lines, see run_worker).
+    A lease is assigned again when its worker disconnects, or when it isn't returned within lease_timeout."""
     
+    def __init__(self, spec, host, port, workers, lease_timeout, local_workers=0):
+        self.spec = spec                             # job spec
+        self.host = host                             # address the coordinator is bound to
+        self.port = port                             # TCP port of the coordinator
+        self.lease_timeout = lease_timeout           # seconds before a lease is assigned again
+        self.local_workers = local_workers           # quantity of worker processes started on localhost
+        self.batches = dict(split_runs(spec['runs'], spec['dots'], spec['chunk'], workers))  # n_runs by first_run
+        self.pending = deque(self.batches)           # first_run of the batches to be leased
+        self.leases = {}                             # (first_run, deadline) by lease id, for the assigned leases
+        self.lease_count = 0                         # counter used to assign the lease id
+        self.hits_results = [0] * spec['runs']       # dots in circle per run (filled as the leases complete)
+        self.completed = set()                       # first_run of the completed batches
+        self.runs_done = 0                           # completed runs
+        self.writers = set()                         # connections of the workers
     
     
     
     
     
-    def plot_dots(self, run, in_circle_cum, i, pi, wait, startup=False):
-        """Plots the monte carlo dots."""
-        if startup:                             # case startup is set True (sketch gets prepared)
-            cv2.rectangle(self.sketch, (self.x_text, 4*self.gap),
-                          (self.w, self.h), (230, 230, 230), -1)  # gray rectangle to 'erase' previous text
-            cv2.putText(self.sketch, f'run ', (self.x_text, 6*self.gap),
-                        self.font, self.fontScale2,(0,0,0),self.lineType)
-            cv2.putText(self.sketch, f'dots in circle ', (self.x_text, 9*self.gap),
-                        self.font, self.fontScale2,(0,0,0),self.lineType)
-            cv2.putText(self.sketch, f'total dots ', (self.x_text, 12*self.gap),
-                        self.font, self.fontScale2,(0,0,0),self.lineType)
-            cv2.putText(self.sketch, f'pi ~ ', (self.x_text, 15*self.gap),
-                        self.font, self.fontScale1,(0,0,0),self.lineType)
+    
+    def run(self):
+        """Runs the coordinator until all the runs are completed, and returns the dots in circle per run."""
+        asyncio.run(self.main())                     # the asyncio loop is started
+        return self.hits_results
+    
+    
+    
+    
+    
+    
+    async def main(self):
+        """Opens the TCP server, and waits for the job completion while the expired leases are reassigned."""
+        self.finished = asyncio.Event()              # event set when all the runs are completed
+        server = await asyncio.start_server(self.handle_worker, self.host, self.port)
+        print(f"Coordinator listening on {self.host}:{self.port}, {len(self.batches)} leases of "
+              f"{self.spec['runs']:,d} runs with {self.spec['dots']:,d} dots")
         
-        else:                                   # case startup is set False (sketch is already prepared)
-            cv2.rectangle(self.sketch, (self.x_text, 4*self.gap),
-                          (self.w, self.h), (230, 230, 230), -1)  # gray rectangle to 'erase' previous text
-            cv2.putText(self.sketch, f'run {run+1} of {self.runs}', (self.x_text, 6*self.gap),
-                        self.font, self.fontScale2,(0,0,0),self.lineType)
-            cv2.putText(self.sketch, f'dots in circle {in_circle_cum[i]:,d}', (self.x_text, 9*self.gap),
-                        self.font, self.fontScale2,(0,0,0),self.lineType)
-            cv2.putText(self.sketch, f'total dots {i+1:,d}', (self.x_text, 12*self.gap),
-                        self.font, self.fontScale2,(0,0,0),self.lineType)
-            cv2.putText(self.sketch, f'pi ~ {pi:.8f}', (self.x_text, 15*self.gap),
-                        self.font, self.fontScale1,(0,0,0),self.lineType)
+        processes = [multiprocessing.Process(target=run_worker, args=(f"127.0.0.1:{self.port}",))
+                     for _ in range(self.local_workers)]  # worker processes on localhost
+        for process in processes:                    # iteration over the local workers
+            process.start()                          # the worker process is started
         
-        cv2.imshow('monte carlo', self.sketch)  # monte carlo window is shown
+        async with server:                           # the server is closed on exit
+            while not self.finished.is_set():        # until the job is completed
+                try:                                 # tentative
+                    await asyncio.wait_for(self.finished.wait(), timeout = 1)  # waits for the job completion
+                except asyncio.TimeoutError:         # case the job is not yet completed
+                    self.expire_leases()             # expired leases are assigned again
+            await asyncio.sleep(1.5)                 # time for the waiting workers to get the 'done' reply
+            for writer in list(self.writers):        # iteration over the connections still open
+                writer.close()                       # the connection is closed
+            await asyncio.sleep(0.1)                 # time for the workers handlers to end
         
-        t_ref = time.time()                     # current time is assigne to t_ref variable
-        while time.time() - t_ref < wait/1000:  # wait is ms for cv2 imshow
-            key = cv2.waitKey(1)                # showtime in ms
-            if self.check_close_req(key):       # case the window has been closed
-                self.close_window = True        # close_window is set True
-                break                           # for loop is interrupted
+        for process in processes:                    # iteration over the local workers
+            process.join(timeout = 5)                # waits the worker process to end
     
     
     
     
     
     
-    def plot_formula(self):
-        """Prints a repetitive part of the openCV sketch (the formula) ."""
-        cv2.putText(self.sketch, f'pi ~ 4 x', (self.x_text, 3*self.gap),
-                    self.font, self.fontScale2,(0,0,0),self.lineType)
-        cv2.putText(self.sketch, f'dots in circle', (self.x_text+int(160*self.fontScale2),int(2.3*self.gap)),
-                    self.font, self.fontScale2,(0,0,0),self.lineType)
-        cv2.putText(self.sketch, f'total dots', (self.x_text+int(160*self.fontScale2), int(3.9*self.gap)),
-                    self.font, self.fontScale2,(0,0,0),self.lineType)
-        cv2.line(self.sketch, (self.x_text+int(155*self.fontScale2), int(2.7*self.gap)),
-                 (self.x_text+int(370*self.fontScale2),int(2.7*self.gap)), (0,0,0), 2)
-        
-        cv2.imshow('monte carlo', self.sketch)  # monte carlo window is shown
-        key = cv2.waitKey(1)                    # showtime in ms
-        if self.check_close_req(key):           # case the window has been closed
-            self.close_window = True            # close_window is set True
+    async def handle_worker(self, reader, writer):
+        """Serves the requests of a worker, until it disconnects.
+        The leases of a disconnected worker are assigned again."""
+        held = set()                                 # lease ids assigned to this worker
+        self.writers.add(writer)                     # connection is tracked, to be closed at the end
+        try:                                         # tentative
+            while True:                              # iteration over the worker messages
+                line = await reader.readline()       # worker message
+                if not line:                         # case the worker disconnected
+                    break                            # while loop is interrupted
+                msg = json.loads(line)               # message is parsed
+                if msg['type'] == 'lease':           # case of lease request
+                    reply = self.next_lease(held)    # next lease (or wait, or done)
+                elif msg['type'] == 'result':        # case of lease result
+                    self.complete(msg, held)         # lease result is stored
+                    reply = {'type': 'ok'}           # acknowledgement
+                elif msg['type'] == 'refuse':        # case the worker can't compute the job
+                    held.discard(msg['lease'])       # lease isn't held anymore by the worker
+                    self.release(msg['lease'], f"refused by {msg.get('worker')}: {msg.get('reason')}")
+                    reply = {'type': 'ok'}           # acknowledgement
+                else:                                # case of unknown message
+                    reply = {'type': 'error', 'error': f"unknown message type: {msg['type']}"}
+                writer.write((json.dumps(reply) + '\n').encode())  # reply is sent
+                await writer.drain()                 # waits for the data to be sent
+        except (ConnectionError, ValueError, KeyError, TypeError, OverflowError) as e:  # case of broken connection or message
+            print(f"\nWorker connection dropped: {e!r}")  # feedback is printed to the terminal
+        finally:                                     # in any case
+            for lease in held:                       # iteration over the leases still held by the worker
+                self.release(lease, 'worker disconnected')  # lease is assigned again
+            self.writers.discard(writer)             # connection isn't tracked anymore
+            writer.close()                           # the connection is closed
     
     
     
     
     
     
-    def write_log(self, pi_results, datetime):
-        """writes the estimated pi values (runs quantity) to a text file."""
-        folder = pathlib.Path().resolve()       # active folder 
-        folder = os.path.join(folder,'logs')    # folder to store the pi values
-        if not os.path.exists(folder):          # if case the folder does not exist
-            os.makedirs(folder)                 # folder is made if it doesn't exist
-        
-        fname = datetime + '_log.txt'           # file name for the log
-        fname = os.path.join(folder,fname)      # folder and file name for the settings
+    def next_lease(self, held):
+        """Returns the next lease message, 'wait' when all the leases are assigned, or 'done'."""
+        if self.finished.is_set():                   # case the job is completed
+            return {'type': 'done'}
+        if not self.pending:                         # case all the remaining leases are assigned
+            return {'type': 'wait', 'seconds': 1}    # the worker retries later (leases can be reassigned)
         
-        with open(fname, 'w') as f:             # opens the file fname in writing mode 
-            max_values = 50000                  # upper limit for the quantity of estimated pi to save
-            if len(pi_results) > max_values:    # case quantity of estimated pi values is above the limit
-                for pi in pi_results[:max_values]: # iterates estimated pi values in pi_results (first within limit)
-                    f.write(str(pi)+'\n')       # writes one estimated pi value per row
-            else:                               # case quantity of estimated pi values is within limit
-                for pi in pi_results:           # iterates on estimated pi values in pi_results
-                    f.write(str(pi)+'\n')       # writes one estimated pi value per row
+        first_run = self.pending.popleft()           # first_run of the leased batch
+        self.lease_count += 1                        # lease counter is incremented
+        lease = self.lease_count                     # lease id
+        self.leases[lease] = (first_run, time.time() + self.lease_timeout)  # batch and deadline of the lease
+        held.add(lease)                              # lease is held by the worker
+        return {'type': 'lease', 'lease': lease, 'spec': self.spec,
+                'first_run': first_run, 'n_runs': self.batches[first_run]}
     
     
     
     
     
     
-    def check_close_req(self, key):
-        """Function that verifies is the ESC button is pressed when a CV2 window is opened.
-        It also checks if the window closing 'X' of 'pi' window is pressed.
-        The function returns True in case of window closig request."""
+    def complete(self, msg, held):
+        """Stores the result of a lease. Late results of reassigned leases are accepted once."""
+        first_run, hits = int(msg['first_run']), [int(h) for h in msg['hits']]  # batch and dots in circle
+        if first_run in self.batches and (len(hits) != self.batches[first_run] or sum(hits) != msg['total']):
+            raise ValueError(f"inconsistent result for the runs from {first_run}")  # lease is assigned again
+        for h in hits:                               # iteration over the dots in circle of the batch
+            check_hits(h, self.spec['dots'])         # dots in circle are checked (OverflowError)
         
-        try:                                    # tentative
-            # method to close CV2 windows, via the mouse click on the windows bar X
-            if cv2.getWindowProperty("monte carlo", cv2.WND_PROP_VISIBLE) <1:  # X on top bar 
-                return True                     # True is returned
-        except:                                 # except case     
-            pass                                # do nothing
+        held.discard(msg['lease'])                   # lease isn't held anymore by the worker
+        self.leases.pop(msg['lease'], None)          # lease isn't assigned anymore
+        if first_run in self.completed or first_run not in self.batches:  # case of duplicate or unknown batch
+            return                                   # function is exited
         
-        if key == 27 & 0xFF:                    # ESC button method to close CV2 windows
-            return True                         # True is returned
+        self.hits_results[first_run:first_run + len(hits)] = hits  # batch results are stored
+        self.completed.add(first_run)                # batch is completed
+        if first_run in self.pending:                # case the batch was also waiting to be reassigned
+            self.pending.remove(first_run)           # batch is removed from the pending ones
+        self.runs_done += len(hits)                  # completed runs are updated
+        print(f"\r{self.runs_done:,d} of {self.spec['runs']:,d} runs completed "
+              f"({100 * self.runs_done / self.spec['runs']:.1f}%)", end='', flush=True)
+        if self.runs_done == self.spec['runs']:      # case all the runs are completed
+            print()                                  # new line after the progress
+            self.finished.set()                      # job completion is notified
     
     
     
     
     
     
-    def prepare_sketch(self, animation):
-        """Prepares the sketch."""
-        self.init_draw()                        # init_draw function is called (prepare the sketch)
+    def expire_leases(self):
+        """Assigns again the leases that exceeded their deadline."""
+        now = time.time()                            # current time
+        for lease, (first_run, deadline) in list(self.leases.items()):  # iteration over the assigned leases
+            if deadline < now:                       # case the lease is expired
+                self.release(lease, 'lease timeout') # lease is assigned again
+    
+    
+    
+    
+    
+    
+    def release(self, lease, reason):
+        """Puts back the batch of a lease into the pending ones (at first position), if not completed."""
+        first_run, _ = self.leases.pop(lease, (None, None))  # batch of the lease
+        if first_run is not None and first_run not in self.completed and first_run not in self.pending:
+            self.pending.appendleft(first_run)       # batch will be the next to be leased
+            print(f"\nRuns from {first_run:,d} leased again ({reason})")  # feedback is printed to the terminal
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+###################### Class for the slides cache #################################
+###################################################################################
+
+class SlideCache():
+    """Cache of the info slides, decoded and scaled to the screen (85% of it, keeping the aspect ratio).
+    The slides are preloaded by a background thread at startup, and held in memory up to max_mb (least
+    recently used ones are dropped). The scaled slides are also saved to the disk cache (cache/slides,
+    one folder per screen size), so that later launches skip the decoding of the full-size images."""
+    
+    def __init__(self, fnames, screen, max_mb=64):
+        self.fnames = fnames                         # slides file names
+        self.screen = screen                         # screen width and height
+        self.max_bytes = int(max_mb * 2**20)         # memory limit of the scaled slides
+        self.folder = os.path.join(pathlib.Path().resolve(), 'cache', 'slides', f"{screen[0]}x{screen[1]}")
+        self.images = {}                             # scaled slides (PIL images), by file name, in use order
+        self.lock = RLock()                          # lock, as the slides are loaded also by the preload thread
+    
+    
+    
+    
+    
+    
+    def preload(self):
+        """Starts the background thread loading all the slides."""
+        Thread(target = lambda: [self.get(fname) for fname in self.fnames], daemon = True).start()
+    
+    
+    
+    
+    
+    
+    def get(self, fname):
+        """Returns the scaled slide, from memory, from the disk cache, or decoded and scaled from fname.
+        The lock is only held to look up and store the slides: a slide shown by the GUI is decoded without
+        waiting for the one decoded by the preload thread."""
+        with self.lock:                              # the cache is locked
+            if fname in self.images:                 # case the slide is in memory
+                self.images[fname] = self.images.pop(fname)  # slide is moved to the most recently used
+                return self.images[fname]
         
-        if not self.close_window:               # in case close_window is not set True
-            self.draw_square(thk=1)             # black square edge
+        cached = os.path.join(self.folder, pathlib.Path(fname).stem + '.png')  # disk cache file
+        if os.path.exists(cached) and os.path.getmtime(cached) >= os.path.getmtime(fname):  # case of valid disk cache
+            img = Image.open(cached)                 # scaled slide from the disk cache
+            img.load()                               # slide is decoded (and the file closed)
+        else:                                        # case of slide not yet scaled for this screen
+            img = Image.open(fname)                  # full-size slide
+            k = 0.85 * min(self.screen[0] / img.width, self.screen[1] / img.height)  # scale of the slide
+            size = (int(k * img.width), int(k * img.height))  # size of the scaled slide
+            img.draft('RGB', size)                   # JPEG is decoded at reduced scale, when downscaled
+            img = img.convert('RGB').resize(size)    # slide is scaled
+            temp = f"{cached}.{os.getpid()}_{get_ident()}"  # temporary file, of this thread only
+            try:                                     # tentative
+                os.makedirs(self.folder, exist_ok=True)  # folder is made if it doesn't exist
+                img.save(temp, format = 'PNG', compress_level = 1)  # scaled slide is saved to the disk cache
+                os.replace(temp, cached)             # the complete file replaces the cached one (atomic)
+            except OSError:                          # case the disk cache can't be written
+                pass                                 # do nothing (the slide is only kept in memory)
         
-        if not self.close_window:               # in case close_window is not set True 
-            thk=1                               # thickness is set to 1
-            self.draw_circle(thk, animation)    # circle in square is drawn
+        with self.lock:                              # the cache is locked
+            if fname in self.images:                 # case the slide was stored meanwhile by the other thread
+                return self.images[fname]
+            self.images[fname] = img                 # slide is stored in memory
+            while sum(3 * i.width * i.height for i in self.images.values()) > self.max_bytes and len(self.images) > 1:
+                del self.images[next(iter(self.images))]  # least recently used slide is dropped
+            return img
+# #################################################################################
+
+
+
+
+
+
+
+###################################################################################
+###################### Class for the live charts ##################################
+###################################################################################
+
+class LiveCharts():
+    """Window with the histogram, error and st.dev charts, updated during a job.
+    The histogram has fixed bins (pi +/- 5 expected st.dev of the runs, from the dots per run), and the
+    error and st.dev lines are extended with the new runs. Only the changing artists are redrawn, over a
+    cached background (matplotlib blitting), at most fps times per second; the full figure is redrawn
+    only when the data exceed the axes limits, or the window is resized."""
+    
+    def __init__(self, master, runs, dots, fps=4):
+        self.runs = runs                             # runs charted at most (x axis limit)
+        self.period = 1 / fps                        # minimum seconds between two redraws
+        self.last_draw = 0                           # time of the last redraw
+        self.pending = False                         # case there are updates not yet drawn
+        self.background = None                       # figure pixels without the animated artists
         
-        if not self.close_window:               # in case close_window is not set True     
-            self.plot_formula()                 # formula is plotted to the openCV sketch
+        self.window = tk.Toplevel(master)            # live charts window
+        self.window.title('Live charts')             # title for the new tkinter window
+        self.window.protocol("WM_DELETE_WINDOW", self.close)  # the window can be closed during the job
+        self.figure = Figure(figsize = (7, 7), tight_layout = True)  # figure, not shared with pyplot
+        self.ax_hist, self.ax_error, self.ax_st_dev = self.figure.subplots(3, 1)  # one axes per chart
         
-        if not self.close_window:               # in case close_window is not set True
-            # some sleep time to let user realizing about the graphic on screen
-            wait = 3                            # 3 is assigned to wait variable
-            t_ref = time.time()                 # current time is assigned to t_ref variable 
-            while time.time() - t_ref < wait:   # while loop for wait seconds
-                cv2.imshow('monte carlo', self.sketch) # monte carlo window is shown
-                key = cv2.waitKey(1)            # showtime in ms
-                if self.check_close_req(key):   # case the window has been closed
-                    self.close_window = True    # close_window is set True
-                    break                       # while loop is interrupted
+        sd = 4 * math.sqrt(np.pi / 4 * (1 - np.pi / 4) / dots)  # expected st.dev of the runs estimated pi
+        step = 4 / dots                              # spacing of the runs estimated pi values
+        width = step * max(1, round(sd / 5 / step))  # bins width, a multiple of the values spacing
+        start = (math.floor((np.pi - 25 * width) / step) - 0.5) * step  # first edge, between two values
+        self.edges = start + width * np.arange(51)   # fixed bins edges (50 bins, about pi +/- 5 st.dev)
+        self.counts = np.zeros(50, dtype = np.int64) # counts per bin
+        self.bars = self.ax_hist.bar(self.edges[:-1], np.zeros(50), width = np.diff(self.edges), align = 'edge',
+                                     color = 'skyblue', edgecolor = 'black', animated = True)  # histogram bars
+        self.error_line, = self.ax_error.plot([], [], color = 'k', linewidth = 1, animated = True)  # error line
+        self.st_dev_line, = self.ax_st_dev.plot([], [], color = 'k', linewidth = 1, animated = True)  # st.dev line
         
-        if not self.close_window:               # in case close_window is not set True
-            thk=1                               # thickness is set to 1
-            self.resize_draw(thk, animation)    # resize_draw function is called (from 4 sectors to 1st sector)
+        self.ax_hist.set_xlim(self.edges[0], self.edges[-1])  # fixed bins range
+        self.ax_hist.set_ylim(0, max(10, 0.1 * runs))  # about the expected top of the histogram
+        self.ax_hist.set_title(f'runs of {dots:,d} dots', fontsize = 10)
+        self.ax_hist.set_xlabel('pi approximated values')   # x axis label is assigned
+        for ax, label, limit in ((self.ax_error, 'error', sd), (self.ax_st_dev, 'st.dev', 2 * sd)):
+            ax.set_xlim(1, max(2, runs))             # x axis covers all the charted runs
+            ax.set_ylim(-limit if ax is self.ax_error else 0, limit)  # about the expected range
+            ax.set_ylabel(label)                     # y axis label is assigned
+            ax.grid(linewidth = 1)                   # chart grid is added
+        self.ax_st_dev.set_xlabel('runs')            # x axis label is assigned
+        
+        self.canvas = FigureCanvasTkAgg(self.figure, master = self.window)  # figure embedded in the window
+        self.canvas.get_tk_widget().pack(side = tk.TOP, fill = tk.BOTH, expand = 1)
+        self.canvas.mpl_connect('draw_event', self.on_draw)  # background is cached at each full redraw
+        self.canvas.draw()                           # first full redraw
     
     
     
     
     
     
-    def print_time(self):
-        """Cecks if time is synchronized at Raspberry Pi."""
-        try:           # tentative
-            output = subprocess.check_output(["timedatectl", "status"])   # timedatectl status
-            output = output.decode("utf-8")     # output is converted from Unicode 8 bit characters
-            if "synchronized: yes" in output:   # case datetime is synchronized
-                print(dt.datetime.now().strftime("%Y-%m-%d  %H:%M:%S"))
-        except:        # case of exception
-            pass       # do nothing
+    def on_draw(self, event):
+        """Caches the background after a full redraw, and draws the animated artists over it."""
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)  # figure pixels without animated artists
+        self.draw_artists()                          # animated artists are drawn
+    
+    
+    
+    
+    
+    
+    def draw_artists(self):
+        """Draws the animated artists (histogram bars, error and st.dev lines)."""
+        for bar in self.bars:                        # iteration over the histogram bars
+            self.ax_hist.draw_artist(bar)            # bar is drawn
+        self.ax_error.draw_artist(self.error_line)   # error line is drawn
+        self.ax_st_dev.draw_artist(self.st_dev_line) # st.dev line is drawn
+    
+    
+    
     
     
     
+    def update(self, new_results, x, error, st_dev, force=False):
+        """Adds the new runs to the histogram, and sets the error and st.dev lines (charts data arrays).
+        The charts are redrawn when the last redraw is older than the period (or when forced)."""
+        if self.window is None:                      # case the window has been closed
+            return                                   # function is exited
+        if len(new_results):                         # case of new runs
+            values = np.clip(new_results, self.edges[0], self.edges[-1])  # values outside the bins at the edges
+            self.counts += np.histogram(values, bins = self.edges)[0]  # new runs are counted
+            self.error_line.set_data(x, error)       # error line is extended
+            self.st_dev_line.set_data(x, st_dev)     # st.dev line is extended
+            self.pending = True                      # the charts need to be redrawn
+        if self.pending and (force or time.time() - self.last_draw >= self.period):  # case of redraw
+            self.redraw(error, st_dev)               # charts are redrawn
     
     
     
-    def monte_carlo(self, runs, dots, animation):
-        """This is the key program part for the Monte Carlo."""
-        
-        start = time.time()                     # current time is assignet to start variable
-        self.print_time()
-        
-        self.s = settings.get_settings()        # settings are retrieved
-        wait_a = int(self.s['wait'])            # wait is 'loaded' each time this function is called
-        step = int(str(self.s['step']))         # delay reduction step of the wait parameter
-        newstep = step                          # step is assigned to newstep
-        
-        self.pi_results = []                    # list for the estimated pi values (one value each run)
-        
-        # assigning local variables (from arguments) to montecarlo class 
-        self.runs = runs                        # runs in argument is assigned to the montecarlo Class
-        self.dots = dots                        # dots in argument is assigned to the montecarlo Class
-        self.animation = animation              # animation in argument is assigned to the montecarlo Class
-        
-        # variables intended to be returned are initialized
-        # this is done to prevent issues in case the the window gets closed before completion
-        self.pi_ext = 3.14                      # 3.14 is assigned to pi_ext
-        self.pi_error = 0                       # zero is assiged to pi_error
-        self.pi_st_dev = 0                      # zero is assiged to pi_st_dev
-        self.pi_error = 0                       # zero is assiged to pi_error
-        self.datetime = ''                      # empty string is assiged to datetime
-        
-        # the sketch gets prepared
-        if not self.close_window or not tk_running:  # in case close_window is not set True or tk got closed
-            self.prepare_sketch(self.animation) # the sketch gets prepared (square, circle, quadrants, formula,etc)               
-        
-        
-        # iterative part of the montecarlo function              
-        for run in range(self.runs):            # iteration over the runs
-            
-            if self.close_window or not tk_running:  # in case close_window is not set True or tk got closed
-                break                           # for loop is interrupted
-            
-            ########################   the key montecarlo part are these few lines of code   ##################
-            x = uniform(low=0.0, high=1.0, size=self.dots)  # uniform distributed array for x coordinates (size=self.dots) 
-            y = uniform(low=0.0, high=1.0, size=self.dots)  # uniform distributed array for y coordinates (size=self.dots) 
-            d = np.sqrt(x**2 + y**2)                   # d (distance) array of the (x,y) point from origin (0,0)
-            in_circle = np.array(d <= 1, dtype = np.int8)  # boolean array for the points within the circle area
-            in_circle_cum = np.cumsum(in_circle, dtype = np.int32) # array with cumulative sum of the points within circle
-            
-            # array with extimated pi value, from the second iteration onward (zero division prevention)
-            pi_arr = np.array([in_circle_cum[i]*4/i for i in range(1, self.dots)], dtype = np.float64)
-            pi_arr = np.insert(pi_arr, 0, 4, axis=0)  # an arbitarry value of '4' is added in front
-            
-            pi_ext = pi_arr[self.dots-1]              # estimated pi is the last value of the pi_arr
-            self.pi_results.append(pi_ext)            # the stimated pi is appendende to the pi_results list           
-            self.pi_error = pi_ext-np.pi              # the error of the estimated pi is assigned to pi_error list
-            # #################################################################################################
-
-            
-            # iterative part within each run
-            for i in range(self.dots):                # iteration over the dots
-                
-                if self.close_window or not tk_running:  # in case close_window is not set True or tk got closed
-                    break                             # for loop is interrupted
-                
-                
-                
-                # notes about the animation
-                
-                # when animation 'max':
-                    # First run the dots are plot with increasing speed
-                    # From second run dots are plot with the last speed used in 1st run
-                
-                # when animation 'med':
-                    # First run the dots are plot with increasing speed
-                    # From second run all dots are plot together
-                
-                # when animation 'min':
-                    # First run the dots are plot with increasing speed
-                    # From second run to last but, dots arenot printed
-                    # The last run all dots are plotted together
-                
-                if animation == 'max' or animation == 'med' or run == 0 or run == self.runs-1:
-                    if d[i] <= 1:      # case the dot falls within the circle: d array (distance) at pos i has value <= 1
-                                       # dot is printed in blue
-                        cv2.circle(self.sketch, (self.gap+int(2*self.r*x[i]),
-                                                 self.h-self.gap-int(2*self.r*(y[i]))), 1, (255, 0, 0), -1)
-                    else:              # case the dot falls outside the circle: : d array (distance) at pos i has value > 1
-                                       # dot is printed in red
-                        cv2.circle(self.sketch, (self.gap+int(2*self.r*x[i]),
-                                                 self.h-self.gap-int(2*self.r*(y[i]))), 1, (0, 0, 255), -1)
-                    
-                    if self.close_window or not tk_running:  # in case close_window is not set True or tk got closed
-                        break                         # for loop is interrupted
-                
-                    if run==0 or animation == 'max':  # case of the 1st run or animation is set 'max'
-                        
-                        if i % self.step == 0 and not self.close_window:   # case the iteration have not reached the 'step' value
-                            self.pi_ext = pi_arr[i]   # the estimated pi value is retrieved from pi_arr (array of estimated pi values)
-                            self.plot_dots(run, in_circle_cum, i, self.pi_ext, wait_a) # dots and updated info are plotted
-                            
-                            # approach used to make the animation accelerating 
-                            newstep = max(1, i // 100)  # for the first 100 dots the new step remins at one 
-                            if newstep > step:        # case newstep is bigger than the step
-                                step = newstep        # newstep is assigned to step
-                                wait_a -= 10          # wait_a time is reduced by 10 (ms)
-                                wait_a = max(1, wait_a) # wait_a time is never smaller than 1 ms
-            
-            
-            # last update for the printed dots and informations
-            self.plot_dots(run, in_circle_cum, self.dots-1, pi_ext, wait=1)
-            
-            # iteration results are sent to the queue, via a ticket, and a tkinter event generator is called
-            ticket = Ticket(ticket_type=TicketPurpose.SHARE_PI_VALUE,
-                            ticket_run = run,
-                            ticket_value = f"{pi_arr[i-1]}",
-                            ticket_bg = 'no',
-                            ticket_progress = 100 * (run+1) / runs )  # ticket with the iteration results
-            queue_manager.queue_message.put(ticket)   # ticket is added to the queue
-            gui.trigger_event()                       # an event is generated at the GUI class
-            
-            
-            
-            if run == self.runs-1 and not self.close_window:  # case the run is the last one (and no closure request)
-                
-                # resuming the overall results
-                pi_ext = sum(self.pi_results)/self.runs   # average pi value is calculated
-                self.pi_error = pi_ext-np.pi          # deviation from pi value
-                self.pi_st_dev = np.std(self.pi_results)  # standard deviation of the calculated pi values
-                
-                
-                # overal results are sent to the queue, via a ticket, and a tkinter event generator is called
-                ticket = Ticket(ticket_type=TicketPurpose.SHARE_PI_VALUE,
-                                ticket_run = run,
-                                ticket_value = f"{pi_ext}",
-                                ticket_bg = 'yes',
-                                ticket_progress= 100 * (run+1) / runs)  # ticket with the the overall results
-                queue_manager.queue_message.put(ticket)  # ticket is added to the queue
-                gui.trigger_event()                   # an event is generated at the GUI class
-                
-                
-                # another the printed dots update, to incorporate the overall pi value
-                self.plot_dots(run, in_circle_cum, self.dots-1, pi_ext, wait=1)
-                
-                
-                # iteration results are printed on the monte carlo window
-                if self.runs == 1:                    # case the set runs is one
-                    cv2.rectangle(self.sketch, (self.x_text, 4*self.gap),
-                                  (self.w, 7*self.gap), (230, 230, 230), -1)  # gray rectangle to 'erase' previous text
-                    cv2.putText(self.sketch, f'made {self.runs} iteration', (self.x_text, 6*self.gap),
-                                self.font, self.fontScale2,(0,0,0),self.lineType)  # text plot to the sketch
-                else:                                 # case the set runs is not one
-                    cv2.rectangle(self.sketch, (self.x_text, 4*self.gap),
-                                  (self.w, 10*self.gap), (230, 230, 230), -1)  # gray rectangle to 'erase' previous text
-                    cv2.putText(self.sketch, f'made {self.runs} iterations', (self.x_text, 6*self.gap),
-                                self.font, self.fontScale2,(0,0,0),self.lineType)  # text plot to the sketch
-                    cv2.putText(self.sketch, f'each one with', (self.x_text, 9*self.gap),
-                                self.font, self.fontScale2,(0,0,0),self.lineType)  # text plot to the sketch
-                    cv2.putText(self.sketch, f'error = {self.pi_error:.8f}', (self.x_text, 18*self.gap),
-                                self.font, self.fontScale1,(0,0,0),self.lineType)  # text plot to the sketch
-                    cv2.putText(self.sketch, f'st.dev = {self.pi_st_dev:.8f}', (self.x_text, 21*self.gap),
-                                self.font, self.fontScale1,(0,0,0),self.lineType)  # text plot to the sketch
-                
-                # enlarge black lines to visually increase separation between the circle and the square area
-                self.redraw(thk=2, clean=False)       # enlarged the arc and square borders
-                self.draw_arc(thk=2)                  # black circle, tick edge
-            
-            # updating the monte carlo windows
-            if not self.close_window and not self.close_window: # case no request to quit (and no closure request)
-                cv2.imshow('monte carlo', self.sketch)  # monte carlo windows is shown
-            else:                                     # case there is a request to quit
-                break                                 # for loop is interupted
     
-            
-            # quickly resuming the results of each run in the openCV window
-            if not self.close_window:                 # case no request to quit
-                if animation == 'min':                # case the animation selected is 'min'
-                    cv2.waitKey(1)                    # showtime in ms (1ms)
-                
-                elif animation == 'med':              # case the animation selected is 'med'
-                    cv2.waitKey(100)                  # showtime in ms (0.1 s)
-                
-                elif animation == 'max':              # case the animation selected is 'max'
-                    t_ref = time.time()               # current time is assigned to t_ref variable
-                    while time.time() - t_ref < 1:    # while loop for 1 second
-                        key = cv2.waitKey(1)          # showtime in ms (of the last shown window)
-                        if self.check_close_req(key): # case the window has been closed
-                            self.close_window = True  # close_window is set True
-                            break                     # while loop is interrupted
-                       
-            else:                                     # case there is a request to quit
-                break                                 # for loop is interupted
-            
-            # the openCV area is cleaned, for the next iteration
-            self.redraw(thk=1, clean=True)            # redraw function is called in 'cleaning' mode
-                
-        if run == self.runs-1:                        # case it is the last run
-            t_ref = time.time()                       # current time is assigned to t_ref variable
-            while time.time() - t_ref < 10:           # while loop for 10 seconds
-                key = cv2.waitKey(1)                  # showtime in ms (of the last shown window)
-                if self.check_close_req(key):         # case the window has been closed
-                    self.close_window = True          # close_window is set True
-                    break                             # while loop is interrupted
-                    
-        cv2.destroyAllWindows()                       # all openCV windows are closed
-        
-        if tk_running:                                # case tkinter is runnig
-            if self.close_window:                     # case the openCV window got closed
-                
-                # case there is at least one run completed
-                if self.runs > 1 and run > 0 and len(self.pi_results)>=1: 
-                    self.pi_ext = sum(self.pi_results) / (run + 1) # estimated pi is calculated on the runs made (run)
-                    self.pi_error = self.pi_ext - np.pi      # error of estimated pi from pi is calculated 
-                    self.pi_st_dev = np.std(self.pi_results) # st.dev of estimated pi is calculated on the runs made (run)
-                    print("Interrupted runs before end")   # feedback is printed to terminal
-                    print(f"Made a total of {run} runs, each one with {self.dots} dots") # feedback is printed to terminal
-                    print(f"Estimated pi = {self.pi_ext:.8f}") # feedback is printed to terminal
-                    print(f"Error = {self.pi_error:.8f}")    # feedback is printed to terminal
-                    print(f"St.dev = {self.pi_st_dev:.8f}")  # feedback is printed to terminal
-                    
-            else:                                     # case the openCV window is not closed
-                self.pi_ext = sum(self.pi_results) / self.runs # estimated pi is calculated
-                self.pi_error = self.pi_ext - np.pi   # error of estimated pi from pi is calculated 
-                if runs == 1 or run == 1:             # case of one single run
-                    print(f"Made one run with {self.dots} dots") # feedback is printed to terminal (singular form)
-                elif run>1:                           # case of more runs
-                    print(f"\nMade a total of {self.runs} runs, each one with {self.dots} dots")
-                print(f"Estimated pi = {self.pi_ext:.8f}") # feedback is printed to terminal
-                print(f"Error = {self.pi_error:.8f}")   # feedback is printed to terminal
-                print(f"St.dev = {self.pi_st_dev:.8f}") # feedback is printed to terminal
-            
+    
+    
+    def redraw(self, error, st_dev):
+        """Redraws the animated artists over the cached background, or the full figure when the data
+        exceed the axes limits (the limits are doubled)."""
+        for bar, count in zip(self.bars, self.counts):  # iteration over the histogram bars
+            bar.set_height(count)                    # bar height is updated
         
-            # analysis time is printed to terminal if at least one complete run
-            if len(self.pi_results) >= 1:             # case there is at least one run completed
-                tot_time = time.time()-start          # analysis time in seconds (float) is calculated
-                hours = int(tot_time // 3600)         # hours are calculated
-                minutes = int(tot_time % 3600 // 60)  # minutes are calculated
-                seconds = int(tot_time % 3600 % 60)   # seconds are calculated
-                
-                # time is printed to terminal
-                print("Total time =", '{:02d}:{:02d}:{:02d}'.format(hours, minutes, seconds), "(animation =", str(animation)+")")
-                print("\n"*3)                         # 3 empty lines are printed
-            
-            
-            # a datetime reference is generated, for file name generation
-            self.datetime = dt.datetime.now().strftime('%Y%m%d_%H%M%S')  # date_time variable is assigned, for file name generation
-            
-            if len(self.pi_results) >= 10:            # case there are at least 10 runs completed
-                self.write_log(self.pi_results, self.datetime) # pi values data is saved into a text file
-            
-            # resets the close windows variable, for eventual new runs
-            self.close_window = False                 # close_window is set Fasle
+        full = self.background is None               # case there is no cached background
+        for ax, top in ((self.ax_hist, self.counts.max()), (self.ax_error, np.abs(error).max(initial = 0)),
+                        (self.ax_st_dev, np.max(st_dev, initial = 0))):  # axes and the top of their data
+            low, high = ax.get_ylim()                # current y limits
+            if top > high:                           # case the data exceed the limit
+                ax.set_ylim(-2 * top if low < 0 else low, 2 * top)  # limits are doubled
+                full = True                          # a full redraw is needed
         
-        # this function has a return
-        return self.pi_ext, self.pi_st_dev, self.pi_error, self.pi_results, self.datetime
-
+        if full:                                     # case of full redraw
+            self.canvas.draw()                       # full redraw (the background is cached by on_draw)
+        else:                                        # case of blitting
+            self.canvas.restore_region(self.background)  # cached background is restored
+            self.draw_artists()                      # animated artists are drawn
+            self.canvas.blit(self.figure.bbox)       # only the figure area is updated
+        self.canvas.flush_events()                   # pending tkinter events are processed
+        self.last_draw = time.time()                 # time of this redraw
+        self.pending = False                         # the charts are up to date
+    
+    
+    
+    
+    
+    
+    def close(self):
+        """Closes the live charts window."""
+        if self.window is not None:                  # case the window is open
+            try:                                     # tentative
+                self.window.destroy()                # window is destroyed
+            except tk.TclError:                      # case of tkinter exception
+                pass                                 # do nothing
+            self.window = None                       # the window is closed
 # #################################################################################
 
 
@@ -818,6 +4443,8 @@ class GUI(tk.Tk):
         
         ########################### setting variables #############################
         self.histogram_window = None                  # histogram_window is initially set as None
+        self.live_charts = None                       # live charts window, only open during a job
+        self.reset_chart_data()                       # charts data is initialized
         
         self.s = settings.get_settings()              # settings are retrieved
         
@@ -843,7 +4470,7 @@ class GUI(tk.Tk):
         self.slide_num = 0                            # initial slide (at INFO) to start the scrolling 
         
     
-
+        
         ########################### setting the gui #####################################
         self.title("pi approximator")                 # name is assigned to GUI root
         self.rowconfigure(0, weight=1)                # root is set to have 1 row of  weight=1
@@ -853,6 +4480,21 @@ class GUI(tk.Tk):
         self.ws = self.winfo_screenwidth()            # retrieves the width of the screen
         self.hs = self.winfo_screenheight()           # retrieves the height of the screen
         
+        # manage the slides images
+        self.slides = []                              # empty list to append the slides
+        slides_quantity = 9                           # number of slides
+        folder = pathlib.Path().resolve()             # active folder
+        
+        # list with slides names is generated
+        slide_names = ['Slide' + str(i) + '.jpg' for i in range(1, slides_quantity+1, 1)]
+        
+        for fname in slide_names:                     # iteration over the slide names in slides names
+            img_fname = os.path.join(folder, 'info', fname) # folder and file name for the settings
+            self.slides.append(img_fname)             # slide image names are appended to the list 'slides'
+        
+        self.slide_cache = SlideCache(self.slides, (self.ws, self.hs))  # cache of the scaled slides
+        self.slide_cache.preload()                    # slides are loaded in background, while the GUI starts
+        
         
         if device == 'Rpi':                           # case the scripts is running on Raspberry Pi
             self.gui_w = 520                          # gui window width
@@ -898,6 +4540,7 @@ class GUI(tk.Tk):
         """ Read the queue.
         Based on https://www.youtube.com/watch?v=ghSDvtVJPck"""
         
+        t_ref = montecarlo.timings.tic()              # time reference for the tk_queue phase
         msg: Ticket                                   # annotation that msg variable is of a Ticket type
         msg = queue_manager.queue_message.get()       # queue content is retrieved, and assigned to msg
         
@@ -937,7 +4580,10 @@ class GUI(tk.Tk):
                         text = days + "d  " + hhmmss
                         self.remaining_t_label.configure(text = text)  # label 'remaining_t_label' is updated
             
+            self.consume_runs()                       # charts data (and live charts) updated with the new runs
             self.mainWindow.update()                  # tkinter mainWindow is forced updated, to secure the label update
+        
+        montecarlo.timings.toc('tk_queue', t_ref)     # time spent by tkinter on the queue is accumulated
     
     
     
@@ -951,19 +4597,19 @@ class GUI(tk.Tk):
         #### runs related widgets ####
         self.runs_label = tk.LabelFrame(self.mainWindow, text="RUNS", labelanchor="nw", font=("Arial", "14"))
         self.runs_label.grid(row=0, column=0, rowspan=1, columnspan=3, sticky="nsew", padx=10, pady=(6, 0))
-
+        
         # label for runs
         self.t_runs = tk.Label(self.runs_label, text = self.runs, width = 7, anchor = 'w', font=('arial','18'))
         self.t_runs.grid(row=0, column=0, sticky="W", padx=12, pady=(0, 0))
-
+        
         # slider for the units
         self.s_runs_unit = tk.Scale(self.runs_label, label="UNIT", font=('arial','14'), orient='horizontal',
                                   relief='raised', length=160, from_=1, to_=9, resolution=1) 
         self.s_runs_unit.grid(row=0, column=1, sticky="w", padx=12, pady=(0, 0))
         self.s_runs_unit.set(self.runs_unit)
         self.s_runs_unit.bind("<ButtonRelease-1>", self.f_runs_unit)
-
-
+        
+        
         # slider for the multiplier (10 to the power of the slider value)
         self.s_runs_multiplier = tk.Scale(self.runs_label, label="x 10^", font=('arial','14'), orient='horizontal',
                                   relief='raised', length=160, from_=0, to_=5, resolution=1) 
@@ -977,22 +4623,22 @@ class GUI(tk.Tk):
         #### dots related widgets ####
         self.dots_label = tk.LabelFrame(self.mainWindow, text="DOTS", labelanchor="nw", font=("Arial", "14"))
         self.dots_label.grid(row=1, column=0, rowspan=1, columnspan=3, sticky="nsew", padx=10, pady=(6, 0))
-
+        
         # label for runs
         self.t_dots = tk.Label(self.dots_label, text = self.dots, width = 7, anchor = 'w', font=('arial','18'))
         self.t_dots.grid(row=1, column=0, sticky="W", padx=12, pady=(0, 0))
-
+        
         # slider for the units
         self.s_dots_unit = tk.Scale(self.dots_label, label="UNIT", font=('arial','14'), orient='horizontal',
                                   relief='raised', length=160, from_=1, to_=9, resolution=1) 
         self.s_dots_unit.grid(row=1, column=1, sticky="w", padx=12, pady=(0, 0))
         self.s_dots_unit.set(self.dots_unit)
         self.s_dots_unit.bind("<ButtonRelease-1>", self.f_dots_unit)
-
-
+        
+        
         # slider for the multiplier (10 to the power of the slider value)
         self.s_dots_multiplier = tk.Scale(self.dots_label, label="x 10^", font=('arial','14'), orient='horizontal',
-                                  relief='raised', length=160, from_=3, to_=6, resolution=1) 
+                                  relief='raised', length=160, from_=3, to_=8, resolution=1) 
         self.s_dots_multiplier.grid(row=1, column=2, sticky="w", padx=12, pady=(0, 0))
         self.s_dots_multiplier.set(self.dots_multiplier)
         self.s_dots_multiplier.bind("<ButtonRelease-1>", self.f_dots_multiplier)
@@ -1030,13 +4676,13 @@ class GUI(tk.Tk):
         #### Monte Carlo method related widgets ####
         self.pi_label = tk.LabelFrame(self.mainWindow, text="MONTE CARLO", labelanchor="nw", font=("Arial", "14"))
         self.pi_label.grid(row=3, column=1, rowspan=3, columnspan=2, sticky="nsew", padx=(5,10), pady=8)
-
+        
         # btn to get info on screen
         self.b_info = tk.Button(self.pi_label, text="INFO",
                                 command=lambda: self.show_info(self.h), height=1, width=7)
         self.b_info.configure(font=("Arial", "16"))
         self.b_info.grid(column=0, row=1, sticky="nsew", rowspan=2, padx=15, pady=4)
-
+        
         # btn to start the Monte Carlo method
         self.b_pi = tk.Button(self.pi_label, text="\u03C0", command=self.start_monte_carlo , height=1, width=4) 
         if device == 'Rpi':                           # case the scripts is running on Raspberry Pi
@@ -1168,12 +4814,8 @@ class GUI(tk.Tk):
     
     
     def show_slide(self, slide_num):
-        """Function that loads and show images."""
-        img = self.slides[slide_num]                  # image is selected from the slides list
-        img = Image.open(img)                         # load the image
-        img_w, img_h = img.size                       # image size
-        k = min(self.ws/img_w, self.hs/img_h)         # coefficient screen vs image size
-        img = img.resize((int(0.85*k*img_w),int(0.85*k*img_h))) # image resized
+        """Function that shows the images (decoded and scaled by the slides cache)."""
+        img = self.slide_cache.get(self.slides[slide_num])  # scaled image of the selected slide
         img = ImageTk.PhotoImage(img)                 # display image
         self.panel.img = img                          # keep a reference so it's not garbage collected
         self.panel['image'] = img                     # image is assigned to panel dictionary
@@ -1188,7 +4830,7 @@ class GUI(tk.Tk):
         info_window = tk.Toplevel(self.mainWindow)    # info_window is created
         info_window.title("Info")                     # info_window title
         info_window.config(width= int(1.7*h), height=h) # info_window dimension
-
+        
         self.panel = tk.Label(info_window)            # a label widget is assigned to panel name
         self.panel.grid(row=0, column=0, rowspan=1, columnspan=3,
                         sticky="n", padx=20, pady=20) # panel widget is positioned in grid
@@ -1211,18 +4853,6 @@ class GUI(tk.Tk):
         button_close.grid(row=0, column=1, rowspan=1, columnspan=3, sticky="ne", padx=20, pady=20)
         
         
-        # manage the slides images
-        self.slides = []                              # empty list to append the slides
-        slides_quantity = 9                           # number of slides
-        folder = pathlib.Path().resolve()             # active folder
-        
-        # list with slides names is generated
-        slide_names = ['Slide' + str(i) + '.jpg' for i in range(1, slides_quantity+1, 1)]
-        
-        for fname in slide_names:                     # iteration over the slide names in slides names
-            img_fname = os.path.join(folder, 'info', fname) # folder and file name for the settings
-            self.slides.append(img_fname)             # slide image names are appended to the list 'slides'
-         
         self.show_slide(0)                            # shows the first slide
     
     
@@ -1327,9 +4957,10 @@ class GUI(tk.Tk):
     
     
     
-    def start_monte_carlo(self):     
+    def start_monte_carlo(self, extend=False):     
         """Function in gui class to call the montecarlo function in montecarlo class.
-        Calls the charts generation functions, based on the monte carlo returned values."""
+        Calls the charts generation functions, based on the monte carlo returned values.
+        When extend is True, the runs are appended to the previous job, and the charts data is updated."""
         
         if self.histogram_window:                     # if histogram_window is True (not None, nor False)
             try:                                      # tentative
@@ -1341,45 +4972,38 @@ class GUI(tk.Tk):
         self. disable_widgets()                       # disable widgets
         animation = self.gui_animation_var.get()      # checks the animation selection
         
-        
-        # starts the Monte Carlo
-        pi, pi_st_dev, pi_error, self.pi_results, self.datetime = montecarlo.monte_carlo(self.runs, self.dots, animation)
+        # memory admission control: the eventual changes to the job are explained before starting it
+        deadline = None if args.budget is None else time.time() + args.budget  # end of the time budget
+        plan = montecarlo.admit(self.runs, self.dots, animation, extend, deadline)  # memory and time plan of the job
+        if not plan['admitted']:                      # case the job doesn't fit the memory budget
+            messagebox.showerror("Job not admitted", plan_text(plan), parent=self)  # decision is explained
+            self.enable_widgets()                     # enable widgets
+            return
+        if plan['notes']:                             # case the job is adapted to the memory budget
+            messagebox.showinfo("Job adapted", plan_text(plan), parent=self)  # decisions are explained
+        
+        if not extend:                                # case of a new job
+            self.reset_chart_data()                   # charts data from the previous job is cleared
+        if self.s['live_charts'] == 'on' and self.charted + self.runs >= 50:  # case of live charts
+            self.live_charts = LiveCharts(self.mainWindow, min(self.max_dp, self.charted + self.runs), self.dots)
+            self.live_charts.update(montecarlo.pi_results[:len(self.x)], self.x, self.error, self.st_dev)  # previous runs
+        
+        # starts the Monte Carlo (with time budget, runs is the maximum), with the deadline and plan made above
+        pi, pi_st_dev, pi_error, self.pi_results, self.datetime = montecarlo.monte_carlo(self.runs, self.dots,
+                                                                                         animation, extend, deadline, plan)
+        
+        if self.live_charts is not None:              # case the live charts are open
+            self.live_charts.close()                  # live charts are closed (the final charts follow)
+            self.live_charts = None                   # None is assigned to live_charts
         
         if tk_running:                                # check if the GUI has not been closed
-            pi_results = self.pi_results              # self.pi_results is assigned to local pi_results
-            datapoints = len(pi_results)              # quantity of datapoints 
-            min_dp = 50                               # min datapoints quantity, for plotting
-            max_dp = 5000                             # max datapoints quantity, for plotting
-            if datapoints >= min_dp:                  # case there are at least min_dp datapoints
-                # it makes sense to plot some charts
-                
-                # case there are too many datapoints to plot
-                if datapoints > max_dp:               # case there are more than max_dp datapoints
-                    pi_results = self.pi_results[:max_dp]  # self.pi_results array is split and assigned to local
-                    datapoints = max_dp               # max_dp is assigned to datapoints variable
+            self.consume_runs()                       # charts data is updated with the remaining runs
             
-                # preparing data arrays for plotting
-                self.x = np.linspace(1, datapoints, datapoints)  # array with x axis values, from 1 to datapoints
-                error=[]                              # empty list to collect the error values
-                st_dev=[]                             # empty list to collect the standard deviation values
-                for i in range(datapoints):           # iteration over the quantity of datapoints
-                    if i==0:                          # case of the the array index
-                        error.append((pi_results[0] - np.pi))  # error is calculated, from the first estimated pi result
-                        st_dev.append(0)              # zero standard deviation is appended
-                    else:                             # case not of the first array index
-                        pi_cumulative = np.cumsum(pi_results[:i])  # a cumulative sum is performed until the index 'i'
-                        pi_ext = pi_cumulative[-1] / i  # estimated pi for 'i' quantity of datapoints
-                        error.append((pi_ext - np.pi))  # appended the error (error = difference between the estimated pi and pi)
-                        st_dev.append(np.std(pi_results[:i])) # standard deviation for the estimated pi until the index 'i'
-                
-                self.error = np.array(error)          # error list is converted to numpy array
-                self.st_dev = np.array(st_dev)        # st_dev list is converted to numpy array
-
+            if len(self.pi_results) >= 50:            # case there are at least 50 datapoints
+                # it makes sense to plot some charts
                 # calls a function to generate a histogram with the calculated pi values\
                 # from the histrogram window there will be access to othe charts related windows
-                self.create_histogram(pi, pi_st_dev, pi_results, self.dots)
-        
-            
+                self.create_histogram(pi, pi_st_dev, self.pi_results[:self.max_dp], montecarlo.dots, montecarlo.pi_ci)
             
             self.enable_widgets()                         # enable widgets
         
@@ -1391,8 +5015,81 @@ class GUI(tk.Tk):
     
     
     
-    def create_histogram(self, pi, pi_st_dev, pi_results, dots):
+    def reset_chart_data(self):
+        """Clears the data of the charts (histogram, error and st.dev), before a new job."""
+        self.max_dp = 5000                            # max datapoints quantity, for plotting
+        self.x = np.zeros(0)                          # array with x axis values (runs)
+        self.error = np.zeros(0)                      # array with the error of the average pi, at each run
+        self.st_dev = np.zeros(0)                     # array with the st.dev of the pi values, at each run
+        self.cum_sum = 0.0                            # running sum of the pi values
+        self.cum_squares = 0.0                        # running sum of the squared pi values
+        self.hist_edges = None                        # histogram bins edges (fixed once computed)
+        self.hist_counts = None                       # histogram counts per bin
+        self.charted = 0                              # runs taken by the charts data (also beyond max_dp)
+    
+    
+    
+    
+    
+    
+    def update_chart_data(self, new_results):
+        """Appends the new runs to the charts data, from the running sums (no recalculation of previous runs).
+        Only the first max_dp runs are charted."""
+        new_results = np.asarray(new_results[:max(0, self.max_dp - len(self.x))], dtype = np.float64)  # runs within limit (no copy)
+        if len(new_results) == 0:                     # case there are no new runs to chart
+            return                                    # function is exited
+        
+        n = np.arange(len(self.x)+1, len(self.x)+len(new_results)+1)  # quantity of runs, at each new run
+        cum_sum = self.cum_sum + np.cumsum(new_results)  # running sum of the pi values
+        cum_squares = self.cum_squares + np.cumsum(new_results**2)  # running sum of the squared pi values
+        mean = cum_sum / n                            # average pi, at each new run
+        variance = np.maximum(cum_squares / n - mean**2, 0)  # variance of the pi values, at each new run
+        
+        self.x = np.concatenate((self.x, n))          # x axis values are appended
+        self.error = np.concatenate((self.error, mean - np.pi))  # errors are appended
+        self.st_dev = np.concatenate((self.st_dev, np.sqrt(variance)))  # standard deviations are appended
+        self.cum_sum, self.cum_squares = cum_sum[-1], cum_squares[-1]  # running sums are updated
+        
+        # histogram counts: bins are computed once (scott algorithm), and widened when needed
+        if self.hist_edges is None:                   # case of first data
+            self.hist_edges = np.histogram_bin_edges(new_results, bins='scott')  # bins edges
+            self.hist_counts = np.zeros(len(self.hist_edges)-1, dtype = np.int64)  # empty counts
+        width = self.hist_edges[1] - self.hist_edges[0]  # bins width
+        if width > 0:                                 # case the bins have a width (not all the same value)
+            n_low = int(np.ceil(max(0, self.hist_edges[0] - new_results.min()) / width))   # bins to add on the left
+            n_high = int(np.ceil(max(0, new_results.max() - self.hist_edges[-1]) / width))  # bins to add on the right
+            if n_low or n_high:                       # case the new data falls outside the bins
+                self.hist_edges = np.concatenate((self.hist_edges[0] - width * np.arange(n_low, 0, -1),
+                                                  self.hist_edges,
+                                                  self.hist_edges[-1] + width * np.arange(1, n_high+1)))
+                self.hist_counts = np.concatenate((np.zeros(n_low, dtype = np.int64), self.hist_counts,
+                                                   np.zeros(n_high, dtype = np.int64)))
+        self.hist_counts += np.histogram(new_results, bins = self.hist_edges)[0]  # new data is counted
+    
+    
+    
+    
+    
+    
+    def consume_runs(self, force=False):
+        """Updates the charts data with the runs completed since the last call, and the live charts
+        (redrawn at a capped rate, unless force is True)."""
+        hits_results = montecarlo.hits_results        # completed runs (zero-copy view of the shared results)
+        new_results = hits_to_pi(hits_results[self.charted:], montecarlo.dots)  # estimated pi of the runs not yet charted
+        self.charted = len(hits_results)              # charted runs are updated
+        n_charted = len(self.x)                       # charted datapoints, before the new runs
+        self.update_chart_data(new_results)           # charts data is updated
+        if self.live_charts is not None:              # case the live charts are open
+            self.live_charts.update(new_results[:len(self.x) - n_charted], self.x, self.error, self.st_dev, force)
+    
+    
+    
+    
+    
+    
+    def create_histogram(self, pi, pi_st_dev, pi_results, dots, ci=None):
         """Function to create a tkinter window and plot a histogram.
+        The bootstrap confidence intervals of the mean (ci), when available, are plotted as vertical lines.
         Buttons are added to call other charts or to close this window."""
         
         # Create a new Tkinter window for the histogram
@@ -1418,6 +5115,10 @@ class GUI(tk.Tk):
         btn_open_stdev = tk.Button(canvas1, text="Plot standard deviation", command= lambda:self.plot_st_dev(pi_results))
         btn_open_stdev.place(relx=0.45, rely=0, anchor="nw", x=0, y=10)  # Placing the btn_open_stdev button on the middle
         
+        # Add a button to append more runs to this job (as many runs as set on the sliders)
+        btn_extend = tk.Button(canvas1, text=f"Add {self.runs:,d} runs", command= lambda:self.start_monte_carlo(extend=True))
+        btn_extend.place(relx=0.75, rely=0, anchor="nw", x=0, y=10)  # Placing the btn_extend button on the right
+        
         # Add a close button to the histogram window
         btn_close = tk.Button(canvas1, text="Close", command=self.histogram_window.destroy)
         btn_close.place(relx=1, rely=0, anchor="ne", x=-10, y=10)  # Placing the close button on the top right
@@ -1431,9 +5132,21 @@ class GUI(tk.Tk):
         # clear the previous chart
         plt.clf()                                     # previous matplotlib plot is cleared
         
-        # Create the histogram (scott algorithm for the bins quantity)
-        plt.hist(pi_results, bins='scott', color='skyblue', edgecolor='black') 
-
+        # Create the histogram, from the counts per bin (scott algorithm for the bins quantity)
+        plt.hist(self.hist_edges[:-1], bins=self.hist_edges, weights=self.hist_counts,
+                 color='skyblue', edgecolor='black')
+        
+        # bootstrap confidence intervals of the mean (all the runs), as vertical lines
+        if ci is not None:                            # case the confidence intervals are available
+            level = f"{100 * ci['level']:.0f}%"       # confidence level, as text
+            for i, x in enumerate(ci['percentile']):  # iteration over the percentile interval bounds
+                plt.axvline(x, color='darkorange', linestyle=':', linewidth=1.5,
+                            label=f"{level} CI percentile [{ci['percentile'][0]:.8f}, {ci['percentile'][1]:.8f}]" if i == 0 else None)
+            for i, x in enumerate(ci['bca']):         # iteration over the BCa interval bounds
+                plt.axvline(x, color='firebrick', linestyle='--', linewidth=1.5,
+                            label=f"{level} CI BCa [{ci['bca'][0]:.8f}, {ci['bca'][1]:.8f}]" if i == 0 else None)
+            plt.legend(title='mean of the runs', fontsize=9, loc='upper right')  # legend with the intervals
+        
         # Set chart title (on two rows) and axes labels
         title =  f'pi approximation:  avg = {str(pi)[:9]}, st.dev = {str(pi_st_dev)[:9]}\n' # chart title 1st row
         if len(self.pi_results) > len(pi_results):    # case plotted data is a slice of the total
@@ -1443,10 +5156,10 @@ class GUI(tk.Tk):
         plt.title(title, fontsize = 12)               # title is plot to the chart with fontsize assigned
         plt.xlabel('pi approximated values')          # x axis label is assigned
         plt.ylabel('Frequency')                       # y axis label is assigned
-
+        
         # Display the histogram
         plt.tight_layout()                            # chart is plotted, with compact layout
-
+        
         # Embed the histogram into the Tkinter window
         canvas = FigureCanvasTkAgg(plt.gcf(), master=canvas2)
         canvas.draw()
@@ -1462,6 +5175,8 @@ class GUI(tk.Tk):
         fname = os.path.join(folder,fname)            # folder and file name for the settings
         try:                                          # tentative
             plt.savefig(fname)                        # Save the current chart as an image file     
+            cache.add_chart(montecarlo.cache_spec, 'histogram', fname)  # chart is stored with the cached result
+            catalog.add_artifact(self.datetime, 'histogram', fname)  # chart is recorded in the jobs catalog
         except:                                       # in case of exception
             print("Could not save the error chart:", fname) # print a feedback to the terminal
     
@@ -1490,7 +5205,8 @@ class GUI(tk.Tk):
         plt.plot(self.x, self.error, color='k', linewidth=1)
         
         # Set chart title (in two rows) and axes labels
-        dots = '{:,.0f}'.format(len(self.error))      # dots value, and convertedt to text with thousands separator
+        dots = '{:,.0f}'.format(montecarlo.dots)      # dots value, and convertedt to text with thousands separator
+        runs = '{:,.0f}'.format(len(self.error))      # charted runs, and convertedt to text with thousands separator
         final_error = format(self.error[-1], '.8f')   # latest error datapoint, and converted to text with thousands separator
         title =  f'pi approximation error = {final_error[:10]}\n'   # chart title 1st row
         if len(self.pi_results) > len(pi_results):    # case plotted data is a slice of the total
@@ -1505,15 +5221,15 @@ class GUI(tk.Tk):
         # fill the areas underneat the result
         plt.fill_between(self.x, self.error, where=(self.error >= 0), color='lightsalmon')  # fill the positive side in light red
         plt.fill_between(self.x, self.error, where=(self.error <= 0), color='lightblue')  # fill the negative side in light blue
-
+        
         # Display the histogram
         plt.tight_layout()                            # chart is plotted, with compact layout
-
+        
         # Embed the histogram into the Tkinter window
         canvas = FigureCanvasTkAgg(plt.gcf(), master=self.error_window)
         canvas.draw()
         canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
-
+        
         # Add a close button to the error window
         btn_close = tk.Button(self.error_window, text="Close", command=self.error_window.destroy)
         btn_close.place(relx=1, rely=0, anchor="ne", x=-10, y=10)  # Placing the close button on the top right
@@ -1528,6 +5244,8 @@ class GUI(tk.Tk):
         fname = os.path.join(folder,fname)            # folder and file name for the settings
         try:                                          # tentative
             plt.savefig(fname)                        # Save the current chart as an image file     
+            cache.add_chart(montecarlo.cache_spec, 'error', fname)  # chart is stored with the cached result
+            catalog.add_artifact(self.datetime, 'error', fname)  # chart is recorded in the jobs catalog
         except:                                       # in case of exception
             print("Could not save the error chart:", fname) # print a feedback to the terminal
     
@@ -1557,7 +5275,8 @@ class GUI(tk.Tk):
         plt.plot(self.x, self.st_dev, color='k', linewidth=1)
         
         # Set chart title (in two rows) and axes labels
-        dots = '{:,.0f}'.format(len(self.st_dev))     # dots value, and convertedt to text with thousands separator
+        dots = '{:,.0f}'.format(montecarlo.dots)      # dots value, and convertedt to text with thousands separator
+        runs = '{:,.0f}'.format(len(self.st_dev))     # charted runs, and convertedt to text with thousands separator
         final_st_dev = format(self.st_dev[-1], '.8f') # latest st.dev value, and converted to text with thousands separator
         title =  f'pi approximation st.dev = {final_st_dev[:10]}\n' # chart title 1st row
         if len(self.pi_results) > len(pi_results):    # case plotted data is a slice of the total
@@ -1568,19 +5287,19 @@ class GUI(tk.Tk):
         plt.xlabel('runs')                            # x axis label is assigned
         plt.ylabel('standard deviation')              # y axis label is assigned
         plt.grid(linewidth=1)                         # chart grid is added
-
+        
         # Display the histogram
         plt.tight_layout()                            # chart is plotted, with compact layout
-
+        
         # Embed the histogram into the Tkinter window
         canvas = FigureCanvasTkAgg(plt.gcf(), master=self.st_dev_window)
         canvas.draw()
         canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
-
+        
         # Add a close button to the st_dev_window window
         btn_close = tk.Button(self.st_dev_window, text="Close", command= self.st_dev_window.destroy)
         btn_close.place(relx=1, rely=0, anchor="ne", x=-10, y=10)  # Placing the close button on the top right
-
+        
         # saves the standard deviation chart
         folder = pathlib.Path().resolve()             # active folder 
         folder = os.path.join(folder,'charts')        # folder to store the chart images
@@ -1590,6 +5309,8 @@ class GUI(tk.Tk):
         fname = os.path.join(folder,fname)            # folder and file name for the settings
         try:                                          # tentative
             plt.savefig(fname)                        # Save the current chart as an image file     
+            cache.add_chart(montecarlo.cache_spec, 'st_dev', fname)  # chart is stored with the cached result
+            catalog.add_artifact(self.datetime, 'st_dev', fname)  # chart is recorded in the jobs catalog
         except:                                       # in case of exception
             print("Could not save the st_dev chart:", fname) # print a feedback to the terminal
     
@@ -1605,6 +5326,7 @@ class GUI(tk.Tk):
         tk_running = False                            # tk_running is set False
         
         cv2.destroyAllWindows()                       # all openCV windows are closed
+        montecarlo.close()                            # worker processes and shared results are released
         self.mainWindow.destroy()                     # frame mainWindow is destroyed
         time.sleep(0.5)                               # little delay
         self.destroy()                                # main window is destroyed
@@ -1638,6 +5360,189 @@ if __name__ == "__main__":
     tk_running = True                # set a global variable to monitor the tkinter class being runnin
     
     settings = Settings()            # class Settings is activated, and assigned to settings
+    if args.runs is not None:        # case runs is passed as argument
+        settings.s['runs'] = args.runs   # runs argument overrides the settings
+    if args.dots is not None:        # case dots is passed as argument
+        settings.s['dots'] = args.dots   # dots argument overrides the settings
+    tuning = load_tuning()           # calibration results (chunk and workers), when made on this machine
+    workers = args.workers or tuning.get('workers') or os.cpu_count() or 1  # quantity of worker processes
+    cache = ResultCache(0 if args.no_cache else settings.s['cache_mb'])  # results cache (disabled by --no-cache)
+    ceiling = settings.s['thermal_c'] if args.thermal_ceiling is None else args.thermal_ceiling  # temperature ceiling
+    governor = ThermalGovernor(workers, ceiling, enabled = device == 'Rpi' or args.thermal_ceiling is not None)
+    catalog = JobCatalog()           # catalog of the past jobs (indexed by spec, date and host)
+    stream = StreamServer(args.stream, args.stream_fps).start() if args.stream else None  # animation stream, else None
+    days = settings.s['retention_days'] if args.prune is None else args.prune  # retention of the jobs, in days
+    if days > 0:                     # case of retention limit
+        pruned = catalog.prune(days) # jobs older than the retention are removed, with their files
+        if pruned > 0 or args.prune is not None:  # case of removed jobs, or pruning requested
+            print(f"Removed {pruned:,d} jobs older than {days:g} days from the catalog")
+    if args.prune is not None:       # case the pruning is requested (no GUI)
+        raise SystemExit             # the script ends
+    
+    if args.jobs:                    # case the jobs list is requested (no GUI)
+        jobs = catalog.query(args.runs, args.dots, args.kernel, since = args.since, until = args.until,
+                             limit = args.limit)  # latest jobs matching the filters
+        print(jobs_table(jobs), '\n')  # table is printed to the terminal
+        raise SystemExit             # the script ends
+    
+    if args.compare:                 # case the jobs comparison is requested (no GUI)
+        jobs = catalog.get(args.compare)  # jobs to compare
+        if len(jobs) < len(args.compare):  # case of ids not in the catalog
+            print(f"Jobs not in the catalog: {sorted(set(args.compare) - {j['id'] for j in jobs})}")
+        if jobs:                     # case of jobs to compare
+            print(compare_table(jobs), '\n')  # table is printed to the terminal
+        raise SystemExit             # the script ends
+    
+    if args.calibrate:               # case the calibration is requested (no GUI)
+        tuning, table = calibrate(select_kernel(args.kernel or settings.s['kernel']))  # chunk and workers are timed
+        print(table, '\n')           # table is printed to the terminal
+        save_tuning(tuning)          # calibration results are saved, and used by the next jobs
+        print("Calibration saved to pi_tuning.txt (--chunk and --workers override it)")
+        raise SystemExit             # the script ends
+    
+    if args.sweep:                   # case the convergence study is requested (no GUI)
+        spec = args_spec()           # job spec keys passed as arguments
+        if spec_region(spec) is not None:  # case of other region than the quarter circle
+            print("--sweep only estimates pi: --dim and --indicator aren't supported")  # feedback is printed to the terminal
+            raise SystemExit         # the script ends
+        try:                         # tentative
+            spec = parse_spec(spec)  # job spec, completed from the settings
+        except ValueError as e:      # case of invalid spec
+            print(e)                 # feedback is printed to the terminal
+            raise SystemExit         # the script ends
+        table = sweep(spec, workers) # convergence study
+        print(table, '\n')           # table is printed to the terminal
+        write_table(table, dt.datetime.now().strftime('%Y%m%d_%H%M%S'), 'sweep')  # table is saved to the logs folder
+        raise SystemExit             # the script ends
+    
+    if args.benchmark:               # case the kernels benchmark is requested (no GUI)
+        spec = args_spec()           # job spec keys passed as arguments
+        if spec_region(spec) is not None:  # case of other region than the quarter circle
+            print("--benchmark compares the kernels counting the dots in circle: --dim and --indicator aren't supported")
+            raise SystemExit         # the script ends
+        try:                         # tentative
+            spec = parse_spec(spec)  # job spec, completed from the settings
+        except ValueError as e:      # case of invalid spec
+            print(e)                 # feedback is printed to the terminal
+            raise SystemExit         # the script ends
+        table = benchmark(spec)      # each kernel runs the same job
+        print(table, '\n')           # table is printed to the terminal
+        write_table(table, dt.datetime.now().strftime('%Y%m%d_%H%M%S'), 'benchmark')  # table is saved to the logs folder
+        raise SystemExit             # the script ends
+    
+    if args.integrate:               # case of volume estimate of a region (no GUI)
+        spec = args_spec()           # job spec keys passed as arguments
+        if 'seed' not in spec and settings.s['seed'] != '':  # case the seed is set in the settings
+            spec['seed'] = settings.s['seed']  # seed setting is used
+        seeded = 'seed' in spec      # case of a set seed (reproducible job)
+        try:                         # tentative
+            spec = parse_spec(spec, local = True)  # job spec, completed from the settings (any indicator)
+        except ValueError as e:      # case of invalid spec, or indicator that can't be loaded
+            print(e)                 # feedback is printed to the terminal
+            raise SystemExit         # the script ends
+        result = cache.get(spec) if seeded and cache.cacheable(spec) else None  # cached result, or None
+        if result is None:           # case of cache miss
+            start = time.time()      # current time is assigned to start variable
+            deadline = None if args.budget is None else start + args.budget  # end of the time budget
+            hits_results = compute_runs(spec, 0, spec['runs'], workers, governor, deadline)  # runs are computed
+            if len(hits_results) < spec['runs']:  # case of runs cut by the time budget
+                seeded, spec['runs'] = False, len(hits_results)  # the job is made of the completed runs
+            result = job_result(spec, hits_results, time.time() - start)  # job result
+            if seeded and cache.cacheable(spec):  # case of a reproducible job
+                cache.put(spec, result)  # result is stored into the results cache
+        datetime = dt.datetime.now().strftime('%Y%m%d_%H%M%S')  # datetime reference, for the file name
+        os.makedirs(os.path.join(pathlib.Path().resolve(), 'logs'), exist_ok=True)  # logs folder
+        save_result(result, os.path.join(pathlib.Path().resolve(), 'logs', datetime))  # job result is saved
+        catalog.add(result, os.path.join(pathlib.Path().resolve(), 'logs', datetime), 'integrate')  # job is indexed
+        region = spec.get('indicator') or 'unit hypersphere'  # region of the job, for the feedback
+        print(f"Made a total of {result['runs_made']:,d} runs, each one with {spec['dots']:,d} dots in "
+              f"{spec.get('dim', 2)} dimensions ({region}), in {result['seconds']:.1f} s ({result.get('dots_per_s', 0):,d} dots/s)")
+        print_estimate(result)       # estimate, error, st.dev and confidence intervals are printed to terminal
+        raise SystemExit             # the script ends
+    
+    if args.race:                    # case the race of job variants is requested (no GUI)
+        base = args_spec()           # job spec keys passed as arguments, shared by the variants
+        if 'seed' not in base:       # case the seed is not passed as argument
+            base['seed'] = settings.s['seed'] if settings.s['seed'] != '' else new_seed()  # same seed for the variants
+        try:                         # tentative
+            specs = [parse_variant(variant, base, local = True) for variant in args.race]  # job spec of each variant
+        except ValueError as e:      # case of invalid variant
+            print(e)                 # feedback is printed to the terminal
+            raise SystemExit         # the script ends
+        table, curves = race(args.race, specs, workers)  # variants are computed concurrently
+        print(table, '\n')           # table is printed to the terminal
+        datetime = dt.datetime.now().strftime('%Y%m%d_%H%M%S')  # datetime reference, for the file names
+        write_table(table, datetime, 'race')  # table is saved to the logs folder
+        fname = os.path.join(pathlib.Path().resolve(), 'charts', datetime + '_race.png')  # chart file name
+        race_chart(args.race, specs, curves, fname)  # chart is saved to the charts folder
+        print(f"Race chart saved to {fname}")  # feedback is printed to the terminal
+        raise SystemExit             # the script ends
+    
+    if args.extend is not None:      # case a finished job is extended (no GUI)
+        fname = args.result or latest_result()  # job to extend
+        if fname is None:            # case there are no results to extend
+            print("No job result to extend in the logs folder")  # feedback is printed to the terminal
+        else:                        # case there is a result to extend
+            deadline = None if args.budget is None else time.time() + args.budget  # end of the time budget
+            try:                     # tentative
+                result = extend_job(fname, args.extend, workers, governor, deadline, catalog)  # new runs are appended to the job
+            except ValueError as e:  # case the job can't be extended with its kernel
+                print(e)             # feedback is printed to the terminal
+                raise SystemExit     # the script ends
+            print(f"Extended {fname} to {result['runs_made']:,d} runs, each one with {result['spec']['dots']:,d} dots")
+            print_estimate(result)   # estimate, error, st.dev and confidence intervals are printed to terminal
+        raise SystemExit             # the script ends
+    
+    if args.worker:                  # case of worker of the distributed mode (no GUI)
+        run_worker(args.worker)      # leases are computed until the job is done
+        raise SystemExit             # the script ends
+    
+    if args.coordinator:             # case of coordinator of the distributed mode (no GUI)
+        spec = args_spec()           # job spec keys passed as arguments
+        if 'seed' not in spec and settings.s['seed'] != '':  # case the seed is set in the settings
+            spec['seed'] = settings.s['seed']  # seed setting is used
+        seeded = 'seed' in spec      # case of a set seed (reproducible job)
+        try:                         # tentative
+            spec = parse_spec(spec)  # job spec, completed from the settings (indicators from the allowlist only)
+            admit_spec(spec, args.local_workers)  # job is refused when beyond the memory budget
+        except ValueError as e:      # case of invalid spec, indicator not allowed to the workers, or job not admitted
+            print(e)                 # feedback is printed to the terminal
+            raise SystemExit         # the script ends
+        result = cache.get(spec) if seeded and cache.cacheable(spec) else None  # cached result, or None
+        if result is None:           # case of cache miss
+            start = time.time()      # current time is assigned to start variable
+            hits_results = Coordinator(spec, args.host, args.port, workers, args.lease_timeout,
+                                       args.local_workers).run()  # runs computed by the workers
+            result = job_result(spec, hits_results, time.time() - start)  # job result
+            if seeded and cache.cacheable(spec):  # case of a reproducible job
+                cache.put(spec, result)  # result is stored into the results cache
+        datetime = dt.datetime.now().strftime('%Y%m%d_%H%M%S')  # datetime reference, for the file name
+        os.makedirs(os.path.join(pathlib.Path().resolve(), 'logs'), exist_ok=True)  # logs folder
+        save_result(result, os.path.join(pathlib.Path().resolve(), 'logs', datetime))  # job result is saved
+        catalog.add(result, os.path.join(pathlib.Path().resolve(), 'logs', datetime), 'coordinator')  # job is indexed
+        print(f"Made a total of {result['runs_made']:,d} runs, each one with {spec['dots']:,d} dots, "
+              f"in {result['seconds']:.1f} s ({result['dots_per_s']:,d} dots/s)")
+        print_estimate(result)       # estimate, error, st.dev and confidence intervals are printed to terminal
+        raise SystemExit             # the script ends
+    
+    if args.serve:                   # case the job server is requested (no GUI)
+        JobServer(args.port, workers, cache).serve()  # the job server runs until Ctrl+C
+        raise SystemExit             # the script ends
+    
+    if args.export:                  # case the animation is exported to a video file (no GUI)
+        queue_manager = Queue_manager()  # class Queue_manager is activated (tickets aren't sent without GUI)
+        montecarlo = MonteCarlo()    # class MonteCarlo is activated, and assigned to montecarlo
+        montecarlo.exporter = Exporter(args.export, args.fps, (montecarlo.w, montecarlo.h), workers)
+        start = time.time()          # current time is assigned to start variable
+        try:                         # tentative
+            montecarlo.monte_carlo(int(settings.s['runs']), int(settings.s['dots']), settings.s['animation'],
+                                   deadline = None if args.budget is None else start + args.budget)
+        finally:                     # in any case
+            fname = montecarlo.exporter.close()  # the video file is completed
+            montecarlo.close()       # worker processes and shared results are released
+        print(f"Exported {montecarlo.exporter.frames:,d} frames ({montecarlo.exporter.frames / args.fps:.1f} s "
+              f"of video) to {fname}, in {time.time() - start:.1f} s")
+        raise SystemExit             # the script ends
     queue_manager = Queue_manager()  # class Queue_manager is activated, and assigned to queue_manager
     
     montecarlo = MonteCarlo()        # class MonteCarlo is activated, and assigned to montecarlo
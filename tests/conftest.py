@@ -0,0 +1,53 @@
+"""Fixtures of the tests: pi.py is imported as module (its GUI and command line run only as script), with
+the globals the functions under test expect, as set by the script start."""
+
+import importlib.util
+import os
+import pathlib
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]  # folder of pi.py and pi_settings.txt
+os.environ.setdefault('NUMBA_THREADING_LAYER', 'workqueue')  # numba JIT made here: TBB hangs the exit after the forks of pools
+
+
+
+
+
+def load_pi():
+    """Imports pi.py as module, with no command line arguments and the settings of the repository."""
+    argv, cwd = sys.argv, os.getcwd()                # arguments and folder of the test run
+    sys.argv = ['pi.py']                             # pi.py parses its arguments at import
+    os.chdir(ROOT)                                   # settings are read from the active folder
+    try:                                             # tentative
+        spec = importlib.util.spec_from_file_location('pi', ROOT / 'pi.py')  # module spec of the script
+        pi = importlib.util.module_from_spec(spec)   # module of the script
+        sys.modules['pi'] = pi                       # module is registered (numba looks up its globals there)
+        spec.loader.exec_module(pi)                  # script is executed (not as __main__)
+        pi.settings = pi.Settings()                  # settings of the repository
+    finally:                                         # in any case
+        sys.argv = argv                              # arguments are restored
+        os.chdir(cwd)                                # folder is restored
+    pi.tuning = {}                                   # no calibration: the chunk setting is used
+    pi.governor = pi.ThermalGovernor(1, 75, enabled = False)  # no thermal throttling
+    return pi
+
+
+
+
+
+@pytest.fixture(scope = 'session')
+def pi():
+    """The pi.py module."""
+    return load_pi()
+
+
+
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Empty working folder, for the files made by the catalog and the results cache."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
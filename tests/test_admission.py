@@ -0,0 +1,86 @@
+"""Tests of the memory admission control: peak memory estimate of a job, and the plan fitting it into
+the memory budget (chunk, worker processes, animation)."""
+
+import numpy as np
+import pytest
+
+SPEEDS = (1e8, 1e-6)                                 # dots/s of the kernel, and seconds to draw a dot
+
+
+
+
+
+def test_job_memory(pi):
+    """The peak memory is bound to the chunk (not to the dots), plus the workers and the results of the runs."""
+    plotted = pi.PLOT_BYTES_PER_DOT * 2**20          # a plotted run with a chunk of 2^20 dots
+    assert pi.job_memory(1, 10**9, 2**20, 'max', 4) == plotted + pi.RUN_BYTES + 5
+    workers = 4 * (pi.WORKER_BYTES + pi.COUNT_BYTES_PER_DOT * 2**20)  # worker processes and their buffers
+    assert pi.job_memory(100, 10**9, 2**20, 'min', 4) == plotted + workers + 100 * (pi.RUN_BYTES + 5)
+    assert pi.job_memory(100, 10**10, 2**20, 'min', 1) == plotted + 100 * (pi.RUN_BYTES + 9)  # uint64 hits
+    assert pi.job_memory(1, 1000, 2**20, 'min', 1) == pi.PLOT_BYTES_PER_DOT * 1000 + pi.RUN_BYTES + 5
+
+
+
+
+
+def test_job_within_budget(pi):
+    """A job within the budget keeps its chunk, workers and animation."""
+    plan = pi.admit_job(100, 10**6, 2**20, 'min', 4, 2**30, SPEEDS)
+    assert plan['admitted'] and plan['notes'] == []
+    assert (plan['chunk'], plan['workers'], plan['animation']) == (2**20, 4, 'min')
+    assert plan['peak'] == pi.job_memory(100, 10**6, 2**20, 'min', 4)
+
+
+
+
+
+def test_chunk_is_lowered(pi):
+    """Beyond the budget the chunk is halved, down to the one fitting it."""
+    budget = pi.job_memory(100, 10**8, 2**16, 'min', 2)  # budget fitting a chunk of 2^16 dots
+    plan = pi.admit_job(100, 10**8, 2**20, 'min', 2, budget, SPEEDS)
+    assert plan['admitted'] and (plan['chunk'], plan['workers']) == (2**16, 2)
+    assert plan['peak'] <= budget and 'chunk lowered' in plan['notes'][0]
+    kept = pi.admit_job(100, 10**8, 2**20, 'min', 2, budget, SPEEDS, keep_chunk = True)  # extended job
+    assert kept['chunk'] == 2**20 and kept['workers'] == 1  # the chunk is kept, the workers are dropped
+
+
+
+
+
+def test_workers_are_dropped(pi):
+    """When the smallest chunk doesn't fit with the workers, the runs are counted in the main process."""
+    budget = pi.job_memory(100, 10**8, pi.MIN_CHUNK, 'min', 1)  # budget without the worker processes
+    plan = pi.admit_job(100, 10**8, 2**20, 'min', 8, budget, SPEEDS)
+    assert plan['admitted'] and plan['workers'] == 1
+    assert any('runs counted in this process' in note for note in plan['notes'])
+
+
+
+
+
+def test_job_not_admitted(pi):
+    """Jobs whose results alone exceed the budget are not admitted, with the reason."""
+    plan = pi.admit_job(10**9, 1000, 2**20, 'min', 4, 2**20, SPEEDS)
+    assert not plan['admitted'] and 'not admitted' in plan['notes'][-1]
+    assert 'not admitted' in pi.plan_text(plan)
+
+
+
+
+
+def test_animation_is_lowered(pi):
+    """Plotting all the runs beyond the time limit lowers the animation to 'min'."""
+    plan = pi.admit_job(10_000, 10**6, 2**20, 'max', 4, None, SPEEDS)  # about 10^4 s of plotting
+    assert plan['animation'] == 'min' and plan['admitted'] and 'animation lowered' in plan['notes'][0]
+    assert pi.admit_job(10, 1000, 2**20, 'max', 4, None, SPEEDS)['animation'] == 'max'
+
+
+
+
+
+def test_server_and_coordinator_jobs(pi, monkeypatch):
+    """The jobs without animation are refused beyond the memory budget."""
+    monkeypatch.setattr(pi.args, 'memory_mb', 256)   # memory budget of 256 MB
+    pi.admit_spec(pi.parse_spec({'runs': 1000, 'dots': 10**6}), 1)
+    with pytest.raises(ValueError, match = 'not admitted'):
+        pi.admit_spec(pi.parse_spec({'runs': 10**8, 'dots': 10**6}), 1)
@@ -0,0 +1,43 @@
+"""Tests of the integer-exact counting: the dots in circle of the runs are aggregated with Python
+integers, and the counts out of range (wrapped around accumulators) are detected."""
+
+import math
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+
+
+
+
+def test_aggregate_hits_is_exact(pi):
+    """The estimate is the exact fraction 4 x hits / dots, also beyond the float precision of the sums."""
+    dots = 10**12                                    # dots per run, with sums beyond 2^53
+    hits = [785398163397, 785398163398, 785398163399]  # dots in circle of the runs
+    estimate, st_dev, error = pi.aggregate_hits(hits, dots)
+    assert estimate == float(Fraction(4 * sum(hits), 3 * dots))
+    assert error == estimate - math.pi
+    assert st_dev == pytest.approx(np.std([4 * h / dots for h in hits]), rel = 1e-6)
+
+
+
+
+
+def test_aggregate_hits_of_other_regions(pi):
+    """Other regions pass their scale, and their error is None when the exact value is unknown."""
+    estimate, st_dev, error = pi.aggregate_hits([10, 30], 100, scale = 1, exact = None)
+    assert (estimate, st_dev, error) == (0.2, 0.1, None)
+
+
+
+
+
+def test_check_hits_range(pi):
+    """Dots in circle beyond the dots of the run, or negative, are reported as overflow."""
+    assert pi.check_hits(10, 10) == 10
+    for hits in (-1, 11):                            # counts out of range
+        with pytest.raises(OverflowError):
+            pi.check_hits(hits, 10)
+    with pytest.raises(OverflowError):
+        pi.check_hits(0, 2**63)                      # dots beyond the 64-bit accumulators
@@ -0,0 +1,94 @@
+"""Tests of the bootstrap confidence intervals of the estimated pi mean, drawn as multinomial counts of
+the distinct dots in circle values."""
+
+import math
+
+import numpy as np
+import pytest
+
+
+
+
+
+def binomial_runs(runs, dots, seed):
+    """Returns the dots in circle of runs simulated runs (binomial, with probability pi / 4)."""
+    return np.random.default_rng(seed).binomial(dots, math.pi / 4, runs)
+
+
+
+
+
+def test_too_few_runs(pi):
+    """With less than two runs there is no interval."""
+    assert pi.bootstrap_ci([7], 10) is None and pi.bootstrap_ci([], 10) is None
+
+
+
+
+
+def test_reproducible_and_batch_independent(pi):
+    """The intervals depend on the seed only, not on the batches of resamples."""
+    hits = binomial_runs(300, 1000, 1)               # dots in circle of the runs
+    ci = pi.bootstrap_ci(hits, 1000, resamples = 2000, seed = 5)
+    assert ci == pi.bootstrap_ci(hits, 1000, resamples = 2000, seed = 5, batch = 2000)
+    assert ci != pi.bootstrap_ci(hits, 1000, resamples = 2000, seed = 6)
+    assert ci['level'] == 0.95 and ci['resamples'] == 2000
+
+
+
+
+
+def test_interval_width(pi):
+    """The intervals surround the mean, with the width of the normal approximation (large runs)."""
+    hits = binomial_runs(2000, 1000, 2)              # dots in circle of the runs
+    estimates = 4 * hits / 1000                      # estimated pi of the runs
+    ci = pi.bootstrap_ci(hits, 1000, resamples = 4000, seed = 1)
+    half = 1.96 * estimates.std() / math.sqrt(len(hits))  # half width of the normal interval
+    for kind in ('percentile', 'bca'):               # iteration over the intervals
+        low, high = ci[kind]                         # interval bounds
+        assert low < estimates.mean() < high
+        assert high - low == pytest.approx(2 * half, rel = 0.1)
+
+
+
+
+
+def test_matches_runs_resampling(pi):
+    """Resampling the distinct values gives the interval of the classic resampling of the runs."""
+    hits = binomial_runs(400, 200, 3)                # dots in circle of the runs
+    rng = np.random.default_rng(0)                   # classic bootstrap, resampling the runs indices
+    means = [(4 * hits[rng.integers(0, len(hits), len(hits))] / 200).mean() for _ in range(4000)]
+    expected = np.quantile(means, [0.025, 0.975])    # classic percentile interval
+    ci = pi.bootstrap_ci(hits, 200, resamples = 4000, seed = 1)
+    assert ci['percentile'] == pytest.approx(list(expected), abs = 0.15 * (expected[1] - expected[0]))
+
+
+
+
+
+def test_coverage(pi):
+    """About 95% of the intervals of independent jobs contain pi."""
+    covered = 0                                      # intervals containing pi
+    for job in range(200):                           # iteration over the simulated jobs
+        ci = pi.bootstrap_ci(binomial_runs(50, 500, 100 + job), 500, resamples = 1000, seed = job)
+        covered += ci['bca'][0] <= math.pi <= ci['bca'][1]
+    assert 0.88 <= covered / 200 <= 0.99
+
+
+
+
+
+def test_constant_runs(pi):
+    """Runs with the same dots in circle give a zero width interval, without errors."""
+    ci = pi.bootstrap_ci([30] * 10, 40)
+    assert ci['percentile'] == [3.0, 3.0] and ci['bca'] == [3.0, 3.0]
+
+
+
+
+
+def test_other_regions_scale(pi):
+    """Other regions pass their scale: the interval is the one of the fractions, times the scale."""
+    hits = binomial_runs(100, 1000, 4)               # dots in circle of the runs
+    ci_4, ci_8 = pi.bootstrap_ci(hits, 1000, seed = 2), pi.bootstrap_ci(hits, 1000, seed = 2, scale = 8)
+    assert ci_8['percentile'] == pytest.approx([2 * v for v in ci_4['percentile']])
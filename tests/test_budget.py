@@ -0,0 +1,116 @@
+"""Tests of the time-budget mode: the batches are cut to the runs expected to complete by the deadline,
+and the job ends with the completed runs."""
+
+import time
+from concurrent.futures import Future
+
+import pytest
+
+
+
+
+
+class Clock():
+    """Clock of the tests, moved forward by hand (replaces the time module of pi.py)."""
+    
+    def __init__(self):
+        self.now = 1000.0                            # current time, in seconds
+    
+    def time(self):
+        return self.now
+    
+    def __getattr__(self, name):
+        return getattr(time, name)                   # the other functions of the time module
+
+
+
+
+
+@pytest.fixture
+def clock(pi, monkeypatch):
+    """Clock of the tests, used by pi.py."""
+    clock = Clock()
+    monkeypatch.setattr(pi, 'time', clock)
+    return clock
+
+
+
+
+
+def scheduler(pi, batches, deadline, workers=2):
+    """Returns a batch scheduler with futures completed by the test, and the submitted (first, n) batches."""
+    submitted = []                                   # submitted batches, with their futures
+    
+    def submit(first, n):                            # the batch is recorded instead of computed
+        submitted.append((first, n, Future()))
+        return submitted[-1][2]
+    
+    governor = pi.ThermalGovernor(workers, 75, enabled = False)  # all the workers active
+    return pi.BatchScheduler(batches, submit, governor, deadline), submitted
+
+
+
+
+
+def complete(future, n):
+    """Completes a batch future, with n runs of dots in circle."""
+    future.set_running_or_notify_cancel()
+    future.set_result([0] * n)
+
+
+
+
+
+def test_batches_are_cut_to_the_deadline(pi, clock):
+    """Single run batches until the seconds per run are measured, then the runs that fit the time left."""
+    s, submitted = scheduler(pi, [(0, 10), (10, 10)], deadline = clock.now + 10)
+    assert [(f, n) for f, n, _ in submitted] == [(0, 1), (1, 1)]  # seconds per run not measured yet
+    
+    clock.now += 1                                   # the first run takes one second
+    complete(submitted[0][2], 1)
+    assert submitted[2][:2] == (2, 8)                # 9 s left at 1 s per run, one worker still busy
+    
+    clock.now += 1                                   # the second run takes two seconds
+    complete(submitted[1][2], 1)                     # 1.5 s per run (mean), 8 s left
+    assert submitted[3][:2] == (10, 5)               # runs of the next batch that fit, the rest kept
+    
+    clock.now += 9                                   # the deadline is passed
+    complete(submitted[2][2], 8)
+    complete(submitted[3][2], 5)
+    assert s.done() and len(submitted) == 4          # the remaining runs are dropped
+    assert s.runs_done() == 15 and [len(f.result()) for f in s.wait()] == [1, 1, 8, 5]
+
+
+
+
+
+def test_no_deadline(pi, clock):
+    """Without a deadline the batches are submitted whole, as the workers are free."""
+    s, submitted = scheduler(pi, [(0, 10), (10, 10), (20, 5)], deadline = None)
+    assert [(f, n) for f, n, _ in submitted] == [(0, 10), (10, 10)]
+    complete(submitted[0][2], 10)
+    assert submitted[2][:2] == (20, 5)
+    for _, n, future in submitted[1:]:               # iteration over the running batches
+        complete(future, n)
+    assert s.done() and s.runs_done() == 25
+
+
+
+
+
+def test_passed_deadline(pi, clock):
+    """A deadline already passed submits no batches."""
+    s, submitted = scheduler(pi, [(0, 10)], deadline = clock.now - 1)
+    assert submitted == [] and s.done() and s.runs_done() == 0
+
+
+
+
+
+def test_compute_runs_within_budget(pi):
+    """A job with a short budget returns the first runs of the job, as the job without budget."""
+    spec = pi.parse_spec({'runs': 100_000, 'dots': 20_000, 'seed': 3, 'kernel': 'numpy'})  # job longer than the budget
+    start = time.time()                              # time reference
+    hits = pi.compute_runs(spec, 0, spec['runs'], 1, pi.governor, deadline = start + 1)
+    assert time.time() - start < 5 and 0 < len(hits) < spec['runs']
+    assert hits == list(pi.run_batch(20_000, 3, spec['sampler'], 'numpy', spec['chunk'], 0, len(hits)))
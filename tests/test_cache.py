@@ -0,0 +1,100 @@
+"""Tests of the results cache keys, storage and eviction."""
+
+import os
+import time
+
+import pytest
+
+
+
+
+
+@pytest.fixture
+def cache(pi, workdir):
+    """Results cache in an empty folder."""
+    return pi.ResultCache(16)
+
+
+
+
+
+def spec(**changes):
+    """Returns a complete job spec, with the changed keys."""
+    return dict({'runs': 4, 'dots': 1000, 'sampler': 'PCG64', 'kernel': 'numpy', 'chunk': 512, 'seed': 1}, **changes)
+
+
+
+
+
+def test_key_ignores_the_chunk(cache):
+    """The chunk doesn't change the runs, therefore the jobs differing by chunk share the entry."""
+    assert cache.key(spec()) == cache.key(spec(chunk = 2**20))
+
+
+
+
+
+@pytest.mark.parametrize('changes', [{'runs': 5}, {'dots': 1001}, {'seed': 2}, {'sampler': 'MT19937'},
+                                     {'kernel': 'integer'}, {'dim': 3}])
+def test_key_changes_with_the_result(cache, changes):
+    """The spec values affecting the result change the key."""
+    assert cache.key(spec()) != cache.key(spec(**changes))
+
+
+
+
+
+def test_key_changes_with_the_code(pi, cache):
+    """Results of different code versions aren't mixed."""
+    other = pi.ResultCache(16)                       # cache of another code version
+    other.code = cache.code + '_changed'
+    assert cache.key(spec()) != other.key(spec())
+
+
+
+
+
+def test_cacheable(pi, workdir):
+    """Disabled caches and the jobs with an indicator function aren't cached."""
+    assert pi.ResultCache(16).cacheable(spec())
+    assert not pi.ResultCache(0).cacheable(spec())
+    assert not pi.ResultCache(16).cacheable(spec(dim = 2, indicator = 'module:function'))
+
+
+
+
+
+def test_put_and_get(pi, cache):
+    """A completed job is returned by the cache, an incomplete one isn't stored."""
+    job = pi.parse_spec(spec())                      # validated job spec
+    result = pi.job_result(job, pi.compute_runs(job, 0, job['runs'], 1, pi.governor), 1.0)
+    assert cache.get(job) is None
+    cache.put(job, result)
+    cached = cache.get(dict(job, chunk = 2**20))     # same job, with another chunk
+    assert cached['pi'] == result['pi'] and list(cached['hits']) == list(result['hits'])
+    assert cache.get(dict(job, runs = 3)) is None
+    cache.put(dict(job, runs = 8), result)           # result with fewer runs than the job
+    assert cache.get(dict(job, runs = 8)) is None
+
+
+
+
+
+def test_least_recently_used_entries_are_evicted(pi, cache):
+    """Beyond the size limit, the least recently used entries are removed, not the last stored one."""
+    results = {}                                     # results by seed
+    for seed in (1, 2, 3):                           # three jobs
+        job = pi.parse_spec(spec(seed = seed))       # validated job spec
+        results[seed] = pi.job_result(job, pi.compute_runs(job, 0, job['runs'], 1, pi.governor), 1.0)
+        cache.put(job, results[seed])
+    entry = sum(os.path.getsize(os.path.join(cache.folder, f)) for f in os.listdir(cache.folder)) / 3  # entry size
+    for seed, age in ((1, 300), (2, 100), (3, 200)):  # seed 1 is the least recently used, then seed 3
+        fname = os.path.join(cache.folder, cache.key(pi.parse_spec(spec(seed = seed))) + '_result.json')
+        os.utime(fname, (time.time() - age, time.time() - age))
+    cache.max_bytes = int(2.5 * entry)               # room for two entries
+    cache.evict()
+    assert [cache.get(pi.parse_spec(spec(seed = seed))) is not None for seed in (1, 2, 3)] == [False, True, True]
+    cache.max_bytes = int(0.5 * entry)               # room for no entry
+    cache.evict(keep = cache.key(pi.parse_spec(spec(seed = 3))))
+    assert os.listdir(cache.folder) and all(f.startswith(cache.key(pi.parse_spec(spec(seed = 3))))
+                                            for f in os.listdir(cache.folder))
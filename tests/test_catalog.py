@@ -0,0 +1,96 @@
+"""Tests of the jobs catalog: indexing, migration of the catalogs made before the region columns,
+and the jobs and comparison tables."""
+
+import os
+import sqlite3
+
+import pytest
+
+
+
+
+
+def make_result(pi, folder, datetime, **changes):
+    """Computes a small seeded job, saves its result files as folder/datetime, and returns the result."""
+    spec = pi.parse_spec(dict({'runs': 6, 'dots': 2000, 'seed': 5, 'chunk': 1024}, **changes), local = True)
+    result = pi.job_result(spec, pi.compute_runs(spec, 0, spec['runs'], 1, pi.governor), 1.0)
+    pi.save_result(result, os.path.join(folder, datetime))
+    return result
+
+
+
+
+
+def test_add_and_query(pi, workdir):
+    """The added jobs are returned latest first, with their spec, statistics and region."""
+    catalog = pi.JobCatalog()
+    circle = make_result(pi, workdir, '20260101_000000')
+    sphere = make_result(pi, workdir, '20260102_000000', dim = 3)
+    catalog.add(circle, os.path.join(workdir, '20260101_000000'), 'gui')
+    catalog.add(sphere, os.path.join(workdir, '20260102_000000'), 'integrate')
+    jobs = catalog.query()
+    assert [j['datetime'] for j in jobs] == ['20260102_000000', '20260101_000000']
+    assert [(j['dim'], j['indicator']) for j in jobs] == [(3, None), (2, None)]
+    assert jobs[1]['pi'] == circle['pi'] and jobs[1]['runs_made'] == 6 and jobs[1]['source'] == 'gui'
+    assert [pi.region_label(j) for j in jobs] == ['3D sphere', 'circle']
+    assert len(catalog.query(dots = 2000, since = '2026-01-02')) == 1
+    assert 'estimate' in pi.jobs_table(jobs).splitlines()[0]
+
+
+
+
+
+def test_migration_of_old_catalogs(pi, workdir):
+    """A catalog made before the region columns gets them, filled from the result files."""
+    make_result(pi, workdir, '20260101_000000', dim = 4)
+    db = sqlite3.connect('pi_catalog.db')            # catalog with the previous schema
+    db.execute("""CREATE TABLE jobs (
+                      id INTEGER PRIMARY KEY, datetime TEXT UNIQUE, created REAL, host TEXT,
+                      version TEXT, source TEXT, runs INTEGER, dots INTEGER, sampler TEXT, kernel TEXT,
+                      chunk INTEGER, seed TEXT, runs_made INTEGER, pi REAL, st_dev REAL, error REAL,
+                      seconds REAL, dots_per_s REAL, ci_low REAL, ci_high REAL, timings TEXT, result TEXT)""")
+    for datetime in ('20260101_000000', '20260102_000000'):  # the second job has no result file
+        db.execute("INSERT INTO jobs VALUES (NULL, ?, 0, 'host', 'v', 'gui', 6, 2000, 'PCG64', 'numpy', 1024, "
+                   "'5', 6, 4.2, 0.1, 0.0, 1.0, 1.0, NULL, NULL, NULL, ?)",
+                   (datetime, os.path.join(workdir, datetime)))
+    db.commit()
+    db.close()
+    jobs = {j['datetime']: j for j in pi.JobCatalog().query()}
+    assert (jobs['20260101_000000']['dim'], jobs['20260102_000000']['dim']) == (4, 2)
+    pi.JobCatalog()                                  # an up to date catalog is left as it is
+
+
+
+
+
+def test_compare_table_by_region(pi, workdir):
+    """The z-scores compare each job with the first job of the same region only."""
+    catalog = pi.JobCatalog()
+    for i, changes in enumerate([{}, {'dim': 3}, {'seed': 6}, {'dim': 3, 'seed': 7}]):  # circle, sphere, circle, sphere
+        datetime = f"2026010{i + 1}_000000"          # datetime of the job
+        catalog.add(make_result(pi, workdir, datetime, **changes), os.path.join(workdir, datetime), 'gui')
+    jobs = sorted(catalog.query(), key = lambda j: j['datetime'])  # jobs in the order they were made
+    rows = {row[:12].strip(): row[12:].split() for row in pi.compare_table(jobs).splitlines()}
+    assert rows['region'] == ['circle', '3D', 'sphere', 'circle', '3D', 'sphere']
+    z = rows['z vs first']                           # z-scores of the jobs
+    assert z[0] == '-' and z[1] == '-'               # first jobs of each region are the references
+    assert all(abs(float(v)) < 5 for v in z[2:])     # same region jobs are compatible
+
+
+
+
+
+def test_compare_table_without_runs(pi, workdir):
+    """A job without runs (i.e. cut by the time budget) has no z-score, and no estimate."""
+    catalog = pi.JobCatalog()
+    spec = pi.parse_spec({'runs': 6, 'dots': 2000, 'seed': 5})  # job spec
+    empty = pi.job_result(spec, [], 0.5)             # job cut before its first run
+    pi.save_result(empty, os.path.join(workdir, '20260101_000000'))
+    catalog.add(empty, os.path.join(workdir, '20260101_000000'), 'integrate')
+    catalog.add(make_result(pi, workdir, '20260102_000000'), os.path.join(workdir, '20260102_000000'), 'gui')
+    catalog.add(make_result(pi, workdir, '20260103_000000', seed = 6), os.path.join(workdir, '20260103_000000'), 'gui')
+    jobs = sorted(catalog.query(), key = lambda j: j['datetime'])  # the job without runs is the reference
+    rows = {row[:12].strip(): row[12:].split() for row in pi.compare_table(jobs).splitlines()}
+    assert rows['estimate'][0] == '-' and rows['z vs first'] == ['-', '-', '-']
+    z = pi.compare_table(jobs[::-1]).splitlines()[-1][12:].split()  # the job without runs is the last one
+    assert z[0] == '-' and z[2] == '-' and abs(float(z[1])) < 5
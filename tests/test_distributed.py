@@ -0,0 +1,117 @@
+"""Tests of the distributed mode: the lease protocol of the coordinator, and a job computed by workers
+connected over TCP on localhost."""
+
+import asyncio
+import socket
+import threading
+
+import pytest
+
+
+
+
+
+def free_port():
+    """Returns a free TCP port of localhost."""
+    with socket.socket() as sock:                    # temporary socket
+        sock.bind(('127.0.0.1', 0))                  # port assigned by the OS
+        return sock.getsockname()[1]
+
+
+
+
+
+def coordinator(pi, lease_timeout=30, **changes):
+    """Returns a coordinator of a small seeded job (not started), with 4 leases of 2 runs."""
+    spec = pi.parse_spec(dict({'runs': 8, 'dots': 3000, 'seed': 21, 'chunk': 1024, 'kernel': 'numpy'}, **changes))
+    c = pi.Coordinator(spec, '127.0.0.1', free_port(), 4, lease_timeout)
+    c.finished = asyncio.Event()                     # completion event (made by main, when started)
+    return c
+
+
+
+
+
+def result_msg(pi, c, lease):
+    """Returns the result message of a lease, with its runs computed as a worker does."""
+    s = c.spec                                       # job spec
+    hits = pi.run_batch(s['dots'], s['seed'], s['sampler'], s['kernel'], s['chunk'], lease['first_run'],
+                        lease['n_runs'])             # dots in circle of the runs of the lease
+    return {'type': 'result', 'lease': lease['lease'], 'first_run': lease['first_run'],
+            'hits': hits, 'total': sum(hits)}
+
+
+
+
+
+def test_leases(pi):
+    """The leases cover the runs; expired and released leases are assigned again, late results count once."""
+    c = coordinator(pi, lease_timeout = 0)
+    held = set()                                     # leases held by the test worker
+    leases = [c.next_lease(held) for _ in range(4)]  # all the leases
+    assert [(m['first_run'], m['n_runs']) for m in leases] == [(0, 2), (2, 2), (4, 2), (6, 2)]
+    assert c.next_lease(held) == {'type': 'wait', 'seconds': 1}
+    
+    c.complete(result_msg(pi, c, leases[0]), held)   # first lease is completed
+    with pytest.raises(ValueError):                  # inconsistent total of the dots in circle
+        c.complete(dict(result_msg(pi, c, leases[1]), total = 0), held)
+    c.release(leases[2]['lease'], 'test')            # lease of a disconnected worker
+    c.expire_leases()                                # the other leases are expired (timeout zero)
+    assert sorted(c.pending) == [2, 4, 6] and c.runs_done == 2
+    
+    again = c.next_lease(held)                       # lease assigned again
+    late = next(m for m in leases if m['first_run'] == again['first_run'])  # expired lease of the same runs
+    c.complete(result_msg(pi, c, late), held)        # late result of the expired lease is accepted
+    c.complete(result_msg(pi, c, again), held)       # result of the reassigned lease is ignored
+    assert c.runs_done == 4
+    for m in [c.next_lease(held) for _ in range(len(c.pending))]:  # remaining leases
+        c.complete(result_msg(pi, c, m), held)
+    assert c.finished.is_set() and c.next_lease(held) == {'type': 'done'}
+    assert c.hits_results == list(pi.run_batch(3000, 21, 'PCG64', 'numpy', 1024, 0, 8))
+
+
+
+
+
+def run_job(pi, c, worker):
+    """Runs the coordinator in a thread and the worker function here, returning the dots in circle."""
+    out = {}                                         # dots in circle returned by the coordinator
+    thread = threading.Thread(target = lambda: out.setdefault('hits', c.run()))  # coordinator thread
+    thread.start()
+    for _ in range(100):                             # waits for the coordinator to listen
+        try:                                         # tentative
+            socket.create_connection(('127.0.0.1', c.port)).close()
+            break
+        except OSError:                              # case the coordinator isn't listening yet
+            threading.Event().wait(0.05)
+    worker(f"127.0.0.1:{c.port}")
+    thread.join(timeout = 30)
+    return out['hits']
+
+
+
+
+
+def test_job_over_tcp(pi):
+    """A worker computes the leases over TCP, and the runs equal the same job computed here."""
+    c = coordinator(pi)
+    assert run_job(pi, c, pi.run_worker) == list(pi.run_batch(3000, 21, 'PCG64', 'numpy', 1024, 0, 8))
+
+
+
+
+
+def test_worker_without_numba_refuses(pi, monkeypatch):
+    """A worker without numba refuses the leases of a numba job, that are computed by another worker."""
+    c = coordinator(pi, kernel = 'numba')
+    if c.spec['kernel'] != 'numba':                  # case numba is not installed here
+        pytest.skip("numba is not installed")
+    
+    def workers(address):                            # a worker without numba, then one with it
+        monkeypatch.setattr(pi, 'numba_available', False)
+        pi.run_worker(address)                       # refuses its first lease, and quits
+        assert len(c.pending) == 4                   # the refused lease is pending again
+        monkeypatch.setattr(pi, 'numba_available', True)
+        pi.run_worker(address)
+    
+    assert run_job(pi, c, workers) == list(pi.run_batch(3000, 21, 'PCG64', 'numba', 1024, 0, 8))
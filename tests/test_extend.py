@@ -0,0 +1,44 @@
+"""Tests of the incremental extension of a finished job: the extended job equals the job made with all
+the runs at once."""
+
+import os
+
+import pytest
+
+
+
+
+
+def finished_job(pi, folder, **changes):
+    """Computes and saves a small seeded job in folder/logs, and returns its spec and file name."""
+    spec = pi.parse_spec(dict({'runs': 5, 'dots': 4000, 'seed': 12, 'chunk': 1024}, **changes))  # job spec
+    os.makedirs(folder / 'logs', exist_ok = True)    # logs folder
+    fname = str(folder / 'logs' / '20260101_000000') # result name (without suffix)
+    pi.save_result(pi.job_result(spec, pi.compute_runs(spec, 0, 5, 1, pi.governor), 1.0), fname)
+    return spec, fname
+
+
+
+
+
+def test_extended_job_equals_whole_job(pi, workdir):
+    """The appended runs continue the random streams: extending 5 runs by 3 gives the 8 runs job."""
+    spec, fname = finished_job(pi, workdir)
+    result = pi.extend_job(fname, 3, 1, pi.governor)
+    whole = pi.job_result(dict(spec, runs = 8), pi.compute_runs(dict(spec, runs = 8), 0, 8, 1, pi.governor), 1.0)
+    assert result['runs_made'] == 8 and result['spec']['runs'] == 8
+    assert result['hits'] == whole['hits'] and result['pi'] == whole['pi']
+    assert len([f for f in os.listdir(workdir / 'logs') if f.endswith('_result.json')]) == 2  # saved as a new job
+
+
+
+
+
+def test_numba_job_is_not_extended_without_numba(pi, workdir, monkeypatch):
+    """The runs of a numba job aren't extended by another kernel."""
+    spec, fname = finished_job(pi, workdir, kernel = 'numba')
+    if spec['kernel'] != 'numba':                    # case numba is not installed here
+        pytest.skip("numba is not installed")
+    monkeypatch.setattr(pi, 'numba_available', False)
+    with pytest.raises(ValueError, match = 'numba'):
+        pi.extend_job(fname, 3, 1, pi.governor)
@@ -0,0 +1,64 @@
+"""Tests of the integer-domain kernel: the hit test on the raw 64-bit draws is exact, also for the dots
+within the float64 rounding band around the circle."""
+
+import math
+
+import numpy as np
+import pytest
+
+
+
+
+
+def raw_draws(points):
+    """Returns the raw 64-bit draws made of the 32-bit integer coordinates (x, y) of points."""
+    return np.array(points, dtype = np.uint32).reshape(-1).view(np.uint64)  # x in the low half, y in the high one
+
+
+
+
+
+def test_band_is_exact(pi):
+    """The dots just within and just beyond the circle x^2 + y^2 = 2^64 are told apart exactly."""
+    rng = np.random.default_rng(0)                   # coordinates of the test
+    points, expected = [], []                        # dots, and whether they are in circle
+    for x in [0, 1, 2**16, 2**31, 2**32 - 1] + [int(v) for v in rng.integers(0, 2**32, 200)]:
+        y = math.isqrt(2**64 - x * x)                # largest y within the circle
+        for dy in (-1, 0, 1):                        # dots around the circle
+            if 0 <= y + dy < 2**32:                  # case of valid coordinate
+                points.append((x, y + dy))
+                expected.append(x * x + (y + dy)**2 <= 2**64)
+    assert list(pi.integer_in_circle(raw_draws(points))) == expected
+    assert False in expected and sum(expected) > len(expected) // 2  # both sides of the circle are tested
+
+
+
+
+
+def test_float_sum_alone_is_not_exact(pi):
+    """The band is needed: float64 sums round some dots beyond the circle onto it."""
+    x, y = 4046803256, 1438793759                    # x^2 + y^2 = 2^64 + 1 (from 2^64 + 1 = 274177 x 67280421310721)
+    assert x * x + y * y == 2**64 + 1
+    assert float(x)**2 + float(y)**2 <= 2.0**64      # float64 puts the dot in circle
+    assert not pi.integer_in_circle(raw_draws([(x, y), (y, x)])).any()
+
+
+
+
+
+def test_buffers(pi):
+    """The optional buffers give the same result of the allocated ones."""
+    raw = np.random.default_rng(1).integers(0, 2**64, 5000, dtype = np.uint64)  # raw draws
+    x2, y2 = np.empty(8000), np.empty(8000)          # buffers larger than the draws
+    assert np.array_equal(pi.integer_in_circle(raw, x2, y2), pi.integer_in_circle(raw))
+
+
+
+
+
+@pytest.mark.parametrize('chunk', [1000, 2**20])
+def test_integer_kernel_counts(pi, chunk):
+    """The integer kernel counts the raw draws of the run stream in circle, as tested with Python integers."""
+    raw = pi.make_rng(6, 'PCG64', 0).bit_generator.random_raw(3000)  # raw draws of the run
+    exact = sum((int(r) & 0xFFFFFFFF)**2 + (int(r) >> 32)**2 <= 2**64 for r in raw)  # dots in circle
+    assert pi.count_hits(3000, pi.make_rng(6, 'PCG64', 0), 'integer', chunk) == exact
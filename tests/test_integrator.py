@@ -0,0 +1,100 @@
+"""Tests of the generic integrator: volumes of the unit hyperspheres, regions of indicator functions,
+and the indicators accepted from the command line or the allowlist only."""
+
+import math
+
+import numpy as np
+import pytest
+
+
+
+
+
+@pytest.mark.parametrize('dim', [1, 2, 3, 5])
+def test_count_inside_volumes(pi, dim):
+    """The estimated volume of the unit hypersphere is within 5 standard errors of the exact value."""
+    dots = 400_000                                   # dots of the estimate
+    scale, exact = pi.region_scale({'dim': dim})     # 2^dim, and exact volume
+    fraction = pi.count_inside(dots, pi.make_rng(3, 'PCG64', 0), dim, chunk = 2**14) / dots
+    st_err = scale * math.sqrt(fraction * (1 - fraction) / dots)  # standard error of the estimate
+    assert scale * fraction == pytest.approx(exact, abs = max(5 * st_err, 1e-12))
+
+
+
+
+
+def test_count_inside_matches_count_hits(pi):
+    """In two dimensions the integrator counts the same dots of the numpy kernel."""
+    rng_a, rng_b = pi.make_rng(9, 'PCG64', 1), pi.make_rng(9, 'PCG64', 1)  # same stream twice
+    assert pi.count_inside(30_001, rng_a, 2, chunk = 4096) == pi.count_hits(30_001, rng_b, 'numpy', 2**20)
+
+
+
+
+
+
+def test_indicator_region(pi, tmp_path):
+    """The dots of an indicator region are counted, and the jobs estimate its volume (no exact value)."""
+    source = tmp_path / 'half.py'                    # indicator of the half of the unit cube below x = y
+    source.write_text("def below(x):\n    return x[1] < x[0]\n")
+    spec = pi.parse_spec({'runs': 6, 'dots': 20_000, 'seed': 2, 'dim': 3, 'indicator': f"{source}:below"},
+                         local = True)               # job spec of the region
+    hits = pi.compute_runs(spec, 0, 6, 1, pi.governor)  # dots within the region, per run
+    result = pi.job_result(spec, hits, 1.0)
+    assert result['exact'] is None and result['error'] is None
+    assert result['pi'] == pytest.approx(0.5, abs = 5 * math.sqrt(0.25 / (6 * 20_000)))  # 5 standard errors
+    assert pi.region_label(spec) == '3D below'
+
+
+
+
+
+def test_hypersphere_job(pi):
+    """A job in 4 dimensions estimates the volume of the unit hypersphere, pi^2 / 2, with its error."""
+    spec = pi.parse_spec({'runs': 8, 'dots': 50_000, 'seed': 9, 'dim': 4, 'kernel': 'integer'})
+    assert spec['kernel'] == 'numpy'                 # other regions are counted by the numpy kernel
+    result = pi.job_result(spec, pi.compute_runs(spec, 0, 8, 1, pi.governor), 1.0)
+    assert result['exact'] == pytest.approx(math.pi**2 / 2)
+    assert result['error'] == pytest.approx(result['pi'] - math.pi**2 / 2)
+    fraction = math.pi**2 / 32                       # fraction of the dots within the region
+    assert abs(result['error']) < 5 * 16 * math.sqrt(fraction * (1 - fraction) / (8 * 50_000))  # 5 standard errors
+
+
+
+
+
+def test_indicator_not_allowed(pi, tmp_path):
+    """An indicator not in the allowlist is refused to the remote jobs, before its code is loaded."""
+    marker = tmp_path / 'loaded'                     # file made by the indicator module, when loaded
+    source = tmp_path / 'region.py'                  # indicator module
+    source.write_text(f"open({str(marker)!r}, 'w').close()\ndef below(x):\n    return x[1] < x[0]\n")
+    with pytest.raises(ValueError, match = 'not allowed'):
+        pi.parse_spec({'indicator': f"{source}:below"})
+    assert not marker.exists()                       # module code wasn't run
+
+
+
+
+
+def test_indicator_allowed(pi, tmp_path, monkeypatch):
+    """An indicator is accepted from the command line, or when listed in the indicators setting."""
+    source = tmp_path / 'triangle.py'                # indicator module
+    source.write_text("def below(x):\n    return x[1] < x[0]\n")
+    name = f"{source}:below"                         # indicator name
+    assert pi.parse_spec({'indicator': name}, local = True)['indicator'] == name
+    monkeypatch.setitem(pi.settings.s, 'indicators', f"other:function, {name}")
+    spec = pi.parse_spec({'indicator': name, 'kernel': 'integer'})
+    assert (spec['dim'], spec['indicator'], spec['kernel']) == (2, name, 'numpy')
+
+
+
+
+
+def test_broken_indicator(pi, tmp_path):
+    """Any error while loading an indicator is raised as ValueError."""
+    source = tmp_path / 'broken.py'                  # indicator module with a syntax error
+    source.write_text("def below(x:\n")
+    with pytest.raises(ValueError, match = 'invalid indicator'):
+        pi.parse_spec({'indicator': f"{source}:below"}, local = True)
+    with pytest.raises(ValueError, match = 'invalid indicator'):
+        pi.parse_spec({'indicator': 'no_such_module_here:below'}, local = True)
@@ -0,0 +1,44 @@
+"""Tests of the race mode: the job variants computed concurrently on the same pool equal the jobs
+computed alone, and each variant reports its end."""
+
+import pytest
+
+
+
+
+
+def race_specs(pi, variants):
+    """Returns the job specs of the race variants, over a small seeded base spec."""
+    base = {'runs': 6, 'dots': 4000, 'seed': 5, 'chunk': 1024}  # keys shared by the variants
+    return [pi.parse_variant(variant, base, local = True) for variant in variants]
+
+
+
+
+
+def test_race_equals_the_jobs_alone(pi, capsys):
+    """The estimate of each variant is the one of its runs computed alone, also for other regions."""
+    labels = ['sampler=PCG64', 'sampler=MT19937', 'kernel=integer', 'runs=3,dim=3']  # race variants
+    specs = race_specs(pi, labels)
+    table, curves = pi.race(labels, specs, 1)
+    rows = {line.split()[0]: line.split() for line in table.splitlines()[3:3 + len(labels)]}  # rows by variant
+    for label, s, curve in zip(labels, specs, curves):  # iteration over the variants
+        hits = pi.run_batch(s['dots'], s['seed'], s['sampler'], s['kernel'], s['chunk'], 0, s['runs'],
+                            pi.spec_region(s))       # runs of the variant computed alone
+        scale, exact = pi.region_scale(s)            # scale and exact value of the variant region
+        estimate = pi.aggregate_hits(hits, s['dots'], scale, exact)[0]
+        assert rows[label][1] == str(s['runs']) and float(rows[label][3]) == pytest.approx(estimate, abs = 1e-8)
+        assert curve[-1][0] == s['runs'] * s['dots'] and curve[-1][1] == pytest.approx(estimate)
+        assert [point[0] for point in curve] == sorted(point[0] for point in curve)  # dots drawn grow
+    out = capsys.readouterr().out                    # terminal feedback
+    assert all(f"{label} ended in" in out for label in labels)
+
+
+
+
+
+def test_race_shares_the_seed(pi):
+    """The variants share the seed: variants changing only the chunk draw the same dots."""
+    labels = ['chunk=1024', 'chunk=4096']            # variants of the same runs (chunk independent)
+    table, curves = pi.race(labels, race_specs(pi, labels), 1)
+    assert curves[0][-1][1] == curves[1][-1][1]
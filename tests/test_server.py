@@ -0,0 +1,123 @@
+"""Tests of the job server: job spec validation, and the HTTP/JSON API with the progress events, on a
+server bound to a free port of localhost."""
+
+import asyncio
+import io
+import json
+
+import numpy as np
+import pytest
+
+
+
+
+
+def test_missing_keys_from_settings(pi):
+    """The missing keys are taken from the settings, and a random seed is assigned when not set."""
+    spec = pi.parse_spec({'runs': 3, 'dots': 100})
+    assert (spec['runs'], spec['dots'], spec['sampler']) == (3, 100, pi.settings.s['sampler'])
+    assert isinstance(spec['seed'], int) and spec['seed'] >= 0
+    assert 'dim' not in spec                         # pi jobs have no region keys
+
+
+
+
+
+@pytest.mark.parametrize('request_spec, message', [
+    ({'runs': 0}, 'must be positive'),
+    ({'dots': -5}, 'must be positive'),
+    ({'chunk': 0}, 'must be positive'),
+    ({'seed': -1}, 'must not be negative'),
+    ({'runs': 'many'}, 'invalid job spec'),
+    ({'seed': [1]}, 'invalid job spec'),
+    ({'sampler': 'LCG'}, 'unknown sampler'),
+    ({'kernel': 'gpu'}, 'unknown kernel'),
+    ({'dim': 0}, 'dim must be positive'),
+])
+def test_invalid_specs(pi, request_spec, message):
+    """Invalid values raise a ValueError explaining the issue."""
+    with pytest.raises(ValueError, match = message):
+        pi.parse_spec(request_spec)
+
+
+
+
+
+async def request(port, method, path, body=None, content_type='application/json'):
+    """Sends an HTTP request to the server, and returns the status code and the body of the response."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)  # connection to the server
+    payload = b'' if body is None else json.dumps(body).encode()  # request body
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: {content_type}\r\n"
+                 f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload)
+    await writer.drain()                             # waits for the request to be sent
+    response = await reader.read()                   # response, until the server closes the connection
+    writer.close()                                   # the connection is closed
+    head, _, content = response.partition(b'\r\n\r\n')  # headers and body of the response
+    return int(head.split()[1]), content
+
+
+
+
+
+def serve(pi, scenario):
+    """Runs the scenario (coroutine function of the server and its port) against a job server."""
+    server = pi.JobServer(0, 1, pi.ResultCache(0))   # job server with one worker process, without cache
+    
+    async def main():                                # the server and the scenario run on the same loop
+        tcp = await asyncio.start_server(server.handle_client, '127.0.0.1', 0)  # free port of localhost
+        async with tcp:                              # the server is closed on exit
+            return await scenario(server, tcp.sockets[0].getsockname()[1])
+    
+    try:                                             # tentative
+        return asyncio.run(main())
+    finally:                                         # in any case
+        server.executor.shutdown(cancel_futures = True)  # worker processes are released
+
+
+
+
+
+def test_job_lifecycle(pi):
+    """A submitted job streams its progress, and its result and hits match the same job computed here."""
+    spec = {'runs': 12, 'dots': 20_000, 'seed': 4, 'chunk': 4096}  # requested job
+    
+    async def scenario(server, port):
+        code, body = await request(port, 'POST', '/jobs', spec)
+        assert code == 201
+        job = json.loads(body)                       # status of the new job
+        _, events = await request(port, 'GET', f"/jobs/{job['id']}/events")  # events, until the job ends
+        _, status = await request(port, 'GET', f"/jobs/{job['id']}")
+        _, hits = await request(port, 'GET', f"/jobs/{job['id']}/hits")
+        _, jobs = await request(port, 'GET', '/jobs')
+        return events.decode(), json.loads(status), np.load(io.BytesIO(hits)), json.loads(jobs)
+    
+    events, status, hits, jobs = serve(pi, scenario)
+    names = [line[len('event: '):] for line in events.splitlines() if line.startswith('event: ')]  # event names
+    assert names[-1] == 'done' and set(names[:-1]) <= {'status', 'progress'}
+    last = json.loads(events.strip().splitlines()[-1][len('data: '):])  # data of the last event
+    assert last['runs_done'] == 12 and last['progress'] == 100
+    
+    expected = pi.run_batch(20_000, 4, 'PCG64', pi.parse_spec(spec)['kernel'], 4096, 0, 12)  # same runs, computed here
+    assert hits.dtype == np.uint32 and list(hits) == list(expected)
+    assert status['status'] == 'done' and status['result']['hits'] == list(expected)
+    assert status['result']['pi'] == pi.aggregate_hits(expected, 20_000)[0]
+    assert [j['id'] for j in jobs] == [status['id']] and 'hits' not in jobs[0].get('result', {})
+
+
+
+
+
+def test_rejected_requests(pi):
+    """Requests not sent as JSON, invalid specs, unknown paths and jobs not yet done are refused."""
+    
+    async def scenario(server, port):
+        codes = [(await request(port, 'POST', '/jobs', {'runs': 2}, 'text/plain'))[0],
+                 (await request(port, 'POST', '/jobs', {'sampler': 'LCG'}))[0],
+                 (await request(port, 'POST', '/jobs', {'runs': 10**12, 'dots': 1000}))[0],
+                 (await request(port, 'GET', '/jobs/7'))[0],
+                 (await request(port, 'DELETE', '/jobs'))[0]]
+        code, body = await request(port, 'POST', '/jobs', {'runs': 40, 'dots': 10**6, 'seed': 1})
+        codes.append((await request(port, 'GET', f"/jobs/{json.loads(body)['id']}/hits"))[0])  # job still running
+        return codes
+    
+    assert serve(pi, scenario) == [415, 400, 400, 404, 404, 409]
@@ -0,0 +1,40 @@
+"""Tests of the random streams of the runs: each run has its own stream, and the seeded runs are
+reproducible whatever the chunk, the batches and the kernel."""
+
+import numpy as np
+import pytest
+
+
+
+
+
+def test_make_rng_streams(pi):
+    """The stream of a run depends on seed, sampler and run index only."""
+    first = pi.make_rng(42, 'PCG64', 3).random(8)    # stream of run 3
+    assert np.array_equal(first, pi.make_rng(42, 'PCG64', 3).random(8))
+    assert not np.array_equal(first, pi.make_rng(42, 'PCG64', 4).random(8))
+    assert not np.array_equal(first, pi.make_rng(43, 'PCG64', 3).random(8))
+    assert not np.array_equal(first, pi.make_rng(42, 'MT19937', 3).random(8))
+
+
+
+
+
+@pytest.mark.parametrize('kernel', ['numpy', 'integer', 'numba'])
+def test_seeded_runs_are_chunk_independent(pi, kernel):
+    """A seeded run counts the same dots in circle whatever the chunk, and on every call."""
+    kernel = pi.select_kernel(kernel)                # numba falls back to numpy, when not installed
+    dots = 100_003                                   # dots per run (not a multiple of the chunks)
+    hits = {pi.count_hits(dots, pi.make_rng(7, 'PCG64', run), kernel, chunk)
+            for chunk in (1000, 4096, 2**20) for run in (5, 5)}
+    assert len(hits) == 1
+
+
+
+
+
+def test_seeded_batches_are_reproducible(pi):
+    """The runs of a seeded job are the same when computed in one batch or in several ones."""
+    whole = pi.run_batch(50_000, 11, 'PCG64', 'numpy', 2**14, 0, 6)  # six runs in one batch
+    split = np.concatenate([pi.run_batch(50_000, 11, 'PCG64', 'numpy', 2**12, first, 2) for first in (0, 2, 4)])
+    assert np.array_equal(np.asarray(whole), split)
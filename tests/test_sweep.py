@@ -0,0 +1,48 @@
+"""Tests of the nested-prefix convergence sweep: the estimates at every dots level are read off a single
+sample set, and equal the runs made with those dots."""
+
+import pytest
+
+
+
+
+
+def test_sweep_levels(pi):
+    """The levels are the sliders values up to dots, and the last one is always dots."""
+    assert pi.sweep_levels(3000) == [1000, 2000, 3000]
+    assert pi.sweep_levels(25_000)[-4:] == [9000, 10_000, 20_000, 25_000]
+    assert pi.sweep_levels(500) == [500]
+
+
+
+
+
+@pytest.mark.parametrize('chunk', [1000, 4096, 2**20])
+def test_prefixes_equal_the_shorter_runs(pi, chunk):
+    """The dots in circle at each prefix equal the ones of a run with the prefix dots (same stream)."""
+    prefixes = pi.sweep_levels(23_456)               # dots levels, with prefixes within and across chunks
+    hits = pi.count_hits_prefixes(23_456, pi.make_rng(8, 'PCG64', 2), prefixes, chunk)
+    assert hits == [pi.count_hits(p, pi.make_rng(8, 'PCG64', 2), 'numpy', chunk) for p in prefixes]
+
+
+
+
+
+def test_sweep_batches(pi):
+    """The sweep batches return the prefixes dots in circle of each run, as the runs of its own stream."""
+    prefixes = [1000, 5000]                          # dots levels
+    batch = pi.run_sweep_batch(5000, 3, 'PCG64', 2048, prefixes, 4, 2)  # runs 4 and 5
+    assert batch[1] == pi.count_hits_prefixes(5000, pi.make_rng(3, 'PCG64', 5), prefixes, 2048)
+    assert [b[-1] for b in batch] == list(pi.run_batch(5000, 3, 'PCG64', 'numpy', 2048, 4, 2))
+
+
+
+
+
+def test_sweep_table(pi):
+    """The table has one row per level, with the estimate of the runs at that level."""
+    spec = pi.parse_spec({'runs': 4, 'dots': 3000, 'seed': 1, 'kernel': 'numpy'})  # job spec
+    rows = pi.sweep(spec, 1).splitlines()[3:]        # rows of the levels
+    hits = pi.run_batch(2000, 1, spec['sampler'], 'numpy', spec['chunk'], 0, 4)  # runs with 2,000 dots
+    assert [int(r.split()[0].replace(',', '')) for r in rows] == [1000, 2000, 3000]
+    assert float(rows[1].split()[1]) == pytest.approx(pi.aggregate_hits(hits, 2000)[0], abs = 1e-8)